@@ -0,0 +1,41 @@
+"""añade_tabla_pronosticos_eventos
+
+Revision ID: 13bdf95f9b2a
+Revises: 9097ed679fd7
+Create Date: 2026-10-19 17:07:44.503559
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '13bdf95f9b2a'
+down_revision: Union[str, Sequence[str], None] = '9097ed679fd7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('pronosticos_eventos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(), nullable=False),
+    sa.Column('entidad_tipo', sa.String(), nullable=False),
+    sa.Column('entidad_id', sa.Integer(), nullable=False),
+    sa.Column('fecha_base', sa.Date(), nullable=False),
+    sa.Column('fecha_estimada', sa.Date(), nullable=False),
+    sa.Column('calculado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_pronosticos_eventos_id'), 'pronosticos_eventos', ['id'], unique=False)
+    op.create_index(op.f('ix_pronosticos_eventos_fecha_estimada'), 'pronosticos_eventos', ['fecha_estimada'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_pronosticos_eventos_fecha_estimada'), table_name='pronosticos_eventos')
+    op.drop_index(op.f('ix_pronosticos_eventos_id'), table_name='pronosticos_eventos')
+    op.drop_table('pronosticos_eventos')
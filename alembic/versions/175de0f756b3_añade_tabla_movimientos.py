@@ -20,13 +20,29 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     """Upgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Las bases creadas antes con create_all ya tienen la tabla: solo se crea en una base vacía
+    if sa.inspect(op.get_bind()).has_table('movimientos'):
+        return
+    op.create_table('movimientos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=False),
+    sa.Column('usuario_nombre', sa.String(), nullable=False),
+    sa.Column('accion', sa.String(), nullable=False),
+    sa.Column('modulo', sa.String(), nullable=False),
+    sa.Column('descripcion', sa.String(), nullable=True),
+    sa.Column('entidad_tipo', sa.String(), nullable=True),
+    sa.Column('entidad_id', sa.Integer(), nullable=True),
+    sa.Column('tipo_movimiento', sa.String(), nullable=False),
+    sa.Column('fecha_movimiento', sa.DateTime(), nullable=False),
+    sa.Column('ip_address', sa.String(), nullable=True),
+    sa.Column('user_agent', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_movimientos_id'), 'movimientos', ['id'], unique=False)
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index(op.f('ix_movimientos_id'), table_name='movimientos')
+    op.drop_table('movimientos')
@@ -0,0 +1,113 @@
+"""añade_particiones_movimientos
+
+Revision ID: 3773fad22109
+Revises: b1dffefb8424
+Create Date: 2026-10-19 17:28:01.330689
+
+"""
+from typing import Sequence, Union
+
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3773fad22109'
+down_revision: Union[str, Sequence[str], None] = 'b1dffefb8424'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Índices de movimientos que hay que rehacer al cambiar la tabla en PostgreSQL
+INDICES = [
+    ('ix_movimientos_id', ['id']),
+    ('ix_movimientos_usuario_id_id', ['usuario_id', 'id']),
+    ('ix_movimientos_usuario_id_fecha_movimiento', ['usuario_id', 'fecha_movimiento']),
+    ('ix_movimientos_fecha_movimiento', ['fecha_movimiento']),
+]
+
+
+def _meses_recientes(atras: int = 12, adelante: int = 3):
+    """Rangos (desde, hasta) de las particiones mensuales que se crean de entrada"""
+    hoy = date.today()
+    base = hoy.year * 12 + hoy.month - 1
+    for desplazamiento in range(-atras, adelante + 1):
+        total = base + desplazamiento
+        yield date(total // 12, total % 12 + 1, 1), date((total + 1) // 12, (total + 1) % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_movimientos_fecha_movimiento'), 'movimientos', ['fecha_movimiento'], unique=False)
+
+    # En PostgreSQL la tabla pasa a estar particionada por mes. En SQLite se queda como está:
+    # la retención se aplica moviendo los meses antiguos a archivos (ver app/archivo_movimientos.py)
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("ALTER TABLE movimientos RENAME TO movimientos_sin_particionar")
+    for nombre, _ in INDICES:
+        op.execute(f"DROP INDEX IF EXISTS {nombre}")
+    op.execute("ALTER TABLE movimientos_sin_particionar DROP CONSTRAINT movimientos_pkey")
+    op.execute("ALTER SEQUENCE movimientos_id_seq OWNED BY NONE")
+    op.execute("""
+        CREATE TABLE movimientos (
+            id INTEGER NOT NULL DEFAULT nextval('movimientos_id_seq'),
+            usuario_id INTEGER NOT NULL REFERENCES users (id),
+            usuario_nombre VARCHAR NOT NULL,
+            accion VARCHAR NOT NULL,
+            modulo VARCHAR NOT NULL,
+            descripcion VARCHAR,
+            entidad_tipo VARCHAR,
+            entidad_id INTEGER,
+            tipo_movimiento VARCHAR NOT NULL,
+            fecha_movimiento TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            ip_address VARCHAR,
+            user_agent VARCHAR,
+            PRIMARY KEY (id, fecha_movimiento)
+        ) PARTITION BY RANGE (fecha_movimiento)
+    """)
+    op.execute("CREATE TABLE movimientos_default PARTITION OF movimientos DEFAULT")
+    for desde, hasta in _meses_recientes():
+        op.execute(
+            f"CREATE TABLE movimientos_{desde:%Y_%m} PARTITION OF movimientos "
+            f"FOR VALUES FROM ('{desde.isoformat()}') TO ('{hasta.isoformat()}')"
+        )
+    op.execute("INSERT INTO movimientos SELECT * FROM movimientos_sin_particionar")
+    op.execute("DROP TABLE movimientos_sin_particionar")
+    op.execute("ALTER SEQUENCE movimientos_id_seq OWNED BY movimientos.id")
+    for nombre, columnas in INDICES:
+        op.create_index(nombre, 'movimientos', columnas, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE movimientos RENAME TO movimientos_particionada")
+        for nombre, _ in INDICES:
+            op.execute(f"DROP INDEX IF EXISTS {nombre}")
+        op.execute("ALTER SEQUENCE movimientos_id_seq OWNED BY NONE")
+        op.execute("""
+            CREATE TABLE movimientos (
+                id INTEGER NOT NULL DEFAULT nextval('movimientos_id_seq') PRIMARY KEY,
+                usuario_id INTEGER NOT NULL REFERENCES users (id),
+                usuario_nombre VARCHAR NOT NULL,
+                accion VARCHAR NOT NULL,
+                modulo VARCHAR NOT NULL,
+                descripcion VARCHAR,
+                entidad_tipo VARCHAR,
+                entidad_id INTEGER,
+                tipo_movimiento VARCHAR NOT NULL,
+                fecha_movimiento TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+                ip_address VARCHAR,
+                user_agent VARCHAR
+            )
+        """)
+        op.execute("INSERT INTO movimientos SELECT * FROM movimientos_particionada")
+        # Se eliminan la tabla particionada y todas sus particiones
+        op.execute("DROP TABLE movimientos_particionada CASCADE")
+        op.execute("ALTER SEQUENCE movimientos_id_seq OWNED BY movimientos.id")
+        for nombre, columnas in INDICES:
+            op.create_index(nombre, 'movimientos', columnas, unique=False)
+        return
+    op.drop_index(op.f('ix_movimientos_fecha_movimiento'), table_name='movimientos')
@@ -0,0 +1,36 @@
+"""añade_version_a_entidades_del_hato
+
+Revision ID: 507b24e91549
+Revises: e162abdcf8df
+Create Date: 2026-10-19 17:44:31.460501
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '507b24e91549'
+down_revision: Union[str, Sequence[str], None] = 'e162abdcf8df'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tablas con control de concurrencia optimista en los PUT
+TABLAS = ['cerdas_reproductoras', 'sementales', 'camadas_lechones', 'lotes_engorde', 'tratamientos_veterinarios']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Con server_default las filas existentes quedan en la versión 1 sin reescribir la tabla
+    for tabla in TABLAS:
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla in reversed(TABLAS):
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.drop_column('version')
@@ -0,0 +1,74 @@
+"""añade_diccionario_auditoria
+
+Revision ID: 7fa58a159f07
+Revises: 3773fad22109
+Create Date: 2026-10-19 17:31:52.152779
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7fa58a159f07'
+down_revision: Union[str, Sequence[str], None] = '3773fad22109'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columnas de movimientos que pasan a guardarse como ID del diccionario (campo, obligatorio)
+CAMPOS = [
+    ('usuario_nombre', True),
+    ('modulo', True),
+    ('tipo_movimiento', True),
+    ('entidad_tipo', False),
+    ('user_agent', False),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('valores_auditoria',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('campo', sa.String(), nullable=False),
+    sa.Column('valor', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('campo', 'valor', name='uq_valores_auditoria_campo_valor')
+    )
+    for campo, _ in CAMPOS:
+        op.add_column('movimientos', sa.Column(f'{campo}_id', sa.Integer(), nullable=True))
+
+    # Se copian los textos distintos al diccionario y cada fila pasa a apuntar a su ID
+    for campo, _ in CAMPOS:
+        op.execute(
+            f"INSERT INTO valores_auditoria (campo, valor) "
+            f"SELECT DISTINCT '{campo}', {campo} FROM movimientos WHERE {campo} IS NOT NULL"
+        )
+        op.execute(
+            f"UPDATE movimientos SET {campo}_id = (SELECT v.id FROM valores_auditoria v "
+            f"WHERE v.campo = '{campo}' AND v.valor = movimientos.{campo})"
+        )
+
+    with op.batch_alter_table('movimientos') as batch_op:
+        for campo, obligatorio in CAMPOS:
+            batch_op.drop_column(campo)
+            batch_op.alter_column(f'{campo}_id', existing_type=sa.Integer(), nullable=not obligatorio)
+            batch_op.create_foreign_key(f'fk_movimientos_{campo}_id', 'valores_auditoria', [f'{campo}_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for campo, _ in CAMPOS:
+        op.add_column('movimientos', sa.Column(campo, sa.String(), nullable=True))
+        op.execute(
+            f"UPDATE movimientos SET {campo} = (SELECT v.valor FROM valores_auditoria v "
+            f"WHERE v.id = movimientos.{campo}_id)"
+        )
+
+    with op.batch_alter_table('movimientos') as batch_op:
+        for campo, obligatorio in CAMPOS:
+            batch_op.drop_constraint(f'fk_movimientos_{campo}_id', type_='foreignkey')
+            batch_op.drop_column(f'{campo}_id')
+            batch_op.alter_column(campo, existing_type=sa.String(), nullable=not obligatorio)
+    op.drop_table('valores_auditoria')
@@ -0,0 +1,48 @@
+"""añade_indices_por_propietario
+
+Revision ID: 8d3cd013bfdc
+Revises: 13bdf95f9b2a
+Create Date: 2026-10-19 17:08:40.865102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d3cd013bfdc'
+down_revision: Union[str, Sequence[str], None] = '13bdf95f9b2a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_cerdas_reproductoras_user_id_id', 'cerdas_reproductoras', ['user_id', 'id'], unique=False)
+    op.create_index('ix_cerdas_reproductoras_user_id_fecha_nacimiento', 'cerdas_reproductoras', ['user_id', 'fecha_nacimiento'], unique=False)
+    op.create_index('ix_sementales_user_id_id', 'sementales', ['user_id', 'id'], unique=False)
+    op.create_index('ix_camadas_lechones_user_id_id', 'camadas_lechones', ['user_id', 'id'], unique=False)
+    op.create_index('ix_camadas_lechones_user_id_fecha_nacimiento', 'camadas_lechones', ['user_id', 'fecha_nacimiento'], unique=False)
+    op.create_index('ix_lotes_engorde_user_id_id', 'lotes_engorde', ['user_id', 'id'], unique=False)
+    op.create_index('ix_lotes_engorde_user_id_fecha_inicio', 'lotes_engorde', ['user_id', 'fecha_inicio'], unique=False)
+    op.create_index('ix_tratamientos_veterinarios_user_id_id', 'tratamientos_veterinarios', ['user_id', 'id'], unique=False)
+    op.create_index('ix_tratamientos_veterinarios_user_id_fecha', 'tratamientos_veterinarios', ['user_id', 'fecha'], unique=False)
+    op.create_index('ix_movimientos_usuario_id_id', 'movimientos', ['usuario_id', 'id'], unique=False)
+    op.create_index('ix_movimientos_usuario_id_fecha_movimiento', 'movimientos', ['usuario_id', 'fecha_movimiento'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movimientos_usuario_id_fecha_movimiento', table_name='movimientos')
+    op.drop_index('ix_movimientos_usuario_id_id', table_name='movimientos')
+    op.drop_index('ix_tratamientos_veterinarios_user_id_fecha', table_name='tratamientos_veterinarios')
+    op.drop_index('ix_tratamientos_veterinarios_user_id_id', table_name='tratamientos_veterinarios')
+    op.drop_index('ix_lotes_engorde_user_id_fecha_inicio', table_name='lotes_engorde')
+    op.drop_index('ix_lotes_engorde_user_id_id', table_name='lotes_engorde')
+    op.drop_index('ix_camadas_lechones_user_id_fecha_nacimiento', table_name='camadas_lechones')
+    op.drop_index('ix_camadas_lechones_user_id_id', table_name='camadas_lechones')
+    op.drop_index('ix_sementales_user_id_id', table_name='sementales')
+    op.drop_index('ix_cerdas_reproductoras_user_id_fecha_nacimiento', table_name='cerdas_reproductoras')
+    op.drop_index('ix_cerdas_reproductoras_user_id_id', table_name='cerdas_reproductoras')
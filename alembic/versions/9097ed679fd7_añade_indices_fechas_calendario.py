@@ -0,0 +1,30 @@
+"""añade_indices_fechas_calendario
+
+Revision ID: 9097ed679fd7
+Revises: 175de0f756b3
+Create Date: 2026-10-19 17:06:33.013946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9097ed679fd7'
+down_revision: Union[str, Sequence[str], None] = '175de0f756b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_tratamientos_veterinarios_fecha'), 'tratamientos_veterinarios', ['fecha'], unique=False)
+    op.create_index(op.f('ix_camadas_lechones_fecha_nacimiento'), 'camadas_lechones', ['fecha_nacimiento'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_camadas_lechones_fecha_nacimiento'), table_name='camadas_lechones')
+    op.drop_index(op.f('ix_tratamientos_veterinarios_fecha'), table_name='tratamientos_veterinarios')
@@ -0,0 +1,45 @@
+"""añade_tabla_reportes
+
+Revision ID: a9ab69a8947f
+Revises: 8d3cd013bfdc
+Create Date: 2026-10-19 17:10:14.653493
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9ab69a8947f'
+down_revision: Union[str, Sequence[str], None] = '8d3cd013bfdc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('reportes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('formato', sa.String(), nullable=False),
+    sa.Column('fecha_inicio', sa.Date(), nullable=False),
+    sa.Column('fecha_fin', sa.Date(), nullable=False),
+    sa.Column('estado', sa.String(), nullable=False),
+    sa.Column('ruta_archivo', sa.String(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.Column('completado_en', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reportes_id'), 'reportes', ['id'], unique=False)
+    op.create_index(op.f('ix_reportes_user_id'), 'reportes', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_reportes_user_id'), table_name='reportes')
+    op.drop_index(op.f('ix_reportes_id'), table_name='reportes')
+    op.drop_table('reportes')
@@ -0,0 +1,51 @@
+"""añade_tabla_trabajos
+
+Revision ID: b1dffefb8424
+Revises: a9ab69a8947f
+Create Date: 2026-10-19 17:11:42.736328
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b1dffefb8424'
+down_revision: Union[str, Sequence[str], None] = 'a9ab69a8947f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('trabajos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tipo', sa.String(), nullable=False),
+    sa.Column('parametros', sa.JSON(), nullable=True),
+    sa.Column('estado', sa.String(), nullable=False),
+    sa.Column('intentos', sa.Integer(), nullable=False),
+    sa.Column('max_intentos', sa.Integer(), nullable=False),
+    sa.Column('resultado', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('worker', sa.String(), nullable=True),
+    sa.Column('programado_para', sa.DateTime(), nullable=False),
+    sa.Column('creado_en', sa.DateTime(), nullable=False),
+    sa.Column('iniciado_en', sa.DateTime(), nullable=True),
+    sa.Column('finalizado_en', sa.DateTime(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_trabajos_id'), 'trabajos', ['id'], unique=False)
+    op.create_index(op.f('ix_trabajos_user_id'), 'trabajos', ['user_id'], unique=False)
+    op.create_index('ix_trabajos_estado_programado_para', 'trabajos', ['estado', 'programado_para'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_trabajos_estado_programado_para', table_name='trabajos')
+    op.drop_index(op.f('ix_trabajos_user_id'), table_name='trabajos')
+    op.drop_index(op.f('ix_trabajos_id'), table_name='trabajos')
+    op.drop_table('trabajos')
@@ -0,0 +1,58 @@
+"""añade_sincronizacion_incremental
+
+Revision ID: e162abdcf8df
+Revises: 7fa58a159f07
+Create Date: 2026-10-19 17:38:51.359566
+
+"""
+from typing import Sequence, Union
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e162abdcf8df'
+down_revision: Union[str, Sequence[str], None] = '7fa58a159f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tablas del hato que se sincronizan con GET /sync
+TABLAS = ['cerdas_reproductoras', 'sementales', 'camadas_lechones', 'lotes_engorde', 'tratamientos_veterinarios']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('eliminaciones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entidad', sa.String(), nullable=False),
+    sa.Column('entidad_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('eliminado_en', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_eliminaciones_eliminado_en_id', 'eliminaciones', ['eliminado_en', 'id'], unique=False)
+    op.create_index(op.f('ix_eliminaciones_user_id'), 'eliminaciones', ['user_id'], unique=False)
+
+    # Los registros existentes quedan marcados como actualizados en el momento de la migración
+    # (en UTC y con el mismo formato que escribe la aplicación, para que el orden del cursor sea correcto)
+    ahora = datetime.utcnow()
+    for tabla in TABLAS:
+        op.add_column(tabla, sa.Column('actualizado_en', sa.DateTime(), nullable=True))
+        op.execute(sa.table(tabla, sa.column('actualizado_en', sa.DateTime())).update().values(actualizado_en=ahora))
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.alter_column('actualizado_en', existing_type=sa.DateTime(), nullable=False)
+        op.create_index(op.f(f'ix_{tabla}_actualizado_en'), tabla, ['actualizado_en'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for tabla in TABLAS:
+        op.drop_index(op.f(f'ix_{tabla}_actualizado_en'), table_name=tabla)
+        with op.batch_alter_table(tabla) as batch_op:
+            batch_op.drop_column('actualizado_en')
+    op.drop_index(op.f('ix_eliminaciones_user_id'), table_name='eliminaciones')
+    op.drop_index('ix_eliminaciones_eliminado_en_id', table_name='eliminaciones')
+    op.drop_table('eliminaciones')
@@ -0,0 +1,359 @@
+# app/archivo_movimientos.py
+
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, inspect, text
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+
+logger = logging.getLogger("porcigest")
+
+# Columnas que se guardan de cada movimiento archivado
+COLUMNAS = ["id", "usuario_id", "usuario_nombre", "accion", "modulo", "descripcion", "entidad_tipo",
+            "entidad_id", "tipo_movimiento", "fecha_movimiento", "ip_address", "user_agent"]
+
+_lock = threading.Lock()
+_cache_indice = {"mtime": None, "indice": None}
+
+
+# --- UTILIDADES DE MESES ---
+
+def _inicio_mes(fecha):
+    return date(fecha.year, fecha.month, 1)
+
+
+def _siguiente_mes(mes: date):
+    return date(mes.year + mes.month // 12, mes.month % 12 + 1, 1)
+
+
+def _restar_meses(mes: date, meses: int):
+    total = mes.year * 12 + mes.month - 1 - meses
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _clave(mes: date):
+    return f"{mes.year:04d}-{mes.month:02d}"
+
+
+def limite_retencion(hoy: date = None):
+    """Primer día del mes más antiguo que se conserva en la tabla; lo anterior se archiva"""
+    return _restar_meses(_inicio_mes(hoy or date.today()), get_settings().movimientos_retencion_meses)
+
+
+# --- ÍNDICE DEL ARCHIVO ---
+
+def _ruta_indice():
+    return os.path.join(get_settings().archivo_dir, "indice.json")
+
+
+def leer_indice():
+    """
+    Índice de los meses archivados: {"archivado_hasta": "YYYY-MM-DD", "meses": {"YYYY-MM": {...}}}.
+    Cada mes guarda sus archivos, el rango de IDs y los conteos por tipo, módulo y usuario.
+    Se relee solo cuando el archivo cambia.
+    """
+    ruta = _ruta_indice()
+    try:
+        mtime = os.path.getmtime(ruta)
+    except OSError:
+        return {"archivado_hasta": None, "meses": {}}
+    with _lock:
+        if _cache_indice["mtime"] != mtime:
+            with open(ruta, encoding="utf-8") as archivo:
+                _cache_indice["indice"] = json.load(archivo)
+            _cache_indice["mtime"] = mtime
+        return _cache_indice["indice"]
+
+
+def _guardar_indice(indice):
+    ruta = _ruta_indice()
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(indice, archivo, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def archivado_hasta():
+    """Fecha (datetime) antes de la cual los movimientos ya no están en la tabla, o None"""
+    valor = leer_indice().get("archivado_hasta")
+    return datetime.fromisoformat(valor) if valor else None
+
+
+# --- PARTICIONES (POSTGRESQL) ---
+
+def _particionada(db: Session):
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid WHERE c.relname = 'movimientos'"
+    )).first() is not None
+
+
+def _nombre_particion(mes: date):
+    return f"movimientos_{mes.year:04d}_{mes.month:02d}"
+
+
+def _existe_tabla(db: Session, nombre: str):
+    # Con la conexión de la sesión: ve lo creado en la transacción en curso
+    return inspect(db.connection()).has_table(nombre)
+
+
+def _crear_particion(db: Session, mes: date):
+    nombre = _nombre_particion(mes)
+    limites = f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{_siguiente_mes(mes).isoformat()}')"
+    rango = f"fecha_movimiento >= '{mes.isoformat()}' AND fecha_movimiento < '{_siguiente_mes(mes).isoformat()}'"
+    en_default = _existe_tabla(db, "movimientos_default") and db.execute(
+        text(f"SELECT 1 FROM movimientos_default WHERE {rango} LIMIT 1")
+    ).first() is not None
+    if not en_default:
+        db.execute(text(f"CREATE TABLE {nombre} PARTITION OF movimientos {limites}"))
+        return
+    # Si la partición llegó tarde, la default ya tiene filas del mes y PostgreSQL rechaza el CREATE:
+    # se separa la default, se crea la partición, se le pasan esas filas y se vuelve a adjuntar
+    db.execute(text("ALTER TABLE movimientos DETACH PARTITION movimientos_default"))
+    db.execute(text(f"CREATE TABLE {nombre} PARTITION OF movimientos {limites}"))
+    db.execute(text(f"INSERT INTO movimientos SELECT * FROM movimientos_default WHERE {rango}"))
+    db.execute(text(f"DELETE FROM movimientos_default WHERE {rango}"))
+    db.execute(text("ALTER TABLE movimientos ATTACH PARTITION movimientos_default DEFAULT"))
+
+
+def asegurar_particiones(db: Session, meses_adelante: int = 3):
+    """
+    En PostgreSQL crea las particiones mensuales del mes actual y los próximos. En SQLite no hace nada.
+    Se llama al arrancar la API y el worker (y al archivar), así no depende de que corra el archivado.
+    """
+    if not _particionada(db):
+        return []
+    # Varios procesos arrancan a la vez: el lock serializa la comprobación y la creación
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('porcigest_particiones_movimientos'))"))
+    creadas = []
+    mes = _inicio_mes(date.today())
+    for _ in range(meses_adelante + 1):
+        if not _existe_tabla(db, _nombre_particion(mes)):
+            _crear_particion(db, mes)
+            creadas.append(_nombre_particion(mes))
+        mes = _siguiente_mes(mes)
+    db.commit()
+    return creadas
+
+
+def mantener_particiones():
+    """asegurar_particiones con su propia sesión; un fallo se registra y no detiene al proceso que arranca"""
+    from .database import SessionLocal
+    db = SessionLocal()
+    try:
+        creadas = asegurar_particiones(db)
+        if creadas:
+            logger.info("Particiones de movimientos creadas: %s", ", ".join(creadas))
+    except Exception:
+        db.rollback()
+        logger.exception("No se pudieron crear las particiones de movimientos")
+    finally:
+        db.close()
+
+
+# --- ARCHIVADO ---
+
+def _a_dict(movimiento):
+    fila = {columna: getattr(movimiento, columna) for columna in COLUMNAS}
+    fila["fecha_movimiento"] = fila["fecha_movimiento"].isoformat()
+    return fila
+
+
+def _archivar_mes(db: Session, mes: date, indice):
+    """Vuelca un mes a un archivo JSONL comprimido, lo registra en el índice y lo borra de la tabla"""
+    desde = datetime.combine(mes, datetime.min.time())
+    hasta = datetime.combine(_siguiente_mes(mes), datetime.min.time())
+    entrada = indice["meses"].setdefault(_clave(mes), {
+        "archivos": [], "filas": 0, "min_id": None, "max_id": None,
+        "por_tipo": {}, "por_modulo": {}, "por_usuario": {}
+    })
+    nombre = f"movimientos_{_clave(mes)}" + (f"_{len(entrada['archivos']) + 1}" if entrada["archivos"] else "")
+    ruta = os.path.join(get_settings().archivo_dir, f"{nombre}.jsonl.gz")
+
+    filas = 0
+    min_id = max_id = None
+    por_tipo, por_modulo, por_usuario = Counter(), Counter(), Counter()
+    query = db.query(models.Movimiento).filter(
+        models.Movimiento.fecha_movimiento >= desde,
+        models.Movimiento.fecha_movimiento < hasta
+    ).order_by(models.Movimiento.id)
+    with gzip.open(ruta + ".tmp", "wt", encoding="utf-8") as archivo:
+        for movimiento in query.yield_per(5000):
+            archivo.write(json.dumps(_a_dict(movimiento), ensure_ascii=False) + "\n")
+            filas += 1
+            min_id = movimiento.id if min_id is None else min_id
+            max_id = movimiento.id
+            por_tipo[movimiento.tipo_movimiento] += 1
+            por_modulo[movimiento.modulo] += 1
+            por_usuario[movimiento.usuario_nombre] += 1
+    if filas == 0:
+        os.remove(ruta + ".tmp")
+        return 0
+    os.replace(ruta + ".tmp", ruta)
+
+    entrada["archivos"].append(os.path.basename(ruta))
+    entrada["filas"] += filas
+    entrada["min_id"] = min_id if entrada["min_id"] is None else min(entrada["min_id"], min_id)
+    entrada["max_id"] = max_id if entrada["max_id"] is None else max(entrada["max_id"], max_id)
+    for campo, conteo in (("por_tipo", por_tipo), ("por_modulo", por_modulo), ("por_usuario", por_usuario)):
+        entrada[campo] = dict(Counter(entrada[campo]) + conteo)
+    # El índice se guarda antes de borrar: si algo falla después, las filas siguen en la tabla
+    _guardar_indice(indice)
+
+    particion = _nombre_particion(mes)
+    if _particionada(db) and _existe_tabla(db, particion):
+        db.execute(text(f"ALTER TABLE movimientos DETACH PARTITION {particion}"))
+        db.execute(text(f"DROP TABLE {particion}"))
+    else:
+        db.query(models.Movimiento).filter(
+            models.Movimiento.fecha_movimiento >= desde,
+            models.Movimiento.fecha_movimiento < hasta
+        ).delete(synchronize_session=False)
+    db.commit()
+    return filas
+
+
+def archivar_movimientos(db: Session, hoy: date = None):
+    """
+    Política de retención: los meses anteriores a MOVIMIENTOS_RETENCION_MESES se mueven de la tabla
+    a archivos comprimidos (uno por mes) con un índice pequeño. Devuelve un resumen.
+    """
+    limite = limite_retencion(hoy)
+    mas_antiguo = db.query(func.min(models.Movimiento.fecha_movimiento)).filter(
+        models.Movimiento.fecha_movimiento < datetime.combine(limite, datetime.min.time())
+    ).scalar()
+
+    os.makedirs(get_settings().archivo_dir, exist_ok=True)
+    indice = json.loads(json.dumps(leer_indice()))  # copia: el índice en caché no se modifica
+    meses = []
+    filas = 0
+    mes = _inicio_mes(mas_antiguo) if mas_antiguo else limite
+    while mes < limite:
+        archivadas = _archivar_mes(db, mes, indice)
+        if archivadas:
+            meses.append(_clave(mes))
+            filas += archivadas
+        mes = _siguiente_mes(mes)
+
+    if not indice.get("archivado_hasta") or indice["archivado_hasta"] < limite.isoformat():
+        indice["archivado_hasta"] = limite.isoformat()
+        _guardar_indice(indice)
+    return {"meses": meses, "filas": filas, "archivado_hasta": indice["archivado_hasta"]}
+
+
+# --- CONSULTA DEL ARCHIVO ---
+
+def _leer_mes(clave: str):
+    directorio = get_settings().archivo_dir
+    for nombre in leer_indice()["meses"][clave]["archivos"]:
+        with gzip.open(os.path.join(directorio, nombre), "rt", encoding="utf-8") as archivo:
+            for linea in archivo:
+                fila = json.loads(linea)
+                fila["fecha_movimiento"] = datetime.fromisoformat(fila["fecha_movimiento"])
+                yield fila
+
+
+def _claves_en_rango(desde: datetime, hasta: datetime):
+    claves = sorted(leer_indice()["meses"], reverse=True)
+    return [clave for clave in claves if _clave(desde.date()) <= clave <= _clave(hasta.date())]
+
+
+def _cumple(fila, filters, desde, hasta):
+    if not desde <= fila["fecha_movimiento"] <= hasta:
+        return False
+    if filters.search:
+        termino = filters.search.lower()
+        if not any(termino in (fila[campo] or "").lower() for campo in ("usuario_nombre", "accion", "descripcion")):
+            return False
+    if filters.modulo and fila["modulo"] != filters.modulo:
+        return False
+    if filters.tipo_movimiento and fila["tipo_movimiento"] != filters.tipo_movimiento:
+        return False
+    if filters.usuario_id and fila["usuario_id"] != filters.usuario_id:
+        return False
+    return True
+
+
+def _conteo_del_indice(entrada, clave: str, filters, desde: datetime, hasta: datetime):
+    """
+    Filas del mes que cumplen los filtros según los conteos del índice, sin leer el archivo.
+    None si hay que leerlo: mes parcial en el rango de fechas o filtros que el índice no cuenta.
+    """
+    inicio = datetime.strptime(clave, "%Y-%m")
+    fin = datetime.combine(_siguiente_mes(inicio.date()), datetime.min.time())
+    if desde > inicio or hasta + timedelta(microseconds=1) < fin:
+        return None
+    if filters.search or filters.usuario_id or (filters.modulo and filters.tipo_movimiento):
+        return None
+    if filters.modulo:
+        return entrada["por_modulo"].get(filters.modulo, 0)
+    if filters.tipo_movimiento:
+        return entrada["por_tipo"].get(filters.tipo_movimiento, 0)
+    return entrada["filas"]
+
+
+def consultar_archivo(filters, desde: datetime, hasta: datetime, omitir: int = 0, cantidad: int = 0):
+    """
+    Página de movimientos archivados que cumplen los filtros entre dos fechas, del más reciente al más antiguo:
+    se saltan `omitir` filas y se devuelven hasta `cantidad`. Devuelve (movimientos, total).
+    Los meses se recorren del más reciente al más antiguo y solo se descomprimen los que aportan filas a la
+    página o cuyo conteo no está en el índice; el resto se cuenta con indice.json.
+    """
+    meses = leer_indice()["meses"]
+    pagina = []
+    total = 0
+    for clave in _claves_en_rango(desde, hasta):
+        conteo = _conteo_del_indice(meses[clave], clave, filters, desde, hasta)
+        falta_pagina = len(pagina) < cantidad
+        if conteo is not None and (not falta_pagina or total + conteo <= omitir):
+            total += conteo
+            continue
+        filas = (fila for fila in _leer_mes(clave) if _cumple(fila, filters, desde, hasta))
+        if not falta_pagina:
+            total += sum(1 for _ in filas)
+            continue
+        # Solo se ordena un mes: el archivo está en orden de ID y la página va por fecha descendente
+        filas = sorted(filas, key=lambda fila: (fila["fecha_movimiento"], fila["id"]), reverse=True)
+        inicio = max(0, omitir - total)
+        pagina.extend(models.Movimiento(**fila) for fila in filas[inicio:inicio + cantidad - len(pagina)])
+        total += len(filas)
+    return pagina, total
+
+
+def buscar_en_archivo(movimiento_id: int):
+    """Busca un movimiento archivado por ID usando el rango de IDs de cada mes"""
+    for clave, entrada in leer_indice()["meses"].items():
+        if entrada["min_id"] <= movimiento_id <= entrada["max_id"]:
+            for fila in _leer_mes(clave):
+                if fila["id"] == movimiento_id:
+                    return models.Movimiento(**fila)
+    return None
+
+
+def estadisticas_archivo(desde: datetime):
+    """Conteos por tipo, módulo y usuario de lo archivado desde una fecha (meses completos desde el índice)"""
+    por_tipo, por_modulo, por_usuario = Counter(), Counter(), Counter()
+    for clave, entrada in leer_indice()["meses"].items():
+        if clave < _clave(desde.date()):
+            continue
+        if clave > _clave(desde.date()) or desde == datetime.combine(_inicio_mes(desde), datetime.min.time()):
+            por_tipo.update(entrada["por_tipo"])
+            por_modulo.update(entrada["por_modulo"])
+            por_usuario.update(entrada["por_usuario"])
+            continue
+        # Mes parcial: hay que leer el archivo
+        for fila in _leer_mes(clave):
+            if fila["fecha_movimiento"] >= desde:
+                por_tipo[fila["tipo_movimiento"]] += 1
+                por_modulo[fila["modulo"]] += 1
+                por_usuario[fila["usuario_nombre"]] += 1
+    return por_tipo, por_modulo, por_usuario
@@ -0,0 +1,52 @@
+# app/cache.py
+import threading
+import time
+
+
+class CacheTTL:
+    """Caché en memoria con expiración corta para consultas de solo lectura muy frecuentes"""
+
+    def __init__(self, ttl_segundos: float = 30, max_entradas: int = 256):
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = {}
+        self._lock = threading.Lock()
+
+    def obtener(self, clave):
+        """Devuelve el valor guardado o None si no existe o ya expiró"""
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[0] < time.monotonic():
+                self._datos.pop(clave, None)
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            if len(self._datos) >= self.max_entradas and clave not in self._datos:
+                # Descartamos la entrada más antigua para no crecer sin límite
+                self._datos.pop(next(iter(self._datos)))
+            self._datos[clave] = (time.monotonic() + self.ttl_segundos, valor)
+
+    def obtener_o_calcular(self, clave, calcular):
+        """Devuelve el valor en caché o lo calcula con `calcular()` y lo guarda"""
+        valor = self.obtener(clave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def invalidar(self, clave=None):
+        """Elimina una entrada concreta o toda la caché si no se indica clave"""
+        with self._lock:
+            if clave is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
+
+    def __len__(self):
+        return len(self._datos)
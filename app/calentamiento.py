@@ -0,0 +1,62 @@
+# app/calentamiento.py
+
+import logging
+import time
+from datetime import date, timedelta
+
+from . import crud, schemas
+from .diccionario import diccionario
+from .database import engine, engine_lectura, SessionLectura
+
+logger = logging.getLogger("porcigest")
+
+
+def _llenar_pool(motor):
+    """Abre tantas conexiones como admite el pool y las devuelve, para no pagar la conexión en la primera petición"""
+    tamano = motor.pool.size() if hasattr(motor.pool, "size") else 1
+    conexiones = []
+    try:
+        for _ in range(tamano):
+            conexiones.append(motor.connect())
+    finally:
+        for conexion in conexiones:
+            conexion.close()
+    return len(conexiones)
+
+
+def _consultas_frecuentes(db):
+    """
+    Ejecuta una vez las consultas de los endpoints más usados para que SQLAlchemy
+    deje compiladas sus sentencias en la caché y se carguen los mappers
+    """
+    hoy = date.today()
+    diccionario.cargar(db)
+    crud.get_user_by_documento(db, numero_documento="")
+    crud.get_cerdas(db, limit=1)
+    crud.get_sementales(db, limit=1)
+    crud.get_camadas(db, limit=1)
+    crud.get_lotes_engorde(db, limit=1)
+    crud.get_tratamientos(db, limit=1)
+    crud.get_calendario_eventos(db, hoy, hoy + timedelta(days=7), limit=1)
+    crud.get_movimientos(db, schemas.MovimientoFilters(page=1, size=1))
+    crud.get_estadisticas_movimientos(db, dias=30)
+
+
+def calentar():
+    """Prepara el worker antes de aceptar tráfico: pool de conexiones, consultas compiladas y datos de referencia"""
+    from .routers.dashboard import cache_resumen
+    import bcrypt  # noqa: F401  (se importa de forma diferida al verificar la primera contraseña)
+
+    inicio = time.perf_counter()
+    conexiones = _llenar_pool(engine)
+    if engine_lectura is not engine:
+        conexiones += _llenar_pool(engine_lectura)
+    # Las consultas de lectura las atiende la réplica cuando hay una configurada
+    db = SessionLectura()
+    try:
+        _consultas_frecuentes(db)
+        # Resumen global del dashboard, la vista que se abre al iniciar sesión
+        cache_resumen().obtener_o_calcular(("resumen", None), lambda: crud.get_resumen_dashboard(db))
+    finally:
+        db.close()
+    logger.info("Worker calentado en %.0f ms (%d conexiones en el pool)", (time.perf_counter() - inicio) * 1000, conexiones)
@@ -0,0 +1,117 @@
+# app/compresion.py
+
+import gzip
+
+from .config import get_settings
+
+# Tipos de contenido que vale la pena comprimir (los PDF e imágenes ya vienen comprimidos)
+TIPOS_COMPRIMIBLES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+
+
+def _brotli():
+    """Brotli es una dependencia opcional; sin ella solo se ofrece gzip"""
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def brotli_disponible():
+    return _brotli() is not None
+
+
+def elegir_codificacion(accept_encoding: str):
+    """Elige 'br', 'gzip' o None según la cabecera Accept-Encoding (respetando los valores q)"""
+    preferencias = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                calidad = float(parametros[2:])
+            except ValueError:
+                calidad = 0.0
+        if nombre:
+            preferencias[nombre.strip()] = calidad
+
+    candidatas = ["br", "gzip"] if brotli_disponible() else ["gzip"]
+    comodin = preferencias.get("*", 0.0)
+    puntuadas = [(preferencias.get(nombre, comodin), -i, nombre) for i, nombre in enumerate(candidatas)]
+    calidad, _, nombre = max(puntuadas)
+    return nombre if calidad > 0 else None
+
+
+def comprimir(cuerpo: bytes, codificacion: str, nivel: int):
+    if codificacion == "br":
+        return _brotli().compress(cuerpo, quality=nivel)
+    # mtime=0 para que la misma respuesta produzca siempre los mismos bytes
+    return gzip.compress(cuerpo, compresslevel=nivel, mtime=0)
+
+
+def _cabecera(cabeceras, nombre: bytes):
+    for clave, valor in cabeceras:
+        if clave.lower() == nombre:
+            return valor.decode("latin-1")
+    return None
+
+
+class MiddlewareCompresion:
+    """
+    Middleware ASGI que comprime con brotli o gzip las respuestas de un solo bloque
+    (las de la API) que superan el umbral configurado. Las respuestas en streaming,
+    como los eventos SSE o los archivos grandes, se envían tal cual.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegir_codificacion(_cabecera(scope["headers"], b"accept-encoding") or "")
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        settings = get_settings()
+        inicio = {}
+        en_streaming = [False]
+
+        async def send_comprimido(message):
+            if message["type"] == "http.response.start":
+                inicio.update(message)  # se retiene hasta saber si el cuerpo se comprime
+                return
+            if message["type"] != "http.response.body" or en_streaming[0]:
+                await send(message)
+                return
+
+            cabeceras = list(inicio.get("headers", []))
+            cuerpo = message.get("body", b"")
+            tipo = _cabecera(cabeceras, b"content-type") or ""
+            if message.get("more_body", False):
+                en_streaming[0] = True
+            elif (
+                len(cuerpo) >= settings.compresion_minimo_bytes
+                and _cabecera(cabeceras, b"content-encoding") is None
+                and tipo.startswith(TIPOS_COMPRIMIBLES)
+            ):
+                nivel = settings.compresion_nivel_brotli if codificacion == "br" else settings.compresion_nivel_gzip
+                cuerpo = comprimir(cuerpo, codificacion, nivel)
+                cabeceras = [(clave, valor) for clave, valor in cabeceras if clave.lower() != b"content-length"]
+                cabeceras += [
+                    (b"content-encoding", codificacion.encode()),
+                    (b"content-length", str(len(cuerpo)).encode()),
+                ]
+                message = {**message, "body": cuerpo}
+
+            # La respuesta depende de Accept-Encoding aunque esta vez no se haya comprimido
+            if _cabecera(cabeceras, b"vary") is None:
+                cabeceras.append((b"vary", b"Accept-Encoding"))
+            await send({**inicio, "headers": cabeceras})
+            await send(message)
+
+        await self.app(scope, receive, send_comprimido)
@@ -1,12 +1,49 @@
 # app/config.py
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    refresh_token_expire_days: int = 30
+    debug: bool = False
+    dashboard_cache_ttl: int = 30
+    reportes_dir: str = "reportes"
+    exportaciones_dir: str = "exportaciones"
+    importaciones_dir: str = "importaciones"
+    trabajos_max_intentos: int = 3
+    trabajos_timeout_minutos: int = 60
+    sql_umbral_repeticiones: int = 5
+    verificar_migraciones: bool = True
+    calentar_al_iniciar: bool = True
+    compresion_minimo_bytes: int = 1024
+    compresion_nivel_gzip: int = 6
+    compresion_nivel_brotli: int = 4
+    limites_activos: bool = True
+    limite_peticiones_usuario_minuto: int = 300
+    limite_rafaga_usuario: int = 60
+    limite_peticiones_ruta_costosa_minuto: int = 30
+    limite_rafaga_ruta_costosa: int = 10
+    limite_concurrencia_costosa: int = 2
+    limite_lista_costosa: int = 500
+    replica_ventana_segundos: int = 10
+    movimientos_retencion_meses: int = 12
+    archivo_dir: str = "archivo"
+    sse_latido_segundos: int = 15
+    sync_margen_segundos: int = 5
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+@lru_cache
+def get_settings() -> Settings:
+    """La configuración se lee del entorno la primera vez que se necesita, no al importar"""
+    return Settings()
+
+def __getattr__(nombre):
+    # Compatibilidad con `from app.config import settings`
+    if nombre == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -1,37 +1,122 @@
 # app/crud.py
 
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_, and_, func
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy import or_, and_, func, select, literal, cast, union_all, String, DateTime, insert, delete, update, exists
 from datetime import datetime, date, timedelta
-from . import models, schemas, security
+from collections import Counter
+from . import models, schemas, security, archivo_movimientos
+from .diccionario import diccionario
+
+# Las funciones que escriben solo hacen flush (para tener IDs y detectar errores pronto): confirma quien
+# las llama, una sola vez al final, para que el cambio y su movimiento se guarden juntos o no se guarden.
+
+def _de_propietario(query, modelo, user_id: int = None):
+    """Restringe la consulta a los registros del usuario indicado (usa los índices por user_id)"""
+    if user_id is not None:
+        query = query.filter(modelo.user_id == user_id)
+    return query
+
+class ConflictoDeVersion(Exception):
+    """El registro cambió desde que el cliente lo leyó (el PUT responde 409)"""
+    def __init__(self, version_actual: int):
+        super().__init__(f"El registro fue modificado por otra persona (versión actual {version_actual}); vuelve a cargarlo")
+        self.version_actual = version_actual
+
+class PrecondicionRequerida(Exception):
+    """El PUT no indicó qué versión modifica (el PUT responde 428)"""
+    def __init__(self):
+        super().__init__("Indica la versión que modificas: cabecera If-Match con el ETag del GET o `version` en el cuerpo")
+
+# If-Match: * — el cliente acepta sobrescribir cualquier versión (última escritura gana, a propósito)
+CUALQUIER_VERSION = "*"
+
+def version_de_if_match(valor: str = None):
+    """Versión de una cabecera If-Match ("3", W/"3"), CUALQUIER_VERSION si es "*" o None si no hay. Lanza ValueError si no es válida"""
+    if valor is None:
+        return None
+    if valor.strip() == "*":
+        return CUALQUIER_VERSION
+    try:
+        return int(valor.strip().removeprefix("W/").strip('"'))
+    except ValueError:
+        raise ValueError("If-Match debe ser la versión del registro, p. ej. \"3\"") from None
+
+def _actualizar_versionado(db: Session, modelo, registro_id: int, cambios, version=None):
+    """
+    Aplica los cambios con un solo UPDATE ... WHERE id AND version RETURNING: solo se escribe si nadie modificó
+    el registro desde que el cliente lo leyó. La versión (de If-Match o del cuerpo) es obligatoria; con
+    If-Match: * gana la última escritura. Devuelve None si el registro no existe, lanza PrecondicionRequerida
+    si no hay versión y ConflictoDeVersion si cambió.
+    """
+    datos = cambios.dict(exclude_unset=True)
+    version_cuerpo = datos.pop("version", None)
+    version = version if version is not None else version_cuerpo
+    if version is None:
+        raise PrecondicionRequerida()
+    condiciones = [modelo.id == registro_id]
+    if version != CUALQUIER_VERSION:
+        condiciones.append(modelo.version == version)
+    # Un UPDATE masivo del ORM no pasa por version_id_col: la versión se incrementa aquí.
+    # actualizado_en va explícito: el onupdate de la columna no se sincroniza con un objeto que ya esté en la sesión
+    sentencia = update(modelo).where(*condiciones).values(
+        **datos, version=modelo.version + 1, actualizado_en=datetime.utcnow()
+    ).returning(modelo)
+    registro = db.scalars(sentencia, execution_options={"populate_existing": True}).one_or_none()
+    if registro is None:
+        # Solo en el camino de fallo: distinguir "no existe" (404) de "cambió" (409)
+        version_actual = db.execute(select(modelo.version).where(modelo.id == registro_id)).scalar()
+        if version_actual is None:
+            return None
+        raise ConflictoDeVersion(version_actual)
+    return registro
+
+# --- COMPROBACIONES DE EXISTENCIA (validación de claves foráneas) ---
+
+def existe(db: Session, modelo, registro_id: int):
+    """SELECT EXISTS sobre la clave primaria: no carga la fila ni sus relaciones"""
+    return db.scalar(select(exists().where(modelo.id == registro_id)))
+
+def ids_existentes(db: Session, modelo, ids):
+    """Cuáles de los IDs existen, leyendo solo la columna id (para cargas en lote)"""
+    ids = list(set(ids))
+    encontrados = set()
+    for inicio in range(0, len(ids), 1000):  # IN acotado por el límite de parámetros de SQLite
+        encontrados.update(db.scalars(select(modelo.id).where(modelo.id.in_(ids[inicio:inicio + 1000]))))
+    return encontrados
+
+def referencias_faltantes(db: Session, **referencias):
+    """
+    Comprueba varias claves foráneas en una sola consulta (un EXISTS por referencia).
+    `referencias`: campo=(modelo, id); las que vienen a None se ignoran. Devuelve los campos que no existen.
+    """
+    pendientes = {campo: (modelo, registro_id) for campo, (modelo, registro_id) in referencias.items() if registro_id is not None}
+    if not pendientes:
+        return []
+    fila = db.execute(select(*[
+        exists().where(modelo.id == registro_id).label(campo) for campo, (modelo, registro_id) in pendientes.items()
+    ])).one()
+    return [campo for campo in pendientes if not fila._mapping[campo]]
 
 # --- Operaciones CRUD para Cerdas Reproductoras ---
 
 def get_cerda_by_codigo(db: Session, codigo_id: str):
     return db.query(models.CerdaReproductora).filter(models.CerdaReproductora.codigo_id == codigo_id).first()
 
-def get_cerda(db: Session, cerda_id: int):
-    return db.query(models.CerdaReproductora).options(joinedload(models.CerdaReproductora.propietario)).filter(models.CerdaReproductora.id == cerda_id).first()
+def get_cerda(db: Session, cerda_id: int, user_id: int = None):
+    return _de_propietario(db.query(models.CerdaReproductora).options(joinedload(models.CerdaReproductora.propietario)).filter(models.CerdaReproductora.id == cerda_id), models.CerdaReproductora, user_id).first()
 
-def get_cerdas(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.CerdaReproductora).options(joinedload(models.CerdaReproductora.propietario)).offset(skip).limit(limit).all()
+def get_cerdas(db: Session, skip: int = 0, limit: int = 100, user_id: int = None):
+    return _de_propietario(db.query(models.CerdaReproductora).options(joinedload(models.CerdaReproductora.propietario)), models.CerdaReproductora, user_id).offset(skip).limit(limit).all()
 
 def create_cerda(db: Session, cerda: schemas.CerdaCreate, user_id: int):
     db_cerda = models.CerdaReproductora(**cerda.dict(), user_id=user_id)
     db.add(db_cerda)
-    db.commit()
-    db.refresh(db_cerda)
+    db.flush()
     return db_cerda
 
-def update_cerda(db: Session, cerda_id: int, cerda_update: schemas.CerdaUpdate):
-    db_cerda = db.query(models.CerdaReproductora).filter(models.CerdaReproductora.id == cerda_id).first()
-    if not db_cerda: return None
-    update_data = cerda_update.dict(exclude_unset=True)
-    for key, value in update_data.items(): setattr(db_cerda, key, value)
-    db.add(db_cerda)
-    db.commit()
-    db.refresh(db_cerda)
-    return db_cerda
+def update_cerda(db: Session, cerda_id: int, cerda_update: schemas.CerdaUpdate, version: int = None):
+    return _actualizar_versionado(db, models.CerdaReproductora, cerda_id, cerda_update, version)
 
 def delete_cerda(db: Session, cerda_id: int):
     # Cargamos la cerda con su relación propietario ANTES de eliminar
@@ -44,37 +129,29 @@ def delete_cerda(db: Session, cerda_id: int):
     
     # Eliminamos el objeto de la base de datos
     db.delete(db_cerda)
-    db.commit()
+    db.flush()
     
     return db_cerda
 
 # --- OPERACIONES CRUD PARA SEMENTALES ---
 
-def get_semental(db: Session, semental_id: int):
-    return db.query(models.Semental).options(joinedload(models.Semental.propietario)).filter(models.Semental.id == semental_id).first()
+def get_semental(db: Session, semental_id: int, user_id: int = None):
+    return _de_propietario(db.query(models.Semental).options(joinedload(models.Semental.propietario)).filter(models.Semental.id == semental_id), models.Semental, user_id).first()
 
 def get_semental_by_nombre(db: Session, nombre: str):
     return db.query(models.Semental).filter(models.Semental.nombre == nombre).first()
 
-def get_sementales(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Semental).options(joinedload(models.Semental.propietario)).offset(skip).limit(limit).all()
+def get_sementales(db: Session, skip: int = 0, limit: int = 100, user_id: int = None):
+    return _de_propietario(db.query(models.Semental).options(joinedload(models.Semental.propietario)), models.Semental, user_id).offset(skip).limit(limit).all()
 
 def create_semental(db: Session, semental: schemas.SementalCreate, user_id: int):
     db_semental = models.Semental(**semental.dict(), user_id=user_id)
     db.add(db_semental)
-    db.commit()
-    db.refresh(db_semental)
+    db.flush()
     return db_semental
 
-def update_semental(db: Session, semental_id: int, semental_update: schemas.SementalUpdate):
-    db_semental = db.query(models.Semental).filter(models.Semental.id == semental_id).first()
-    if not db_semental: return None
-    update_data = semental_update.dict(exclude_unset=True)
-    for key, value in update_data.items(): setattr(db_semental, key, value)
-    db.add(db_semental)
-    db.commit()
-    db.refresh(db_semental)
-    return db_semental
+def update_semental(db: Session, semental_id: int, semental_update: schemas.SementalUpdate, version: int = None):
+    return _actualizar_versionado(db, models.Semental, semental_id, semental_update, version)
 
 def delete_semental(db: Session, semental_id: int):
     # Cargamos el semental con su relación propietario ANTES de eliminar
@@ -87,34 +164,46 @@ def delete_semental(db: Session, semental_id: int):
     
     # Eliminamos el objeto de la base de datos
     db.delete(db_semental)
-    db.commit()
+    db.flush()
     
     return db_semental
 
 # --- OPERACIONES CRUD PARA CAMADAS DE LECHONES ---
 
-def create_camada(db: Session, camada: schemas.CamadaCreate, user_id: int):
+def _asignar_relaciones(objeto, **relacionados):
+    """
+    Asocia al registro nuevo los objetos que el router ya cargó al validar las referencias, para que
+    la respuesta no tenga que volver a consultarlos. Devuelve False si falta alguno.
+    """
+    completo = True
+    for nombre, relacionado in relacionados.items():
+        if relacionado is None:
+            completo = False
+        else:
+            # La clave foránea ya viene en los datos: se fija solo el objeto, sin eventos de backref
+            # (que cargarían colecciones como camada.lote_engorde)
+            set_committed_value(objeto, nombre, relacionado)
+    return completo
+
+def create_camada(db: Session, camada: schemas.CamadaCreate, user_id: int, madre: models.CerdaReproductora = None, padre: models.Semental = None):
     db_camada = models.CamadaLechones(**camada.dict(), user_id=user_id)
+    completo = _asignar_relaciones(db_camada, madre=madre, padre=padre)
     db.add(db_camada)
-    db.commit()
-    db.refresh(db_camada)
-    return get_camada(db, db_camada.id)
+    db.flush()
+    return db_camada if completo else get_camada(db, db_camada.id)
 
-def get_camada(db: Session, camada_id: int):
-    return db.query(models.CamadaLechones).options(joinedload(models.CamadaLechones.madre), joinedload(models.CamadaLechones.padre), joinedload(models.CamadaLechones.propietario)).filter(models.CamadaLechones.id == camada_id).first()
+def get_camada(db: Session, camada_id: int, user_id: int = None):
+    return _de_propietario(db.query(models.CamadaLechones).options(joinedload(models.CamadaLechones.madre), joinedload(models.CamadaLechones.padre), joinedload(models.CamadaLechones.propietario)).filter(models.CamadaLechones.id == camada_id), models.CamadaLechones, user_id).first()
 
-def get_camadas(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.CamadaLechones).options(joinedload(models.CamadaLechones.madre), joinedload(models.CamadaLechones.padre), joinedload(models.CamadaLechones.propietario)).offset(skip).limit(limit).all()
+def get_camadas(db: Session, skip: int = 0, limit: int = 100, user_id: int = None):
+    return _de_propietario(db.query(models.CamadaLechones).options(joinedload(models.CamadaLechones.madre), joinedload(models.CamadaLechones.padre), joinedload(models.CamadaLechones.propietario)), models.CamadaLechones, user_id).offset(skip).limit(limit).all()
 
-def update_camada(db: Session, camada_id: int, camada_update: schemas.CamadaUpdate):
-    db_camada = db.query(models.CamadaLechones).filter(models.CamadaLechones.id == camada_id).first()
-    if not db_camada: return None
-    update_data = camada_update.dict(exclude_unset=True)
-    for key, value in update_data.items(): setattr(db_camada, key, value)
-    db.add(db_camada)
-    db.commit()
-    db.refresh(db_camada)
-    return get_camada(db, db_camada.id)
+def get_camadas_por_rango(db: Session, desde: date, hasta: date, skip: int = 0, limit: int = 100, user_id: int = None):
+    """Camadas nacidas entre dos fechas, ordenadas y paginadas en SQL sobre el índice de fecha_nacimiento"""
+    return _de_propietario(db.query(models.CamadaLechones).options(joinedload(models.CamadaLechones.madre), joinedload(models.CamadaLechones.padre), joinedload(models.CamadaLechones.propietario)).filter(models.CamadaLechones.fecha_nacimiento.between(desde, hasta)), models.CamadaLechones, user_id).order_by(models.CamadaLechones.fecha_nacimiento, models.CamadaLechones.id).offset(skip).limit(limit).all()
+
+def update_camada(db: Session, camada_id: int, camada_update: schemas.CamadaUpdate, version: int = None):
+    return _actualizar_versionado(db, models.CamadaLechones, camada_id, camada_update, version)
 
 def delete_camada(db: Session, camada_id: int):
     db_camada = get_camada(db, camada_id)
@@ -127,36 +216,29 @@ def delete_camada(db: Session, camada_id: int):
     _ = db_camada.padre
     
     db.delete(db_camada)
-    db.commit()
+    db.flush()
     return db_camada
 
 # --- OPERACIONES CRUD PARA LOTES DE ENGORDE ---
 
-def create_lote_engorde(db: Session, lote: schemas.LoteEngordeCreate, user_id: int):
+def create_lote_engorde(db: Session, lote: schemas.LoteEngordeCreate, user_id: int, camada_origen: models.CamadaLechones = None):
     db_lote = models.LoteEngorde(**lote.dict(), user_id=user_id)
+    completo = _asignar_relaciones(db_lote, camada_origen=camada_origen)
     db.add(db_lote)
-    db.commit()
-    db.refresh(db_lote)
-    return get_lote_engorde(db, db_lote.id)
+    db.flush()
+    return db_lote if completo else get_lote_engorde(db, db_lote.id)
 
-def get_lote_engorde(db: Session, lote_id: int):
-    return db.query(models.LoteEngorde).options(joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.madre), joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.padre), joinedload(models.LoteEngorde.propietario)).filter(models.LoteEngorde.id == lote_id).first()
+def get_lote_engorde(db: Session, lote_id: int, user_id: int = None):
+    return _de_propietario(db.query(models.LoteEngorde).options(joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.madre), joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.padre), joinedload(models.LoteEngorde.propietario)).filter(models.LoteEngorde.id == lote_id), models.LoteEngorde, user_id).first()
 
 def get_lote_engorde_by_str_id(db: Session, lote_id_str: str):
     return db.query(models.LoteEngorde).filter(models.LoteEngorde.lote_id_str == lote_id_str).first()
 
-def get_lotes_engorde(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.LoteEngorde).options(joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.madre), joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.padre), joinedload(models.LoteEngorde.propietario)).offset(skip).limit(limit).all()
+def get_lotes_engorde(db: Session, skip: int = 0, limit: int = 100, user_id: int = None):
+    return _de_propietario(db.query(models.LoteEngorde).options(joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.madre), joinedload(models.LoteEngorde.camada_origen).joinedload(models.CamadaLechones.padre), joinedload(models.LoteEngorde.propietario)), models.LoteEngorde, user_id).offset(skip).limit(limit).all()
 
-def update_lote_engorde(db: Session, lote_id: int, lote_update: schemas.LoteEngordeUpdate):
-    db_lote = db.query(models.LoteEngorde).filter(models.LoteEngorde.id == lote_id).first()
-    if not db_lote: return None
-    update_data = lote_update.dict(exclude_unset=True)
-    for key, value in update_data.items(): setattr(db_lote, key, value)
-    db.add(db_lote)
-    db.commit()
-    db.refresh(db_lote)
-    return get_lote_engorde(db, db_lote.id)
+def update_lote_engorde(db: Session, lote_id: int, lote_update: schemas.LoteEngordeUpdate, version: int = None):
+    return _actualizar_versionado(db, models.LoteEngorde, lote_id, lote_update, version)
 
 def delete_lote_engorde(db: Session, lote_id: int):
     db_lote = get_lote_engorde(db, lote_id)
@@ -168,7 +250,7 @@ def delete_lote_engorde(db: Session, lote_id: int):
     _ = db_lote.camada_origen
     
     db.delete(db_lote)
-    db.commit()
+    db.flush()
     return db_lote
 
 # --- OPERACIONES CRUD PARA TRATAMIENTOS VETERINARIOS ---
@@ -176,25 +258,22 @@ def delete_lote_engorde(db: Session, lote_id: int):
 def create_tratamiento(db: Session, tratamiento: schemas.TratamientoCreate, user_id: int):
     db_tratamiento = models.TratamientoVeterinario(**tratamiento.dict(), user_id=user_id)
     db.add(db_tratamiento)
-    db.commit()
-    db.refresh(db_tratamiento)
+    db.flush()
+    # Las referencias se validan con EXISTS: la respuesta se carga una vez, después de escribir
     return get_tratamiento(db, db_tratamiento.id)
 
-def get_tratamiento(db: Session, tratamiento_id: int):
-    return db.query(models.TratamientoVeterinario).options(joinedload(models.TratamientoVeterinario.reproductora), joinedload(models.TratamientoVeterinario.semental), joinedload(models.TratamientoVeterinario.lote_engorde), joinedload(models.TratamientoVeterinario.propietario)).filter(models.TratamientoVeterinario.id == tratamiento_id).first()
+def get_tratamiento(db: Session, tratamiento_id: int, user_id: int = None):
+    return _de_propietario(db.query(models.TratamientoVeterinario).options(joinedload(models.TratamientoVeterinario.reproductora), joinedload(models.TratamientoVeterinario.semental), joinedload(models.TratamientoVeterinario.lote_engorde), joinedload(models.TratamientoVeterinario.propietario)).filter(models.TratamientoVeterinario.id == tratamiento_id), models.TratamientoVeterinario, user_id).first()
 
-def get_tratamientos(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.TratamientoVeterinario).options(joinedload(models.TratamientoVeterinario.reproductora), joinedload(models.TratamientoVeterinario.semental), joinedload(models.TratamientoVeterinario.lote_engorde), joinedload(models.TratamientoVeterinario.propietario)).offset(skip).limit(limit).all()
+def get_tratamientos(db: Session, skip: int = 0, limit: int = 100, user_id: int = None):
+    return _de_propietario(db.query(models.TratamientoVeterinario).options(joinedload(models.TratamientoVeterinario.reproductora), joinedload(models.TratamientoVeterinario.semental), joinedload(models.TratamientoVeterinario.lote_engorde), joinedload(models.TratamientoVeterinario.propietario)), models.TratamientoVeterinario, user_id).offset(skip).limit(limit).all()
 
-def update_tratamiento(db: Session, tratamiento_id: int, tratamiento_update: schemas.TratamientoUpdate):
-    db_tratamiento = db.query(models.TratamientoVeterinario).filter(models.TratamientoVeterinario.id == tratamiento_id).first()
-    if not db_tratamiento: return None
-    update_data = tratamiento_update.dict(exclude_unset=True)
-    for key, value in update_data.items(): setattr(db_tratamiento, key, value)
-    db.add(db_tratamiento)
-    db.commit()
-    db.refresh(db_tratamiento)
-    return get_tratamiento(db, db_tratamiento.id)
+def get_tratamientos_por_rango(db: Session, desde: date, hasta: date, skip: int = 0, limit: int = 100, user_id: int = None):
+    """Tratamientos entre dos fechas, ordenados y paginados en SQL sobre el índice de fecha"""
+    return _de_propietario(db.query(models.TratamientoVeterinario).options(joinedload(models.TratamientoVeterinario.reproductora), joinedload(models.TratamientoVeterinario.semental), joinedload(models.TratamientoVeterinario.lote_engorde), joinedload(models.TratamientoVeterinario.propietario)).filter(models.TratamientoVeterinario.fecha.between(desde, hasta)), models.TratamientoVeterinario, user_id).order_by(models.TratamientoVeterinario.fecha, models.TratamientoVeterinario.id).offset(skip).limit(limit).all()
+
+def update_tratamiento(db: Session, tratamiento_id: int, tratamiento_update: schemas.TratamientoUpdate, version: int = None):
+    return _actualizar_versionado(db, models.TratamientoVeterinario, tratamiento_id, tratamiento_update, version)
 
 def delete_tratamiento(db: Session, tratamiento_id: int):
     db_tratamiento = get_tratamiento(db, tratamiento_id)
@@ -208,9 +287,121 @@ def delete_tratamiento(db: Session, tratamiento_id: int):
     _ = db_tratamiento.lote_engorde  # Puede ser None
     
     db.delete(db_tratamiento)
-    db.commit()
+    db.flush()
     return db_tratamiento
 
+# --- CONSULTAS AGREGADAS PARA EL DASHBOARD ---
+
+def get_resumen_dashboard(db: Session, tratamientos_recientes: int = 5, user_id: int = None):
+    """Resumen de la granja calculado con consultas agregadas, sin cargar las listas completas"""
+    hoy = date.today()
+    inicio_mes = hoy.replace(day=1)
+
+    # Cerdas agrupadas por estado reproductivo
+    cerdas_por_estado = _de_propietario(db.query(
+        models.CerdaReproductora.estado_reproductivo,
+        func.count(models.CerdaReproductora.id)
+    ), models.CerdaReproductora, user_id).group_by(models.CerdaReproductora.estado_reproductivo).all()
+
+    def de_propietario(modelo, *condiciones):
+        if user_id is not None:
+            condiciones += (modelo.user_id == user_id,)
+        return condiciones
+
+    # El resto de contadores se resuelve en una sola consulta con subconsultas escalares
+    lotes_activos = de_propietario(models.LoteEngorde, models.LoteEngorde.numero_cerdos > 0)
+    camadas_mes = de_propietario(models.CamadaLechones, models.CamadaLechones.fecha_nacimiento >= inicio_mes)
+    totales = db.query(
+        select(func.count(models.Semental.id)).where(*de_propietario(models.Semental)).scalar_subquery(),
+        select(func.count(models.LoteEngorde.id)).where(*lotes_activos).scalar_subquery(),
+        select(func.coalesce(func.sum(models.LoteEngorde.numero_cerdos), 0)).where(*lotes_activos).scalar_subquery(),
+        select(func.count(models.CamadaLechones.id)).where(*camadas_mes).scalar_subquery(),
+        select(func.coalesce(func.sum(models.CamadaLechones.numero_lechones), 0)).where(*camadas_mes).scalar_subquery(),
+    ).one()
+
+    # Solo las columnas necesarias de los últimos tratamientos, sin joins
+    recientes = _de_propietario(db.query(
+        models.TratamientoVeterinario.id,
+        models.TratamientoVeterinario.tipo_intervencion,
+        models.TratamientoVeterinario.medicamento_producto,
+        models.TratamientoVeterinario.fecha,
+        models.TratamientoVeterinario.reproductora_id,
+        models.TratamientoVeterinario.semental_id,
+        models.TratamientoVeterinario.lote_engorde_id
+    ), models.TratamientoVeterinario, user_id).order_by(
+        models.TratamientoVeterinario.fecha.desc(),
+        models.TratamientoVeterinario.id.desc()
+    ).limit(tratamientos_recientes).all()
+
+    return {
+        "reproductoras_por_estado": [
+            {"estado": estado or "Sin estado", "cantidad": cantidad} for estado, cantidad in cerdas_por_estado
+        ],
+        "total_reproductoras": sum(cantidad for _, cantidad in cerdas_por_estado),
+        "total_sementales": totales[0],
+        "lotes_activos": totales[1],
+        "cerdos_en_engorde": totales[2],
+        "camadas_mes": totales[3],
+        "lechones_mes": totales[4],
+        "tratamientos_recientes": [dict(row._mapping) for row in recientes],
+        "generado_en": datetime.utcnow()
+    }
+
+def get_calendario_eventos(db: Session, desde: date, hasta: date, skip: int = 0, limit: int = 100, user_id: int = None):
+    """Une tratamientos y partos de una ventana de fechas en una sola consulta ordenada y paginada"""
+    tratamientos = select(
+        literal("tratamiento").label("tipo"),
+        models.TratamientoVeterinario.id.label("entidad_id"),
+        models.TratamientoVeterinario.fecha.label("fecha"),
+        models.TratamientoVeterinario.tipo_intervencion.label("descripcion")
+    ).where(models.TratamientoVeterinario.fecha.between(desde, hasta))
+    if user_id is not None:
+        tratamientos = tratamientos.where(models.TratamientoVeterinario.user_id == user_id)
+
+    partos = select(
+        literal("parto").label("tipo"),
+        models.CamadaLechones.id.label("entidad_id"),
+        models.CamadaLechones.fecha_nacimiento.label("fecha"),
+        (literal("Camada de ") + cast(models.CamadaLechones.numero_lechones, String) + literal(" lechones")).label("descripcion")
+    ).where(models.CamadaLechones.fecha_nacimiento.between(desde, hasta))
+    if user_id is not None:
+        partos = partos.where(models.CamadaLechones.user_id == user_id)
+
+    eventos = union_all(tratamientos, partos).subquery()
+    filas = db.execute(
+        select(eventos).order_by(eventos.c.fecha, eventos.c.tipo, eventos.c.entidad_id).offset(skip).limit(limit)
+    ).all()
+    return [dict(fila._mapping) for fila in filas]
+
+def get_pronosticos(db: Session, desde: date, hasta: date, tipo: str = None, skip: int = 0, limit: int = 100):
+    """Pronósticos precalculados por el trabajo por lotes, filtrados por el índice de fecha_estimada"""
+    query = db.query(models.PronosticoEvento).filter(models.PronosticoEvento.fecha_estimada.between(desde, hasta))
+    if tipo:
+        query = query.filter(models.PronosticoEvento.tipo == tipo)
+    return query.order_by(models.PronosticoEvento.fecha_estimada, models.PronosticoEvento.id).offset(skip).limit(limit).all()
+
+# --- OPERACIONES CRUD PARA REPORTES ---
+
+def create_reporte(db: Session, formato: str, fecha_inicio: date, fecha_fin: date, user_id: int):
+    db_reporte = models.Reporte(formato=formato, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, estado="pendiente", user_id=user_id)
+    db.add(db_reporte)
+    db.flush()
+    return db_reporte
+
+def get_reporte(db: Session, reporte_id: int, user_id: int = None):
+    return _de_propietario(db.query(models.Reporte).filter(models.Reporte.id == reporte_id), models.Reporte, user_id).first()
+
+def get_reportes(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    return _de_propietario(db.query(models.Reporte), models.Reporte, user_id).order_by(models.Reporte.id.desc()).offset(skip).limit(limit).all()
+
+# --- CONSULTAS DE LA COLA DE TRABAJOS ---
+
+def get_trabajo(db: Session, trabajo_id: int, user_id: int = None):
+    return _de_propietario(db.query(models.Trabajo).filter(models.Trabajo.id == trabajo_id), models.Trabajo, user_id).first()
+
+def get_trabajos(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    return _de_propietario(db.query(models.Trabajo), models.Trabajo, user_id).order_by(models.Trabajo.id.desc()).offset(skip).limit(limit).all()
+
 # --- OPERACIONES CRUD PARA USUARIOS ---
 
 def get_user_by_documento(db: Session, numero_documento: str):
@@ -226,8 +417,7 @@ def create_user(db: Session, user: schemas.UserCreate):
         hashed_password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
     return db_user
 
 
@@ -249,8 +439,7 @@ def create_movimiento(db: Session, movimiento: schemas.MovimientoCreate, user_id
         fecha_movimiento=datetime.utcnow()
     )
     db.add(db_movimiento)
-    db.commit()
-    db.refresh(db_movimiento)
+    db.flush()
     return db_movimiento
 
 def get_movimientos(db: Session, filters: schemas.MovimientoFilters):
@@ -262,40 +451,54 @@ def get_movimientos(db: Session, filters: schemas.MovimientoFilters):
         search_term = f"%{filters.search}%"
         query = query.filter(
             or_(
-                models.Movimiento.usuario_nombre.ilike(search_term),
+                models.Movimiento.usuario_nombre_id.in_(
+                    diccionario.coincidencias("usuario_nombre", lambda valor: valor.ilike(search_term))
+                ),
                 models.Movimiento.accion.ilike(search_term),
                 models.Movimiento.descripcion.ilike(search_term)
             )
         )
     
+    # Los textos codificados se filtran por su ID (un valor que no existe no devuelve filas)
     if filters.modulo:
-        query = query.filter(models.Movimiento.modulo == filters.modulo)
+        query = query.filter(models.Movimiento.modulo_id == diccionario.id_de(db, "modulo", filters.modulo, crear=False))
     
     if filters.tipo_movimiento:
-        query = query.filter(models.Movimiento.tipo_movimiento == filters.tipo_movimiento)
+        query = query.filter(
+            models.Movimiento.tipo_movimiento_id == diccionario.id_de(db, "tipo_movimiento", filters.tipo_movimiento, crear=False)
+        )
     
     if filters.usuario_id:
         query = query.filter(models.Movimiento.usuario_id == filters.usuario_id)
     
-    if filters.fecha_inicio and filters.fecha_fin:
-        fecha_inicio = datetime.combine(filters.fecha_inicio, datetime.min.time())
-        fecha_fin = datetime.combine(filters.fecha_fin, datetime.max.time())
-        query = query.filter(
-            and_(
-                models.Movimiento.fecha_movimiento >= fecha_inicio,
-                models.Movimiento.fecha_movimiento <= fecha_fin
-            )
-        )
+    fecha_inicio = datetime.combine(filters.fecha_inicio, datetime.min.time()) if filters.fecha_inicio else None
+    fecha_fin = datetime.combine(filters.fecha_fin, datetime.max.time()) if filters.fecha_fin else None
+    if fecha_inicio:
+        query = query.filter(models.Movimiento.fecha_movimiento >= fecha_inicio)
+    if fecha_fin:
+        query = query.filter(models.Movimiento.fecha_movimiento <= fecha_fin)
     
     # Ordenar por fecha más reciente
     query = query.order_by(models.Movimiento.fecha_movimiento.desc())
     
     # Contar total de registros (antes de la paginación)
-    total = query.count()
+    en_tabla = query.count()
     
     # Aplicar paginación
     offset = (filters.page - 1) * filters.size
-    movimientos = query.offset(offset).limit(filters.size).all()
+    movimientos = query.offset(offset).limit(filters.size).all() if offset < en_tabla else []
+    total = en_tabla
+    
+    # Si el filtro de fechas llega a meses ya archivados, la página se completa con el archivo.
+    # Lo archivado siempre es más antiguo que lo que queda en la tabla, así que va detrás
+    limite_archivo = archivo_movimientos.archivado_hasta()
+    if fecha_inicio and limite_archivo and fecha_inicio < limite_archivo:
+        archivados, total_archivo = archivo_movimientos.consultar_archivo(
+            filters, fecha_inicio, fecha_fin or limite_archivo,
+            omitir=max(0, offset - en_tabla), cantidad=filters.size - len(movimientos)
+        )
+        movimientos += archivados
+        total += total_archivo
     
     return {
         "movimientos": movimientos,
@@ -305,9 +508,26 @@ def get_movimientos(db: Session, filters: schemas.MovimientoFilters):
         "total_pages": (total + filters.size - 1) // filters.size
     }
 
-def get_movimiento(db: Session, movimiento_id: int):
+def get_movimiento(db: Session, movimiento_id: int, usuario_id: int = None):
     """Obtener un movimiento específico"""
-    return db.query(models.Movimiento).filter(models.Movimiento.id == movimiento_id).first()
+    query = db.query(models.Movimiento).filter(models.Movimiento.id == movimiento_id)
+    if usuario_id is not None:
+        query = query.filter(models.Movimiento.usuario_id == usuario_id)
+    movimiento = query.first()
+    if movimiento is None:
+        movimiento = archivo_movimientos.buscar_en_archivo(movimiento_id)
+        if movimiento is not None and usuario_id is not None and movimiento.usuario_id != usuario_id:
+            return None
+    return movimiento
+
+def _conteos_por(db: Session, columna_id, fecha_limite: datetime, limite: int = None):
+    """Agrupa por el ID codificado (enteros, sin joins) y traduce los IDs a texto con el diccionario"""
+    query = db.query(columna_id, func.count(models.Movimiento.id)).filter(
+        models.Movimiento.fecha_movimiento >= fecha_limite
+    ).group_by(columna_id)
+    if limite:
+        query = query.order_by(func.count(models.Movimiento.id).desc()).limit(limite)
+    return [(diccionario.valor_de(db, valor_id), cantidad) for valor_id, cantidad in query.all()]
 
 def get_estadisticas_movimientos(db: Session, dias: int = 30):
     """Obtener estadísticas de movimientos de los últimos N días"""
@@ -319,30 +539,23 @@ def get_estadisticas_movimientos(db: Session, dias: int = 30):
     ).count()
     
     # Movimientos por tipo
-    movimientos_por_tipo = db.query(
-        models.Movimiento.tipo_movimiento,
-        func.count(models.Movimiento.id).label('count')
-    ).filter(
-        models.Movimiento.fecha_movimiento >= fecha_limite
-    ).group_by(models.Movimiento.tipo_movimiento).all()
+    movimientos_por_tipo = _conteos_por(db, models.Movimiento.tipo_movimiento_id, fecha_limite)
     
     # Movimientos por módulo
-    movimientos_por_modulo = db.query(
-        models.Movimiento.modulo,
-        func.count(models.Movimiento.id).label('count')
-    ).filter(
-        models.Movimiento.fecha_movimiento >= fecha_limite
-    ).group_by(models.Movimiento.modulo).all()
+    movimientos_por_modulo = _conteos_por(db, models.Movimiento.modulo_id, fecha_limite)
     
     # Usuarios más activos
-    usuarios_activos = db.query(
-        models.Movimiento.usuario_nombre,
-        func.count(models.Movimiento.id).label('count')
-    ).filter(
-        models.Movimiento.fecha_movimiento >= fecha_limite
-    ).group_by(models.Movimiento.usuario_nombre).order_by(
-        func.count(models.Movimiento.id).desc()
-    ).limit(5).all()
+    usuarios_activos = _conteos_por(db, models.Movimiento.usuario_nombre_id, fecha_limite, limite=5)
+    
+    # Si el periodo llega a meses archivados, se suman sus conteos (del índice cuando el mes es completo)
+    limite_archivo = archivo_movimientos.archivado_hasta()
+    if limite_archivo and fecha_limite < limite_archivo:
+        por_tipo, por_modulo, por_usuario = archivo_movimientos.estadisticas_archivo(fecha_limite)
+        total_movimientos += sum(por_tipo.values())
+        movimientos_por_tipo = list((por_tipo + Counter(dict(movimientos_por_tipo))).items())
+        movimientos_por_modulo = list((por_modulo + Counter(dict(movimientos_por_modulo))).items())
+        usuarios = por_usuario + Counter(dict(_conteos_por(db, models.Movimiento.usuario_nombre_id, fecha_limite)))
+        usuarios_activos = usuarios.most_common(5)
     
     return {
         "total_movimientos": total_movimientos,
@@ -352,6 +565,122 @@ def get_estadisticas_movimientos(db: Session, dias: int = 30):
         "periodo_dias": dias
     }
 
+# --- ELIMINACIÓN DE VARIOS REGISTROS ---
+
+ENTIDADES_ELIMINABLES = {
+    # nombre: (modelo, módulo y entidad_tipo del movimiento, columna de fecha para los filtros)
+    "reproductoras": (models.CerdaReproductora, "Reproductoras", "cerda_reproductora", "fecha_nacimiento"),
+    "sementales": (models.Semental, "Sementales", "semental", None),
+    "camadas": (models.CamadaLechones, "Lechones", "camada_lechones", "fecha_nacimiento"),
+    "lotes": (models.LoteEngorde, "Engorde", "lote_engorde", "fecha_inicio"),
+    "tratamientos": (models.TratamientoVeterinario, "Veterinaria", "tratamiento_veterinario", "fecha"),
+}
+# Registros que dependen de cada entidad (entidad hija, columna que apunta al padre); se eliminan con ella
+DEPENDIENTES = {
+    "reproductoras": [("camadas", "madre_id"), ("tratamientos", "reproductora_id")],
+    "sementales": [("camadas", "padre_id"), ("tratamientos", "semental_id")],
+    "camadas": [("lotes", "camada_origen_id")],
+    "lotes": [("tratamientos", "lote_engorde_id")],
+    "tratamientos": [],
+}
+MAX_IDS_ELIMINACION = 10_000
+_FILTROS_TEXTO = {
+    "raza": ("reproductoras", "sementales"),
+    "estado_reproductivo": ("reproductoras",),
+    "tipo_intervencion": ("tratamientos",),
+}
+
+def _condicion_eliminacion(entidad: str, peticion: schemas.EliminacionVarios, user_id: int):
+    """Condición SQL de los registros a eliminar. Lanza ValueError si la petición no es válida"""
+    modelo, _, _, columna_fecha = ENTIDADES_ELIMINABLES[entidad]
+    if (peticion.ids is None) == (peticion.filtro is None):
+        raise ValueError("Indica `ids` o `filtro`, pero no ambos")
+    if peticion.ids is not None:
+        if not peticion.ids:
+            raise ValueError("La lista de IDs está vacía")
+        if len(peticion.ids) > MAX_IDS_ELIMINACION:
+            raise ValueError(f"Como máximo {MAX_IDS_ELIMINACION} IDs por petición; usa un filtro para más")
+        return modelo.id.in_(peticion.ids)
+
+    filtro = peticion.filtro
+    condiciones = []
+    if filtro.desde or filtro.hasta:
+        if columna_fecha is None:
+            raise ValueError(f"Los registros de {entidad} no tienen fecha por la que filtrar")
+        if filtro.desde:
+            condiciones.append(getattr(modelo, columna_fecha) >= filtro.desde)
+        if filtro.hasta:
+            condiciones.append(getattr(modelo, columna_fecha) <= filtro.hasta)
+    for campo, entidades in _FILTROS_TEXTO.items():
+        valor = getattr(filtro, campo)
+        if valor is None:
+            continue
+        if entidad not in entidades:
+            raise ValueError(f"El filtro `{campo}` no se aplica a {entidad}")
+        condiciones.append(getattr(modelo, campo) == valor)
+    # Un filtro vacío eliminaría la tabla entera: se exige al menos un criterio además de `mine`
+    if not condiciones:
+        raise ValueError("El filtro debe tener al menos un criterio")
+    if filtro.mine:
+        condiciones.append(modelo.user_id == user_id)
+    return and_(*condiciones)
+
+def _plan_eliminacion(entidad: str, condicion):
+    """(entidad, condición) en orden de borrado: primero los dependientes, al final la propia entidad"""
+    modelo = ENTIDADES_ELIMINABLES[entidad][0]
+    plan = []
+    for hija, columna in DEPENDIENTES[entidad]:
+        hija_modelo = ENTIDADES_ELIMINABLES[hija][0]
+        plan += _plan_eliminacion(hija, getattr(hija_modelo, columna).in_(select(modelo.id).where(condicion)))
+    plan.append((entidad, condicion))
+    return plan
+
+def eliminar_varios(db: Session, entidad: str, peticion: schemas.EliminacionVarios, usuario: models.User):
+    """
+    Elimina con sentencias sobre conjuntos (sin cargar filas) los registros indicados por IDs o por filtro,
+    junto con sus dependientes (camadas, lotes, tratamientos). Deja las marcas de borrado para GET /sync,
+    quita los pronósticos afectados y registra un único movimiento, todo en una transacción.
+    """
+    condicion = _condicion_eliminacion(entidad, peticion, usuario.id)
+    no_encontrados = []
+    if peticion.ids is not None:
+        no_encontrados = sorted(set(peticion.ids) - ids_existentes(db, ENTIDADES_ELIMINABLES[entidad][0], peticion.ids))
+    ahora = datetime.utcnow()
+    eliminados = {}
+    for nombre, condicion_nombre in _plan_eliminacion(entidad, condicion):
+        modelo, _, entidad_tipo, _ = ENTIDADES_ELIMINABLES[nombre]
+        ids = select(modelo.id).where(condicion_nombre)
+        db.execute(insert(models.Eliminacion).from_select(
+            ["entidad", "entidad_id", "user_id", "eliminado_en"],
+            select(literal(nombre), modelo.id, modelo.user_id, literal(ahora, DateTime)).where(condicion_nombre)
+        ))
+        db.execute(delete(models.PronosticoEvento).where(
+            models.PronosticoEvento.entidad_tipo == entidad_tipo,
+            models.PronosticoEvento.entidad_id.in_(ids)
+        ))
+        resultado = db.execute(delete(modelo).where(condicion_nombre).execution_options(synchronize_session=False))
+        if resultado.rowcount:
+            eliminados[nombre] = eliminados.get(nombre, 0) + resultado.rowcount
+
+    total = sum(eliminados.values())
+    if total:
+        _, modulo, entidad_tipo, _ = ENTIDADES_ELIMINABLES[entidad]
+        detalle = ", ".join(f"{cantidad} {nombre}" for nombre, cantidad in eliminados.items())
+        criterio = f"IDs {peticion.ids[:20]}{'...' if len(peticion.ids) > 20 else ''}" if peticion.ids is not None \
+            else f"filtro {peticion.filtro.dict(exclude_defaults=True)}"
+        db.add(models.Movimiento(
+            usuario_id=usuario.id,
+            usuario_nombre=f"{usuario.nombre} {usuario.apellido}",
+            accion=f"Eliminó varios {entidad}",
+            modulo=modulo,
+            descripcion=f"Eliminación múltiple por {criterio}: {detalle}",
+            tipo_movimiento="eliminar",
+            entidad_tipo=entidad_tipo,
+            fecha_movimiento=ahora
+        ))
+    db.flush()
+    return {"eliminados": eliminados, "total": total, "no_encontrados": no_encontrados}
+
 # Función auxiliar para registrar movimientos automáticamente
 def registrar_movimiento_automatico(
     db: Session, 
@@ -4,7 +4,10 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from urllib.parse import quote_plus
+from starlette.requests import Request
+from starlette.responses import Response
 import os
+import time
 
 # --- Configuración temporal con SQLite para desarrollo ---
 # Comentando PostgreSQL temporalmente
@@ -20,20 +23,85 @@ encoded_password = quote_plus(DB_PASSWORD)
 base_url = f"postgresql://{DB_USER}:{encoded_password}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 """
 
-# --- Configuración SQLite temporal ---
-SQLALCHEMY_DATABASE_URL = "sqlite:///./porcigest_dev.db"
+# --- Configuración SQLite temporal (DATABASE_URL la sustituye, p. ej. por PostgreSQL) ---
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./porcigest_dev.db")
+# Réplica de solo lectura opcional (PostgreSQL con replicación en streaming)
+SQLALCHEMY_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
 
-# Para SQLite no necesitamos client_encoding
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Necesario para SQLite
-)
+def _crear_engine(url):
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})  # Necesario para SQLite
+    return create_engine(url, pool_pre_ping=True)
+
+engine = _crear_engine(SQLALCHEMY_DATABASE_URL)
+# Sin réplica configurada, las lecturas van al mismo engine
+engine_lectura = _crear_engine(SQLALCHEMY_REPLICA_URL) if SQLALCHEMY_REPLICA_URL else engine
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLectura = sessionmaker(autocommit=False, autoflush=False, bind=engine_lectura)
+
+# Cookie y registro en memoria de las escrituras recientes de cada usuario (read-your-writes)
+COOKIE_ESCRITURA = "porcigest_escritura"
+METODOS_LECTURA = {"GET", "HEAD"}
+_escrituras_recientes = {}  # identidad -> instante (time.time()) hasta el que lee del primario
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+def estado_migraciones():
+    """Devuelve (revisión actual de la base de datos, última revisión de Alembic)"""
+    from alembic.config import Config
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    config = Config(os.path.join(raiz, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(raiz, "alembic"))
+    head = ScriptDirectory.from_config(config).get_current_head()
+    with engine.connect() as conn:
+        actual = MigrationContext.configure(conn).get_current_revision()
+    return actual, head
+
+def _leyo_tras_escribir(request: Request, identidad: str):
+    ahora = time.time()
+    if _escrituras_recientes.get(identidad, 0) > ahora:
+        return True
+    try:
+        return float(request.cookies.get(COOKIE_ESCRITURA, 0)) > ahora
+    except ValueError:
+        return False
+
+def _registrar_escritura(response: Response, identidad: str):
+    from .config import get_settings
+
+    ventana = get_settings().replica_ventana_segundos
+    hasta = time.time() + ventana
+    if len(_escrituras_recientes) > 10_000:
+        ahora = time.time()
+        for clave in [clave for clave, valor in _escrituras_recientes.items() if valor <= ahora]:
+            del _escrituras_recientes[clave]
+    _escrituras_recientes[identidad] = hasta
+    # La cookie cubre el caso de que la siguiente lectura la atienda otro worker
+    response.set_cookie(COOKIE_ESCRITURA, f"{hasta:.0f}", max_age=ventana, httponly=True, samesite="lax")
+
+def get_db(request: Request, response: Response):
+    """
+    Sesión de base de datos de la petición. Las lecturas (GET/HEAD) van a la réplica si hay una
+    configurada, salvo que el mismo usuario haya escrito hace menos de REPLICA_VENTANA_SEGUNDOS;
+    todo lo demás va al primario. Las funciones de crud solo hacen flush: el endpoint confirma una vez
+    al final, así el cambio y su movimiento de auditoría se guardan juntos; si no confirma, se deshace.
+    """
+    fabrica = SessionLocal
+    if engine_lectura is not engine:
+        from .security import identificar_cliente
+
+        identidad = identificar_cliente(request.scope)
+        if request.method not in METODOS_LECTURA:
+            _registrar_escritura(response, identidad)
+        elif not _leyo_tras_escribir(request, identidad):
+            fabrica = SessionLectura
+
+    # Sin expirar al confirmar: lo que se acaba de escribir (y lo cargado para validarlo) se devuelve
+    # en la respuesta sin volver a consultarlo
+    db = fabrica(expire_on_commit=False)
     try:
         yield db
     finally:
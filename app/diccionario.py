@@ -0,0 +1,124 @@
+# app/diccionario.py
+
+import threading
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from .models import Movimiento, ValorAuditoria
+
+_NUEVOS = "diccionario_nuevos"
+
+
+class Diccionario:
+    """
+    Caché en memoria de los valores de auditoría codificados: (campo, valor) <-> id.
+    La tabla solo crece, así que lo que entra en la caché nunca queda obsoleto. Los valores
+    insertados en una transacción se pasan a la caché global solo cuando esta se confirma.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._valores = {}
+
+    def _recordar(self, campo, valor, valor_id):
+        with self._lock:
+            self._ids[(campo, valor)] = valor_id
+            self._valores[valor_id] = valor
+
+    def id_en_cache(self, campo: str, valor: str):
+        return self._ids.get((campo, valor))
+
+    def id_de(self, db, campo: str, valor: str, crear: bool = True):
+        """ID del valor; si no existe se inserta (o se devuelve None con crear=False). Sirve con Session o Connection"""
+        if valor is None:
+            return None
+        clave = (campo, valor)
+        valor_id = self._ids.get(clave)
+        if valor_id is not None:
+            return valor_id
+        nuevos = db.info.setdefault(_NUEVOS, {})
+        if clave in nuevos:
+            return nuevos[clave]
+
+        consulta = select(ValorAuditoria.id).where(ValorAuditoria.campo == campo, ValorAuditoria.valor == valor)
+        valor_id = db.execute(consulta).scalar()
+        if valor_id is not None:
+            self._recordar(campo, valor, valor_id)
+            return valor_id
+        if not crear:
+            return None
+        try:
+            # En un savepoint: si otro proceso lo insertó a la vez, solo se deshace este INSERT
+            with db.begin_nested():
+                valor_id = db.execute(insert(ValorAuditoria).values(campo=campo, valor=valor)).inserted_primary_key[0]
+        except IntegrityError:
+            valor_id = db.execute(consulta).scalar()
+            self._recordar(campo, valor, valor_id)
+            return valor_id
+        nuevos[clave] = valor_id
+        return valor_id
+
+    def valor_de(self, db, valor_id: int):
+        if valor_id is None:
+            return None
+        valor = self._valores.get(valor_id)
+        if valor is not None:
+            return valor
+        for (campo, texto), nuevo_id in (db.info.get(_NUEVOS, {}) if db is not None else {}).items():
+            if nuevo_id == valor_id:
+                return texto
+        if db is None:
+            from .database import SessionLectura
+            with SessionLectura() as lectura:
+                return self.valor_de(lectura, valor_id)
+        fila = db.execute(select(ValorAuditoria.campo, ValorAuditoria.valor).where(ValorAuditoria.id == valor_id)).first()
+        if fila is None:
+            return None
+        self._recordar(fila.campo, fila.valor, valor_id)
+        return fila.valor
+
+    def cargar(self, db):
+        """Carga el diccionario completo (al calentar el worker)"""
+        filas = db.execute(select(ValorAuditoria.id, ValorAuditoria.campo, ValorAuditoria.valor)).all()
+        for fila in filas:
+            self._recordar(fila.campo, fila.valor, fila.id)
+        return len(filas)
+
+    def coincidencias(self, campo: str, condicion):
+        """Subconsulta con los IDs de los valores de un campo que cumplen una condición sobre el texto"""
+        return select(ValorAuditoria.id).where(ValorAuditoria.campo == campo, condicion(ValorAuditoria.valor))
+
+
+diccionario = Diccionario()
+
+
+@event.listens_for(Session, "before_flush")
+def _resolver_pendientes(session, flush_context, instances):
+    """Traduce a IDs los textos asignados a movimientos que no estaban en la caché"""
+    for objeto in list(session.new) + list(session.dirty):
+        if not isinstance(objeto, Movimiento):
+            continue
+        pendientes = objeto.__dict__.get("_textos_pendientes")
+        if not pendientes:
+            continue
+        for campo, valor in pendientes.items():
+            setattr(objeto, f"{campo}_id", diccionario.id_de(session, campo, valor))
+        pendientes.clear()
+
+
+@event.listens_for(Session, "after_commit")
+def _confirmar_nuevos(session):
+    # También se dispara al liberar cada savepoint; solo cuenta la transacción principal
+    if session.in_nested_transaction():
+        return
+    for (campo, valor), valor_id in session.info.pop(_NUEVOS, {}).items():
+        diccionario._recordar(campo, valor, valor_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar_nuevos(session, transaccion_anterior):
+    if transaccion_anterior.parent is None:
+        session.info.pop(_NUEVOS, None)
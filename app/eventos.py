@@ -0,0 +1,130 @@
+# app/eventos.py
+
+import asyncio
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import models
+
+_PUBLICAR = "movimientos_por_publicar"
+_INVALIDAR_RESUMEN = "invalidar_resumen_dashboard"
+# Eventos que puede acumular un cliente lento antes de cortarle la conexión
+MAX_PENDIENTES = 1000
+
+
+def movimiento_a_dict(movimiento):
+    """Mismo formato que devuelve GET /movimientos/"""
+    return {
+        "id": movimiento.id,
+        "usuario_id": movimiento.usuario_id,
+        "usuario_nombre": movimiento.usuario_nombre,
+        "accion": movimiento.accion,
+        "modulo": movimiento.modulo,
+        "descripcion": movimiento.descripcion,
+        "entidad_tipo": movimiento.entidad_tipo,
+        "entidad_id": movimiento.entidad_id,
+        "tipo_movimiento": movimiento.tipo_movimiento,
+        "fecha_movimiento": movimiento.fecha_movimiento.isoformat() if movimiento.fecha_movimiento else None,
+        "ip_address": movimiento.ip_address,
+        "user_agent": movimiento.user_agent
+    }
+
+
+class Suscripcion:
+    """Cola de un cliente conectado al stream, con sus filtros"""
+
+    def __init__(self, loop, modulo: str = None, usuario_id: int = None):
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=MAX_PENDIENTES)
+        self.modulo = modulo
+        self.usuario_id = usuario_id
+        self.desbordada = False
+
+    def acepta(self, movimiento: dict):
+        if self.modulo and movimiento["modulo"] != self.modulo:
+            return False
+        if self.usuario_id and movimiento["usuario_id"] != self.usuario_id:
+            return False
+        return True
+
+    def _entregar(self, evento):
+        # Se ejecuta en el bucle de eventos del cliente
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            # El cliente no da abasto: se cierra y al reconectar recupera lo perdido con Last-Event-ID
+            self.desbordada = True
+
+
+class Difusor:
+    """
+    Reparte los movimientos nuevos entre los clientes conectados al stream de este proceso.
+    Publicar es una sola pasada por las suscripciones, sin consultas. Con varios workers,
+    cada proceso solo ve los movimientos que se escriben en él.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._suscripciones = set()
+
+    def suscribir(self, modulo: str = None, usuario_id: int = None):
+        suscripcion = Suscripcion(asyncio.get_running_loop(), modulo, usuario_id)
+        with self._lock:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def suscriptores(self):
+        return len(self._suscripciones)
+
+    def publicar(self, movimiento: dict):
+        """Se puede llamar desde cualquier hilo (los endpoints síncronos corren en el threadpool)"""
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            if suscripcion.acepta(movimiento):
+                suscripcion.loop.call_soon_threadsafe(suscripcion._entregar, movimiento)
+
+    def cerrar(self):
+        """Termina todos los streams (al apagar el worker)"""
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            suscripcion.loop.call_soon_threadsafe(suscripcion._entregar, None)
+
+
+difusor = Difusor()
+
+
+@event.listens_for(Session, "after_flush")
+def _recoger_movimientos(session, flush_context):
+    nuevos = [objeto for objeto in session.new if isinstance(objeto, models.Movimiento)]
+    if nuevos:
+        # Toda escritura de la API deja un movimiento: es la señal para descartar el resumen del dashboard
+        session.info[_INVALIDAR_RESUMEN] = True
+    if nuevos and difusor.suscriptores():
+        session.info.setdefault(_PUBLICAR, []).extend(movimiento_a_dict(objeto) for objeto in nuevos)
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar_confirmados(session):
+    # Solo cuando se confirma la transacción principal, no al liberar un savepoint
+    if session.in_nested_transaction():
+        return
+    if session.info.pop(_INVALIDAR_RESUMEN, False):
+        from .routers.dashboard import cache_resumen
+        cache_resumen().invalidar()
+    for movimiento in session.info.pop(_PUBLICAR, []):
+        difusor.publicar(movimiento)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _descartar(session, transaccion_anterior):
+    if transaccion_anterior.parent is None:
+        session.info.pop(_PUBLICAR, None)
+        session.info.pop(_INVALIDAR_RESUMEN, None)
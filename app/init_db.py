@@ -15,22 +15,23 @@ def init_database():
     
     try:
         # Crear usuario de prueba si no existe
-        existing_user = db.query(models.User).filter(models.User.email == "admin@porcigest.com").first()
+        existing_user = db.query(models.User).filter(models.User.numero_documento == "12345678").first()
         if not existing_user:
             user_data = schemas.UserCreate(
                 nombre="Admin",
                 apellido="PorciGest", 
-                email="admin@porcigest.com",
+                tipo_documento="CC",
+                numero_documento="12345678",
                 password="admin123"
             )
             test_user = crud.create_user(db=db, user=user_data)
-            print(f"✅ Usuario creado: {test_user.email}")
+            print(f"✅ Usuario creado: {test_user.numero_documento}")
         else:
             test_user = existing_user
-            print(f"✅ Usuario existente: {test_user.email}")
+            print(f"✅ Usuario existente: {test_user.numero_documento}")
         
         # Crear reproductoras de prueba si no existen
-        existing_cerdas = db.query(models.Cerda).count()
+        existing_cerdas = db.query(models.CerdaReproductora).count()
         if existing_cerdas == 0:
             reproductoras_prueba = [
                 {
@@ -72,10 +73,12 @@ def init_database():
         else:
             print(f"✅ Ya existen {existing_cerdas} reproductoras en la base de datos")
         
+        db.commit()
         print("🎉 Base de datos inicializada correctamente!")
         
     except Exception as e:
         print(f"❌ Error inicializando base de datos: {e}")
+        raise
     finally:
         db.close()
 
@@ -0,0 +1,89 @@
+# app/instrumentacion.py
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import get_settings
+from .metricas import plantilla_ruta
+
+logger = logging.getLogger("porcigest")
+
+# Estadísticas SQL de la petición en curso (None fuera de una petición HTTP)
+_estadisticas = ContextVar("estadisticas_sql", default=None)
+
+
+class EstadisticasSQL:
+    """Consultas ejecutadas y tiempo acumulado en la base de datos durante una petición"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.sentencias = Counter()
+
+    def repetidas(self, umbral: int):
+        """Sentencias idénticas ejecutadas al menos `umbral` veces (posible patrón N+1)"""
+        return [(sql, veces) for sql, veces in self.sentencias.most_common() if veces >= umbral]
+
+
+def estadisticas_actuales():
+    return _estadisticas.get()
+
+
+# Se escucha sobre la clase Engine para cubrir cualquier motor que cree la aplicación
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consultas", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    inicio = conn.info["inicio_consultas"].pop()
+    estadisticas = _estadisticas.get()
+    if estadisticas is None:
+        return
+    estadisticas.consultas += 1
+    estadisticas.tiempo += time.perf_counter() - inicio
+    estadisticas.sentencias[statement] += 1
+
+
+class MiddlewareSQL:
+    """
+    Middleware ASGI que cuenta las consultas SQL y el tiempo de BD de cada petición.
+    En modo debug los devuelve en las cabeceras X-DB-Queries y X-DB-Time (milisegundos)
+    y avisa en el log cuando una misma sentencia se repite demasiado (posible N+1).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estadisticas = EstadisticasSQL()
+        token = _estadisticas.set(estadisticas)
+
+        async def send_con_cabeceras(message):
+            if message["type"] == "http.response.start" and get_settings().debug:
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [
+                    (b"x-db-queries", str(estadisticas.consultas).encode()),
+                    (b"x-db-time", f"{estadisticas.tiempo * 1000:.2f}".encode()),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_cabeceras)
+        finally:
+            _estadisticas.reset(token)
+            for sql, veces in estadisticas.repetidas(get_settings().sql_umbral_repeticiones):
+                logger.warning(
+                    "Posible N+1 en %s %s: sentencia repetida %d veces: %s",
+                    scope["method"], plantilla_ruta(scope), veces, " ".join(sql.split())[:200]
+                )
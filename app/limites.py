@@ -0,0 +1,159 @@
+# app/limites.py
+
+import json
+import math
+import threading
+import time
+
+from .config import get_settings
+from .metricas import plantilla_ruta
+from .security import identificar_cliente
+
+# Rutas caras de por sí (agregados sobre toda la auditoría)
+RUTAS_COSTOSAS = {"/movimientos/estadisticas"}
+# Rutas que nunca se limitan (sondas y métricas)
+RUTAS_EXENTAS = {"/health", "/ready", "/metrics"}
+# Fichas que consume una petición costosa del cubo del usuario
+COSTE_PETICION_COSTOSA = 5
+MAX_CUBOS = 10_000
+
+
+class CuboFichas:
+    """Token bucket: admite ráfagas de hasta `capacidad` peticiones y se rellena a `tasa` fichas por segundo"""
+
+    def __init__(self, capacidad: float, tasa: float):
+        self.capacidad = capacidad
+        self.tasa = tasa
+        self.fichas = capacidad
+        self.actualizado = time.monotonic()
+
+    def consumir(self, fichas: float = 1):
+        """Devuelve 0 si hay fichas suficientes, o los segundos que habría que esperar"""
+        ahora = time.monotonic()
+        self.fichas = min(self.capacidad, self.fichas + (ahora - self.actualizado) * self.tasa)
+        self.actualizado = ahora
+        if self.fichas >= fichas:
+            self.fichas -= fichas
+            return 0.0
+        return (fichas - self.fichas) / self.tasa if self.tasa > 0 else 60.0
+
+    def lleno(self):
+        return self.fichas + (time.monotonic() - self.actualizado) * self.tasa >= self.capacidad
+
+
+class Limitador:
+    """Estado en memoria del proceso: cubos por usuario y por ruta costosa y peticiones costosas en curso"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._usuarios = {}
+        self._rutas = {}
+        self._en_curso = {}
+
+    def _cubo(self, cubos, clave, capacidad, tasa):
+        cubo = cubos.get(clave)
+        if cubo is None:
+            if len(cubos) >= MAX_CUBOS:
+                # Se descartan los cubos llenos: equivalen a uno nuevo
+                for vieja in [c for c, valor in cubos.items() if valor.lleno()]:
+                    del cubos[vieja]
+            cubo = cubos[clave] = CuboFichas(capacidad, tasa)
+        return cubo
+
+    def admitir_usuario(self, usuario: str, coste: float):
+        settings = get_settings()
+        with self._lock:
+            cubo = self._cubo(self._usuarios, usuario, settings.limite_rafaga_usuario,
+                              settings.limite_peticiones_usuario_minuto / 60)
+            return cubo.consumir(coste)
+
+    def admitir_ruta(self, ruta: str):
+        settings = get_settings()
+        with self._lock:
+            cubo = self._cubo(self._rutas, ruta, settings.limite_rafaga_ruta_costosa,
+                              settings.limite_peticiones_ruta_costosa_minuto / 60)
+            return cubo.consumir(1)
+
+    def entrar(self, ruta: str):
+        """Reserva un hueco de ejecución para una petición costosa; False si la ruta está al máximo"""
+        with self._lock:
+            if self._en_curso.get(ruta, 0) >= get_settings().limite_concurrencia_costosa:
+                return False
+            self._en_curso[ruta] = self._en_curso.get(ruta, 0) + 1
+            return True
+
+    def salir(self, ruta: str):
+        with self._lock:
+            self._en_curso[ruta] -= 1
+
+
+limitador = Limitador()
+
+
+def es_costosa(ruta: str, query_string: bytes):
+    """Las estadísticas de auditoría y cualquier listado con un `limit` grande"""
+    if ruta in RUTAS_COSTOSAS:
+        return True
+    for parametro in query_string.decode("latin-1").split("&"):
+        nombre, _, valor = parametro.partition("=")
+        if nombre in ("limit", "size") and valor.isdigit() and int(valor) > get_settings().limite_lista_costosa:
+            return True
+    return False
+
+
+async def _rechazar(send, estado: int, detalle: str, espera: float):
+    cuerpo = json.dumps({"detail": detalle}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": estado,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(cuerpo)).encode()),
+            (b"retry-after", str(max(1, math.ceil(espera))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": cuerpo})
+
+
+class MiddlewareLimites:
+    """
+    Control de admisión en el proceso, sin servicios externos:
+    - cubo de fichas por usuario (o IP) para todas las rutas; las peticiones costosas gastan más fichas
+    - cubo de fichas por ruta costosa, compartido por todos los usuarios
+    - máximo de peticiones costosas ejecutándose a la vez por ruta
+    Responde 429 o 503 con Retry-After. Con varios workers, cada proceso aplica sus propios límites.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or not get_settings().limites_activos:
+            await self.app(scope, receive, send)
+            return
+
+        ruta = plantilla_ruta(scope)
+        if ruta in RUTAS_EXENTAS:
+            await self.app(scope, receive, send)
+            return
+
+        costosa = es_costosa(ruta, scope.get("query_string", b""))
+        espera = limitador.admitir_usuario(identificar_cliente(scope), COSTE_PETICION_COSTOSA if costosa else 1)
+        if espera:
+            await _rechazar(send, 429, "Demasiadas peticiones, inténtalo más tarde", espera)
+            return
+        if not costosa:
+            await self.app(scope, receive, send)
+            return
+
+        espera = limitador.admitir_ruta(ruta)
+        if espera:
+            await _rechazar(send, 429, "Esta consulta se está solicitando demasiado, inténtalo más tarde", espera)
+            return
+        if not limitador.entrar(ruta):
+            await _rechazar(send, 503, "El servidor está ocupado con consultas pesadas, inténtalo en unos segundos", 1)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limitador.salir(ruta)
@@ -1,18 +1,16 @@
 # app/main.py
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import reproductoras, sementales, lechones, engorde, veterinaria, auth, movimientos
-from . import models
-from .database import engine
-
-# Crear todas las tablas al iniciar
-models.Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title="PorciGest Pro API",
-    description="API para la gestión de granjas porcinas.",
-    version="1.1.0",
-)
+
+from . import metricas, instrumentacion, compresion, limites
+
+logger = logging.getLogger("porcigest")
+
 origins = [
     "http://localhost:3000", 
     "http://localhost:3001", 
@@ -21,83 +19,175 @@ origins = [
     "http://127.0.0.1:3001", 
     "http://127.0.0.1:5173"
 ]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Explícitamente incluir OPTIONS
-    allow_headers=["*"],
-    expose_headers=["*"],  # Permitir que el frontend vea todos los headers de respuesta
-)
-
-app.include_router(auth.router)
-app.include_router(reproductoras.router)
-app.include_router(sementales.router)
-app.include_router(lechones.router)
-app.include_router(engorde.router)
-app.include_router(veterinaria.router)
-app.include_router(movimientos.router)
-
-@app.get("/")
-def read_root():
-    return {"Proyecto": "API de PorciGest Pro"}
-
-@app.post("/init-db")
-def initialize_database():
-    """Endpoint para inicializar la base de datos con datos de prueba"""
-    from .init_db import init_database
-    try:
-        init_database()
-        return {"message": "Base de datos inicializada correctamente"}
-    except Exception as e:
-        return {"error": f"Error inicializando base de datos: {str(e)}"}
-
-@app.get("/debug/reproductoras")  
-def debug_reproductoras():
-    """Endpoint de debug para verificar reproductoras en la base de datos"""
-    from .database import SessionLocal
-    from . import models
-    
-    db = SessionLocal()
-    try:
-        reproductoras = db.query(models.CerdaReproductora).all()
-        return {
-            "total": len(reproductoras),
-            "reproductoras": [
-                {
-                    "id": r.id,
-                    "codigo_id": r.codigo_id,
-                    "raza": r.raza,
-                    "estado_reproductivo": r.estado_reproductivo,
-                    "propietario_id": r.user_id
-                }
-                for r in reproductoras
-            ]
-        }
-    finally:
-        db.close()
-
-@app.get("/debug/sementales")  
-def debug_sementales():
-    """Endpoint de debug para verificar sementales en la base de datos"""
-    from .database import SessionLocal
-    from . import models
-    
-    db = SessionLocal()
-    try:
-        sementales = db.query(models.Semental).all()
-        return {
-            "total": len(sementales),
-            "sementales": [
-                {
-                    "id": s.id,
-                    "nombre": s.nombre,
-                    "raza": s.raza,
-                    "tasa_fertilidad": s.tasa_fertilidad,
-                    "propietario_id": s.user_id
-                }
-                for s in sementales
-            ]
-        }
-    finally:
-        db.close()
\ No newline at end of file
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Arranque de la aplicación. El esquema lo gestiona Alembic (`alembic upgrade head`);
+    aquí solo se comprueba que la base de datos esté en la última migración.
+    """
+    from .config import get_settings
+    from .database import estado_migraciones
+
+    app.state.listo = False
+    inicio = time.perf_counter()
+    settings = get_settings()
+    if settings.verificar_migraciones:
+        actual, head = estado_migraciones()
+        if actual != head:
+            logger.warning(
+                "La base de datos está en la migración %s y la última es %s; ejecuta `alembic upgrade head`",
+                actual, head
+            )
+    # Particiones mensuales de movimientos (solo PostgreSQL): al arrancar, sin esperar al archivado
+    from .archivo_movimientos import mantener_particiones
+    mantener_particiones()
+    if settings.calentar_al_iniciar:
+        from .calentamiento import calentar
+        try:
+            calentar()
+        except Exception:
+            # Un worker sin calentar sigue pudiendo atender; solo será más lento al principio
+            logger.exception("No se pudo calentar el worker")
+    app.state.listo = True
+    arranque = app.state.tiempo_creacion + time.perf_counter() - inicio
+    metricas.registrar_arranque(arranque)
+    logger.info("Aplicación lista en %.0f ms", arranque * 1000)
+    yield
+    # Los streams SSE no terminan solos: se cierran para que el worker pueda apagarse
+    from .eventos import difusor
+    difusor.cerrar()
+
+def create_app() -> FastAPI:
+    """Construye la aplicación. Los routers se importan aquí y no al importar el módulo"""
+    inicio = time.perf_counter()
+    from .routers import reproductoras, sementales, lechones, engorde, veterinaria, auth, movimientos, dashboard, reportes, trabajos, sync
+
+    app = FastAPI(
+        title="PorciGest Pro API",
+        description="API para la gestión de granjas porcinas.",
+        version="1.1.0",
+        lifespan=lifespan,
+    )
+    app.add_middleware(compresion.MiddlewareCompresion)
+    app.add_middleware(instrumentacion.MiddlewareSQL)
+    app.add_middleware(limites.MiddlewareLimites)
+    app.add_middleware(metricas.MiddlewareMetricas)
+    # CORS se registra el último para ser el más externo: también las respuestas 429/503 del
+    # limitador llevan Access-Control-Allow-Origin y el navegador puede leer Retry-After
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],  # Explícitamente incluir OPTIONS
+        allow_headers=["*"],
+        expose_headers=["*", "Retry-After"],  # Con credenciales el navegador no acepta "*": Retry-After va explícito
+    )
+
+    app.include_router(auth.router)
+    app.include_router(reproductoras.router)
+    app.include_router(sementales.router)
+    app.include_router(lechones.router)
+    app.include_router(engorde.router)
+    app.include_router(veterinaria.router)
+    app.include_router(movimientos.router)
+    app.include_router(dashboard.router)
+    app.include_router(reportes.router)
+    app.include_router(trabajos.router)
+    app.include_router(sync.router)
+    app.state.tiempo_creacion = time.perf_counter() - inicio
+
+    @app.get("/")
+    def read_root():
+        return {"Proyecto": "API de PorciGest Pro"}
+
+    @app.get("/health", include_in_schema=False)
+    def read_health():
+        """Comprobación de vida del proceso"""
+        return {"status": "ok"}
+
+    @app.get("/ready", include_in_schema=False)
+    def read_ready():
+        """Disponibilidad: responde 503 hasta que el worker termina el calentamiento"""
+        if not getattr(app.state, "listo", False):
+            return JSONResponse({"status": "iniciando"}, status_code=503)
+        return {"status": "listo"}
+
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        """Métricas del proceso en formato Prometheus (peticiones, latencias, pool de BD y cachés)"""
+        return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4")
+
+    @app.post("/init-db", status_code=202)
+    def initialize_database():
+        """Endpoint para inicializar la base de datos con datos de prueba (se ejecuta en el proceso worker)"""
+        from .database import SessionLocal
+        from . import trabajos
+
+        db = SessionLocal()
+        try:
+            trabajo = trabajos.encolar(db, "inicializar_db")
+            db.commit()
+            return {"message": "Inicialización de la base de datos encolada", "trabajo_id": trabajo.id}
+        finally:
+            db.close()
+
+    @app.get("/debug/reproductoras")  
+    def debug_reproductoras():
+        """Endpoint de debug para verificar reproductoras en la base de datos"""
+        from .database import SessionLocal
+        from . import models
+
+        db = SessionLocal()
+        try:
+            reproductoras = db.query(models.CerdaReproductora).all()
+            return {
+                "total": len(reproductoras),
+                "reproductoras": [
+                    {
+                        "id": r.id,
+                        "codigo_id": r.codigo_id,
+                        "raza": r.raza,
+                        "estado_reproductivo": r.estado_reproductivo,
+                        "propietario_id": r.user_id
+                    }
+                    for r in reproductoras
+                ]
+            }
+        finally:
+            db.close()
+
+    @app.get("/debug/sementales")  
+    def debug_sementales():
+        """Endpoint de debug para verificar sementales en la base de datos"""
+        from .database import SessionLocal
+        from . import models
+
+        db = SessionLocal()
+        try:
+            sementales = db.query(models.Semental).all()
+            return {
+                "total": len(sementales),
+                "sementales": [
+                    {
+                        "id": s.id,
+                        "nombre": s.nombre,
+                        "raza": s.raza,
+                        "tasa_fertilidad": s.tasa_fertilidad,
+                        "propietario_id": s.user_id
+                    }
+                    for s in sementales
+                ]
+            }
+        finally:
+            db.close()
+
+    return app
+
+def __getattr__(nombre):
+    # `uvicorn app.main:app` sigue funcionando: la aplicación se crea en el primer acceso
+    if nombre == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,171 @@
+# app/metricas.py
+
+import logging
+import threading
+import time
+
+from starlette.routing import Match
+
+# Límites de los histogramas de latencia (segundos)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_peticiones = {}    # (método, ruta, estado) -> total
+_duraciones = {}    # (método, ruta, estado) -> [conteos por bucket..., suma, total]
+_en_curso = {}      # (método, ruta) -> peticiones activas
+_caches = {}        # nombre -> CacheTTL
+_arranque = None    # segundos que tardó la aplicación en quedar lista
+
+logger = logging.getLogger("porcigest")
+
+
+def registrar_cache(nombre: str, cache):
+    """Publica el tamaño y los aciertos/fallos de una caché en /metrics"""
+    _caches[nombre] = cache
+
+
+def registrar_arranque(segundos: float):
+    global _arranque
+    _arranque = segundos
+
+
+def plantilla_ruta(scope):
+    """Devuelve la plantilla de la ruta (ej. /reproductoras/{cerda_id}) para no crear una serie por ID"""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "sin_ruta"
+
+
+def _observar(metodo, ruta, estado, duracion):
+    clave = (metodo, ruta, estado)
+    with _lock:
+        _peticiones[clave] = _peticiones.get(clave, 0) + 1
+        histograma = _duraciones.get(clave)
+        if histograma is None:
+            histograma = _duraciones[clave] = [0] * (len(BUCKETS) + 2)
+        for i, limite in enumerate(BUCKETS):
+            if duracion <= limite:
+                histograma[i] += 1
+        histograma[-2] += duracion
+        histograma[-1] += 1
+
+
+def _cambiar_en_curso(metodo, ruta, delta):
+    with _lock:
+        _en_curso[(metodo, ruta)] = _en_curso.get((metodo, ruta), 0) + delta
+
+
+class MiddlewareMetricas:
+    """Middleware ASGI que mide cada petición por ruta y código de estado"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        ruta = plantilla_ruta(scope)
+        estado = [500]
+
+        async def send_con_estado(message):
+            if message["type"] == "http.response.start":
+                estado[0] = message["status"]
+            await send(message)
+
+        _cambiar_en_curso(metodo, ruta, 1)
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_con_estado)
+        except Exception:
+            logger.exception("Error no controlado en %s %s", metodo, ruta)
+            raise
+        finally:
+            _observar(metodo, ruta, str(estado[0]), time.perf_counter() - inicio)
+            _cambiar_en_curso(metodo, ruta, -1)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(**etiquetas):
+    contenido = ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in etiquetas.items())
+    return "{" + contenido + "}"
+
+
+def _metricas_pool():
+    from .database import engine
+
+    pool = engine.pool
+    lineas = []
+    for nombre, metodo, ayuda in (
+        ("porcigest_db_pool_size", "size", "Conexiones configuradas en el pool"),
+        ("porcigest_db_pool_checked_out", "checkedout", "Conexiones del pool en uso"),
+        ("porcigest_db_pool_overflow", "overflow", "Conexiones abiertas por encima del tamaño del pool"),
+    ):
+        if hasattr(pool, metodo):
+            lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} gauge", f"{nombre} {getattr(pool, metodo)()}"]
+    return lineas
+
+
+def exponer():
+    """Texto en formato de exposición de Prometheus con todas las métricas del proceso"""
+    with _lock:
+        peticiones = dict(_peticiones)
+        duraciones = {clave: list(valor) for clave, valor in _duraciones.items()}
+        en_curso = dict(_en_curso)
+
+    lineas = [
+        "# HELP porcigest_http_requests_total Peticiones HTTP atendidas",
+        "# TYPE porcigest_http_requests_total counter",
+    ]
+    for (metodo, ruta, estado), total in sorted(peticiones.items()):
+        lineas.append(f"porcigest_http_requests_total{_etiquetas(method=metodo, route=ruta, status=estado)} {total}")
+
+    lineas += [
+        "# HELP porcigest_http_request_duration_seconds Latencia de las peticiones HTTP",
+        "# TYPE porcigest_http_request_duration_seconds histogram",
+    ]
+    for (metodo, ruta, estado), histograma in sorted(duraciones.items()):
+        for limite, conteo in zip(BUCKETS, histograma):
+            etiquetas = _etiquetas(method=metodo, route=ruta, status=estado, le=limite)
+            lineas.append(f"porcigest_http_request_duration_seconds_bucket{etiquetas} {conteo}")
+        etiquetas = _etiquetas(method=metodo, route=ruta, status=estado, le="+Inf")
+        lineas.append(f"porcigest_http_request_duration_seconds_bucket{etiquetas} {histograma[-1]}")
+        etiquetas = _etiquetas(method=metodo, route=ruta, status=estado)
+        lineas.append(f"porcigest_http_request_duration_seconds_sum{etiquetas} {histograma[-2]:.6f}")
+        lineas.append(f"porcigest_http_request_duration_seconds_count{etiquetas} {histograma[-1]}")
+
+    lineas += [
+        "# HELP porcigest_http_requests_in_flight Peticiones HTTP en curso",
+        "# TYPE porcigest_http_requests_in_flight gauge",
+    ]
+    for (metodo, ruta), activos in sorted(en_curso.items()):
+        lineas.append(f"porcigest_http_requests_in_flight{_etiquetas(method=metodo, route=ruta)} {activos}")
+
+    if _arranque is not None:
+        lineas += [
+            "# HELP porcigest_startup_seconds Tiempo de arranque de la aplicación (creación + lifespan)",
+            "# TYPE porcigest_startup_seconds gauge",
+            f"porcigest_startup_seconds {_arranque:.6f}",
+        ]
+
+    lineas += _metricas_pool()
+
+    for nombre, tipo, atributo, ayuda in (
+        ("porcigest_cache_entries", "gauge", None, "Entradas almacenadas en la caché"),
+        ("porcigest_cache_hits_total", "counter", "aciertos", "Lecturas servidas desde la caché"),
+        ("porcigest_cache_misses_total", "counter", "fallos", "Lecturas que no encontraron la entrada en la caché"),
+    ):
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+        for cache_nombre, cache in sorted(_caches.items()):
+            valor = len(cache) if atributo is None else getattr(cache, atributo)
+            lineas.append(f"{nombre}{_etiquetas(cache=cache_nombre)} {valor}")
+
+    return "\n".join(lineas) + "\n"
@@ -1,6 +1,7 @@
 # app/models.py
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Boolean, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Boolean, DateTime, Index, JSON, UniqueConstraint, select
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import relationship, object_session
 from datetime import datetime
 
 from .database import Base
@@ -27,12 +28,20 @@ class User(Base):
 
 class CerdaReproductora(Base):
     __tablename__ = "cerdas_reproductoras"
+    __table_args__ = (
+        Index("ix_cerdas_reproductoras_user_id_id", "user_id", "id"),
+        Index("ix_cerdas_reproductoras_user_id_fecha_nacimiento", "user_id", "fecha_nacimiento"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     codigo_id = Column(String, unique=True, index=True, nullable=False)
     fecha_nacimiento = Column(Date)
     raza = Column(String)
     estado_reproductivo = Column(String, default="Vacía")
     user_id = Column(Integer, ForeignKey("users.id"))
+    actualizado_en = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # Para GET /sync
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Concurrencia optimista en los PUT
+    # Todo UPDATE del ORM (también el que anula claves al borrar un padre) incrementa la versión
+    __mapper_args__ = {"version_id_col": version}
     
     propietario = relationship("User", back_populates="cerdas_reproductoras")
     camadas = relationship("CamadaLechones", back_populates="madre")
@@ -41,11 +50,17 @@ class CerdaReproductora(Base):
 
 class Semental(Base):
     __tablename__ = "sementales"
+    __table_args__ = (
+        Index("ix_sementales_user_id_id", "user_id", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     nombre = Column(String, index=True)
     raza = Column(String)
     tasa_fertilidad = Column(Float, default=0.0)
     user_id = Column(Integer, ForeignKey("users.id"))
+    actualizado_en = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # Para GET /sync
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Concurrencia optimista en los PUT
+    __mapper_args__ = {"version_id_col": version}
     
     propietario = relationship("User", back_populates="sementales")
     camadas = relationship("CamadaLechones", back_populates="padre")
@@ -54,13 +69,20 @@ class Semental(Base):
 
 class CamadaLechones(Base):
     __tablename__ = "camadas_lechones"
+    __table_args__ = (
+        Index("ix_camadas_lechones_user_id_id", "user_id", "id"),
+        Index("ix_camadas_lechones_user_id_fecha_nacimiento", "user_id", "fecha_nacimiento"),
+    )
     id = Column(Integer, primary_key=True, index=True)
-    fecha_nacimiento = Column(Date, nullable=False)
+    fecha_nacimiento = Column(Date, nullable=False, index=True)
     numero_lechones = Column(Integer, nullable=False)
     peso_promedio_kg = Column(Float)
     madre_id = Column(Integer, ForeignKey("cerdas_reproductoras.id"))
     padre_id = Column(Integer, ForeignKey("sementales.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
+    actualizado_en = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # Para GET /sync
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Concurrencia optimista en los PUT
+    __mapper_args__ = {"version_id_col": version}
     
     propietario = relationship("User", back_populates="camadas")
     madre = relationship("CerdaReproductora", back_populates="camadas")
@@ -70,6 +92,10 @@ class CamadaLechones(Base):
 
 class LoteEngorde(Base):
     __tablename__ = "lotes_engorde"
+    __table_args__ = (
+        Index("ix_lotes_engorde_user_id_id", "user_id", "id"),
+        Index("ix_lotes_engorde_user_id_fecha_inicio", "user_id", "fecha_inicio"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     lote_id_str = Column(String, unique=True, index=True, nullable=False)
     fecha_inicio = Column(Date, nullable=False)
@@ -78,6 +104,9 @@ class LoteEngorde(Base):
     peso_actual_promedio = Column(Float)
     camada_origen_id = Column(Integer, ForeignKey("camadas_lechones.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
+    actualizado_en = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # Para GET /sync
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Concurrencia optimista en los PUT
+    __mapper_args__ = {"version_id_col": version}
     
     propietario = relationship("User", back_populates="lotes_engorde")
     camada_origen = relationship("CamadaLechones", back_populates="lote_engorde")
@@ -86,17 +115,24 @@ class LoteEngorde(Base):
 
 class TratamientoVeterinario(Base):
     __tablename__ = "tratamientos_veterinarios"
+    __table_args__ = (
+        Index("ix_tratamientos_veterinarios_user_id_id", "user_id", "id"),
+        Index("ix_tratamientos_veterinarios_user_id_fecha", "user_id", "fecha"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     tipo_intervencion = Column(String, nullable=False)
     medicamento_producto = Column(String)
     dosis = Column(String)
-    fecha = Column(Date, nullable=False)
+    fecha = Column(Date, nullable=False, index=True)
     veterinario = Column(String)
     observaciones = Column(String)
     reproductora_id = Column(Integer, ForeignKey("cerdas_reproductoras.id"), nullable=True)
     semental_id = Column(Integer, ForeignKey("sementales.id"), nullable=True)
     lote_engorde_id = Column(Integer, ForeignKey("lotes_engorde.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
+    actualizado_en = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)  # Para GET /sync
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Concurrencia optimista en los PUT
+    __mapper_args__ = {"version_id_col": version}
 
     propietario = relationship("User", back_populates="tratamientos")
     reproductora = relationship("CerdaReproductora", back_populates="tratamientos")
@@ -104,21 +140,157 @@ class TratamientoVeterinario(Base):
     lote_engorde = relationship("LoteEngorde", back_populates="tratamientos")
 
 
+class Eliminacion(Base):
+    """Marca de borrado de un registro del hato, para que GET /sync pueda informar de las eliminaciones"""
+    __tablename__ = "eliminaciones"
+    __table_args__ = (
+        Index("ix_eliminaciones_eliminado_en_id", "eliminado_en", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    entidad = Column(String, nullable=False)  # reproductoras, sementales, camadas, lotes, tratamientos
+    entidad_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, index=True)  # propietario del registro eliminado
+    eliminado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ValorAuditoria(Base):
+    """Diccionario de los textos repetidos de la auditoría (módulos, tipos, nombres, user agents)"""
+    __tablename__ = "valores_auditoria"
+    __table_args__ = (
+        UniqueConstraint("campo", "valor", name="uq_valores_auditoria_campo_valor"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    campo = Column(String, nullable=False)
+    valor = Column(String, nullable=False)
+
+
+# Columnas de Movimiento guardadas como ID de valores_auditoria
+CAMPOS_CODIFICADOS = ("usuario_nombre", "modulo", "tipo_movimiento", "entidad_tipo", "user_agent")
+
+
+def _columna_codificada(campo):
+    """
+    Atributo de texto respaldado por `<campo>_id`: se lee y asigna como texto y en las consultas
+    se compara contra valores_auditoria. Los textos nuevos se resuelven al hacer flush (app/diccionario.py)
+    """
+    columna_id = f"{campo}_id"
+
+    def leer(self):
+        pendientes = self.__dict__.get("_textos_pendientes")
+        if pendientes and campo in pendientes:
+            return pendientes[campo]
+        from .diccionario import diccionario
+        return diccionario.valor_de(object_session(self), getattr(self, columna_id))
+
+    def escribir(self, valor):
+        from .diccionario import diccionario
+        valor_id = diccionario.id_en_cache(campo, valor) if valor is not None else None
+        setattr(self, columna_id, valor_id)
+        if valor_id is None and valor is not None:
+            self.__dict__.setdefault("_textos_pendientes", {})[campo] = valor
+        elif "_textos_pendientes" in self.__dict__:
+            self.__dict__["_textos_pendientes"].pop(campo, None)
+
+    def expresion(cls):
+        return select(ValorAuditoria.valor).where(
+            ValorAuditoria.id == getattr(cls, columna_id)
+        ).scalar_subquery()
+
+    return hybrid_property(leer, escribir, expr=expresion)
+
+
 class Movimiento(Base):
     __tablename__ = "movimientos"
+    __table_args__ = (
+        Index("ix_movimientos_usuario_id_id", "usuario_id", "id"),
+        Index("ix_movimientos_usuario_id_fecha_movimiento", "usuario_id", "fecha_movimiento"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     usuario_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    usuario_nombre = Column(String, nullable=False)  # Para facilitar consultas
+    usuario_nombre_id = Column(Integer, ForeignKey("valores_auditoria.id"), nullable=False)  # Para facilitar consultas
     accion = Column(String, nullable=False)
-    modulo = Column(String, nullable=False)  # reproductoras, sementales, lechones, engorde, veterinaria
+    modulo_id = Column(Integer, ForeignKey("valores_auditoria.id"), nullable=False)  # reproductoras, sementales, lechones, engorde, veterinaria
     descripcion = Column(String)
-    entidad_tipo = Column(String)  # tipo de entidad afectada (cerda, semental, camada, etc.)
+    entidad_tipo_id = Column(Integer, ForeignKey("valores_auditoria.id"))  # tipo de entidad afectada (cerda, semental, camada, etc.)
     entidad_id = Column(Integer)  # ID de la entidad afectada
-    tipo_movimiento = Column(String, nullable=False)  # crear, editar, eliminar
-    fecha_movimiento = Column(DateTime, default=datetime.utcnow, nullable=False)
+    tipo_movimiento_id = Column(Integer, ForeignKey("valores_auditoria.id"), nullable=False)  # crear, editar, eliminar
+    fecha_movimiento = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     ip_address = Column(String)  # IP del usuario para auditoría
-    user_agent = Column(String)  # Información del navegador
+    user_agent_id = Column(Integer, ForeignKey("valores_auditoria.id"))  # Información del navegador
+
+    # Los textos repetidos se guardan como IDs del diccionario; hacia fuera siguen siendo texto
+    usuario_nombre = _columna_codificada("usuario_nombre")
+    modulo = _columna_codificada("modulo")
+    tipo_movimiento = _columna_codificada("tipo_movimiento")
+    entidad_tipo = _columna_codificada("entidad_tipo")
+    user_agent = _columna_codificada("user_agent")
     
     # Relación con usuario
-    usuario = relationship("User", foreign_keys=[usuario_id], overlaps="movimientos")
\ No newline at end of file
+    usuario = relationship("User", foreign_keys=[usuario_id], overlaps="movimientos")
+
+class PronosticoEvento(Base):
+    __tablename__ = "pronosticos_eventos"
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String, nullable=False)  # parto, destete, traslado_engorde
+    entidad_tipo = Column(String, nullable=False)  # cerda_reproductora, camada_lechones
+    entidad_id = Column(Integer, nullable=False)
+    fecha_base = Column(Date, nullable=False)  # fecha de servicio o de nacimiento usada para el cálculo
+    fecha_estimada = Column(Date, nullable=False, index=True)
+    calculado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class Reporte(Base):
+    __tablename__ = "reportes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    formato = Column(String, nullable=False, default="html")  # html, pdf
+    fecha_inicio = Column(Date, nullable=False)
+    fecha_fin = Column(Date, nullable=False)
+    estado = Column(String, nullable=False, default="pendiente")  # pendiente, procesando, completado, error
+    ruta_archivo = Column(String)
+    error = Column(String)
+    creado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
+    completado_en = Column(DateTime)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+
+
+class Trabajo(Base):
+    __tablename__ = "trabajos"
+    __table_args__ = (
+        Index("ix_trabajos_estado_programado_para", "estado", "programado_para"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    tipo = Column(String, nullable=False)  # inicializar_db, pronosticos, reporte, exportar_movimientos
+    parametros = Column(JSON)
+    estado = Column(String, nullable=False, default="pendiente")  # pendiente, procesando, completado, error
+    intentos = Column(Integer, nullable=False, default=0)
+    max_intentos = Column(Integer, nullable=False, default=3)
+    resultado = Column(JSON)
+    error = Column(String)
+    worker = Column(String)  # identificador del proceso que lo está ejecutando
+    programado_para = Column(DateTime, default=datetime.utcnow, nullable=False)
+    creado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
+    iniciado_en = Column(DateTime)
+    finalizado_en = Column(DateTime)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+
+
+
+class TokenRefresco(Base):
+    """Refresh token emitido al iniciar sesión; se guarda solo su hash y se revoca al rotarlo o cerrar sesión"""
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 del token
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+    creado_en = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expira_en = Column(DateTime, nullable=False)
+    revocado_en = Column(DateTime)
+
+# Registra los eventos de sesión y de mapper: textos codificados al hacer flush y marcas de borrado
+from . import diccionario, sincronizacion  # noqa: E402,F401
@@ -0,0 +1,98 @@
+# app/pronosticos.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, insert, delete
+from datetime import datetime, timedelta
+
+from . import models
+
+# Duraciones estándar del ciclo productivo porcino (en días)
+DIAS_GESTACION = 114
+DIAS_DESTETE = 21
+DIAS_TRASLADO_ENGORDE = 63
+
+# Tipos de intervención que se toman como fecha de servicio de la cerda
+PATRONES_SERVICIO = ["%insemin%", "%monta%", "%servicio%"]
+
+
+def _fechas_servicio(db: Session):
+    """
+    Fecha de servicio más reciente de cada cerda gestante, en una sola consulta agrupada.
+    Las cerdas sin inseminación, monta o servicio registrado vienen con fecha None: no se estima su parto,
+    porque ningún otro registro dice cuándo quedaron gestantes
+    """
+    servicios = db.query(
+        models.TratamientoVeterinario.reproductora_id.label("cerda_id"),
+        func.max(models.TratamientoVeterinario.fecha).label("fecha")
+    ).filter(
+        models.TratamientoVeterinario.reproductora_id.isnot(None),
+        or_(*[models.TratamientoVeterinario.tipo_intervencion.ilike(patron) for patron in PATRONES_SERVICIO])
+    ).group_by(models.TratamientoVeterinario.reproductora_id).subquery()
+
+    return db.query(
+        models.CerdaReproductora.id,
+        servicios.c.fecha
+    ).outerjoin(
+        servicios, servicios.c.cerda_id == models.CerdaReproductora.id
+    ).filter(
+        func.lower(models.CerdaReproductora.estado_reproductivo) == "gestante"
+    ).all()
+
+
+def generar_pronosticos(db: Session):
+    """
+    Recalcula los pronósticos de parto, destete y traslado a engorde de toda la granja.
+    Sustituye la tabla completa dentro de una única transacción.
+    """
+    calculado_en = datetime.utcnow()
+    filas = []
+    sin_fecha_servicio = 0
+
+    for cerda_id, fecha_base in _fechas_servicio(db):
+        if fecha_base is None:
+            sin_fecha_servicio += 1
+            continue
+        filas.append({
+            "tipo": "parto",
+            "entidad_tipo": "cerda_reproductora",
+            "entidad_id": cerda_id,
+            "fecha_base": fecha_base,
+            "fecha_estimada": fecha_base + timedelta(days=DIAS_GESTACION),
+            "calculado_en": calculado_en
+        })
+
+    # Camadas que todavía no han pasado a un lote de engorde
+    camadas = db.query(
+        models.CamadaLechones.id,
+        models.CamadaLechones.fecha_nacimiento
+    ).outerjoin(
+        models.LoteEngorde, models.LoteEngorde.camada_origen_id == models.CamadaLechones.id
+    ).filter(models.LoteEngorde.id.is_(None)).all()
+
+    for camada_id, fecha_nacimiento in camadas:
+        for tipo, dias in (("destete", DIAS_DESTETE), ("traslado_engorde", DIAS_TRASLADO_ENGORDE)):
+            filas.append({
+                "tipo": tipo,
+                "entidad_tipo": "camada_lechones",
+                "entidad_id": camada_id,
+                "fecha_base": fecha_nacimiento,
+                "fecha_estimada": fecha_nacimiento + timedelta(days=dias),
+                "calculado_en": calculado_en
+            })
+
+    try:
+        db.execute(delete(models.PronosticoEvento))
+        if filas:
+            db.execute(insert(models.PronosticoEvento), filas)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return {
+        "pronosticos": len(filas),
+        "partos": sum(1 for fila in filas if fila["tipo"] == "parto"),
+        "camadas": len(camadas),
+        "cerdas_sin_fecha_servicio": sin_fecha_servicio,
+        "calculado_en": calculado_en
+    }
@@ -0,0 +1,204 @@
+# app/reportes.py
+
+import logging
+import os
+from datetime import datetime, date
+from html import escape
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+
+from . import models, trabajos
+from .config import get_settings
+from .database import SessionLocal, SessionLectura
+
+logger = logging.getLogger("porcigest")
+
+
+def pdf_disponible():
+    """El formato PDF depende de WeasyPrint, que es una dependencia opcional"""
+    try:
+        import weasyprint  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def recopilar_datos(db: Session, fecha_inicio: date, fecha_fin: date):
+    """Inventario, indicadores reproductivos e historial sanitario del periodo, con consultas agregadas"""
+    cerdas_por_estado = db.query(
+        models.CerdaReproductora.estado_reproductivo,
+        func.count(models.CerdaReproductora.id)
+    ).group_by(models.CerdaReproductora.estado_reproductivo).all()
+
+    total_sementales = db.query(func.count(models.Semental.id)).scalar()
+
+    lotes = db.query(
+        func.count(models.LoteEngorde.id),
+        func.coalesce(func.sum(models.LoteEngorde.numero_cerdos), 0),
+        func.avg(models.LoteEngorde.peso_actual_promedio - models.LoteEngorde.peso_inicial_promedio)
+    ).one()
+
+    camadas = db.query(
+        func.count(models.CamadaLechones.id),
+        func.coalesce(func.sum(models.CamadaLechones.numero_lechones), 0),
+        func.avg(models.CamadaLechones.numero_lechones),
+        func.avg(models.CamadaLechones.peso_promedio_kg),
+        func.count(func.distinct(models.CamadaLechones.madre_id))
+    ).filter(models.CamadaLechones.fecha_nacimiento.between(fecha_inicio, fecha_fin)).one()
+
+    tratamientos_por_tipo = db.query(
+        models.TratamientoVeterinario.tipo_intervencion,
+        func.count(models.TratamientoVeterinario.id)
+    ).filter(
+        models.TratamientoVeterinario.fecha.between(fecha_inicio, fecha_fin)
+    ).group_by(models.TratamientoVeterinario.tipo_intervencion).all()
+
+    tratamientos = db.query(
+        models.TratamientoVeterinario.fecha,
+        models.TratamientoVeterinario.tipo_intervencion,
+        models.TratamientoVeterinario.medicamento_producto,
+        models.TratamientoVeterinario.dosis,
+        models.TratamientoVeterinario.veterinario,
+        models.TratamientoVeterinario.reproductora_id,
+        models.TratamientoVeterinario.semental_id,
+        models.TratamientoVeterinario.lote_engorde_id
+    ).filter(
+        models.TratamientoVeterinario.fecha.between(fecha_inicio, fecha_fin)
+    ).order_by(models.TratamientoVeterinario.fecha, models.TratamientoVeterinario.id).all()
+
+    return {
+        "fecha_inicio": fecha_inicio,
+        "fecha_fin": fecha_fin,
+        "cerdas_por_estado": [(estado or "Sin estado", cantidad) for estado, cantidad in cerdas_por_estado],
+        "total_cerdas": sum(cantidad for _, cantidad in cerdas_por_estado),
+        "total_sementales": total_sementales,
+        "lotes_engorde": lotes[0],
+        "cerdos_en_engorde": lotes[1],
+        "ganancia_peso_promedio": lotes[2],
+        "camadas": camadas[0],
+        "lechones_nacidos": camadas[1],
+        "lechones_por_camada": camadas[2],
+        "peso_nacimiento_promedio": camadas[3],
+        "cerdas_paridas": camadas[4],
+        "tratamientos_por_tipo": tratamientos_por_tipo,
+        "tratamientos": tratamientos
+    }
+
+
+def _numero(valor, decimales=1):
+    return "-" if valor is None else f"{valor:.{decimales}f}"
+
+
+def _tabla(encabezados, filas):
+    cabecera = "".join(f"<th>{escape(str(titulo))}</th>" for titulo in encabezados)
+    cuerpo = "".join(
+        "<tr>" + "".join(f"<td>{escape('-' if celda is None else str(celda))}</td>" for celda in fila) + "</tr>"
+        for fila in filas
+    )
+    return f"<table><thead><tr>{cabecera}</tr></thead><tbody>{cuerpo}</tbody></table>"
+
+
+def renderizar_html(datos):
+    """Convierte los datos del reporte en un documento HTML autocontenido"""
+    def animal(fila):
+        if fila.reproductora_id:
+            return f"Reproductora {fila.reproductora_id}"
+        if fila.semental_id:
+            return f"Semental {fila.semental_id}"
+        if fila.lote_engorde_id:
+            return f"Lote {fila.lote_engorde_id}"
+        return None
+
+    indicadores = [
+        ("Camadas en el periodo", datos["camadas"]),
+        ("Lechones nacidos", datos["lechones_nacidos"]),
+        ("Lechones por camada", _numero(datos["lechones_por_camada"])),
+        ("Peso promedio al nacer (kg)", _numero(datos["peso_nacimiento_promedio"], 2)),
+        ("Cerdas paridas", datos["cerdas_paridas"]),
+    ]
+    inventario = [("Cerdas reproductoras", datos["total_cerdas"])] + [
+        (f"  · {estado}", cantidad) for estado, cantidad in datos["cerdas_por_estado"]
+    ] + [
+        ("Sementales", datos["total_sementales"]),
+        ("Lotes de engorde", datos["lotes_engorde"]),
+        ("Cerdos en engorde", datos["cerdos_en_engorde"]),
+        ("Ganancia de peso promedio (kg)", _numero(datos["ganancia_peso_promedio"])),
+    ]
+    historial = [
+        (fila.fecha, fila.tipo_intervencion, fila.medicamento_producto, fila.dosis, fila.veterinario, animal(fila))
+        for fila in datos["tratamientos"]
+    ]
+
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Reporte PorciGest {datos['fecha_inicio']} - {datos['fecha_fin']}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; color: #222; }}
+h1 {{ color: #8b3a62; }}
+table {{ border-collapse: collapse; width: 100%; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+th {{ background: #f3e5ec; }}
+</style>
+</head>
+<body>
+<h1>Reporte de la granja</h1>
+<p>Periodo: {datos['fecha_inicio']} a {datos['fecha_fin']} · Generado: {datetime.utcnow():%Y-%m-%d %H:%M} UTC</p>
+<h2>Inventario</h2>
+{_tabla(["Concepto", "Cantidad"], inventario)}
+<h2>Indicadores reproductivos</h2>
+{_tabla(["Indicador", "Valor"], indicadores)}
+<h2>Historial sanitario</h2>
+{_tabla(["Intervención", "Cantidad"], datos["tratamientos_por_tipo"])}
+{_tabla(["Fecha", "Intervención", "Producto", "Dosis", "Veterinario", "Animal"], historial)}
+</body>
+</html>
+"""
+
+
+def generar_reporte(reporte_id: int):
+    """
+    Genera el archivo de un reporte pendiente y actualiza su estado. Usa su propia sesión.
+    Devuelve (estado, error) del reporte, o None si no existe.
+    """
+    db = SessionLocal()
+    try:
+        reporte = db.query(models.Reporte).filter(models.Reporte.id == reporte_id).first()
+        if reporte is None:
+            return None
+        reporte.estado = "procesando"
+        db.commit()
+
+        lectura = SessionLectura()  # las consultas del reporte no cargan el primario si hay réplica
+        try:
+            html = renderizar_html(recopilar_datos(lectura, reporte.fecha_inicio, reporte.fecha_fin))
+            reportes_dir = get_settings().reportes_dir
+            os.makedirs(reportes_dir, exist_ok=True)
+            ruta = os.path.join(reportes_dir, f"reporte_{reporte.id}.{reporte.formato}")
+            if reporte.formato == "pdf":
+                import weasyprint
+                weasyprint.HTML(string=html).write_pdf(ruta)
+            else:
+                with open(ruta, "w", encoding="utf-8") as archivo:
+                    archivo.write(html)
+            reporte.ruta_archivo = ruta
+            reporte.estado = "completado"
+        except Exception as e:
+            logger.exception("Error generando reporte %s", reporte_id)
+            db.rollback()
+            reporte.estado = "error"
+            reporte.error = str(e)
+        finally:
+            lectura.close()
+        reporte.completado_en = datetime.utcnow()
+        db.commit()
+        return reporte.estado, reporte.error
+    finally:
+        db.close()
+
+
+def encolar_reporte(db: Session, reporte_id: int, user_id: int = None):
+    """Programa la generación del reporte en la cola de trabajos y vuelve de inmediato"""
+    return trabajos.encolar(db, "reporte", {"reporte_id": reporte_id}, user_id=user_id, max_intentos=1)
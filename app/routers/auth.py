@@ -1,11 +1,11 @@
 # app/routers/auth.py
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
-from .. import crud, schemas, security
-from ..config import settings
+from .. import crud, schemas, security, sesiones
+from ..config import get_settings
 
 router = APIRouter(tags=["Autenticación"])
 
@@ -17,7 +17,9 @@ def signup(user: schemas.UserCreate, db: Session = Depends(security.get_db)):
     db_user = crud.get_user_by_documento(db, numero_documento=user.numero_documento)
     if db_user:
         raise HTTPException(status_code=400, detail="El número de documento ya está registrado")
-    return crud.create_user(db=db, user=user)
+    nuevo_usuario = crud.create_user(db=db, user=user)
+    db.commit()
+    return nuevo_usuario
 
 @router.post("/token", response_model=schemas.Token)
 def login_for_access_token(db: Session = Depends(security.get_db), form_data: OAuth2PasswordRequestForm = Depends()):
@@ -34,15 +36,42 @@ def login_for_access_token(db: Session = Depends(security.get_db), form_data: OA
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    refresh_token = sesiones.emitir(db, user)
+    db.commit()
+    return _respuesta_token(sesiones.perfil_de(user), refresh_token)
+
+@router.post("/token/refresh", response_model=schemas.Token)
+def refrescar_token(peticion: schemas.RefrescarToken, db: Session = Depends(security.get_db)):
+    """
+    Renueva la sesión sin volver a pedir la contraseña: canjea el refresh token por un access token
+    nuevo y un refresh token nuevo (el anterior deja de valer).
+    """
+    try:
+        perfil, refresh_token = sesiones.rotar(db, peticion.refresh_token)
+    except ValueError as e:
+        db.commit()  # guarda la revocación de las sesiones si el token ya se había usado
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    db.commit()
+    return _respuesta_token(perfil, refresh_token)
+
+@router.post("/logout", status_code=204)
+def logout(peticion: schemas.CerrarSesion, db: Session = Depends(security.get_db)):
+    """
+    Cierra la sesión revocando el refresh token (con `todas`, también las demás sesiones del usuario).
+    El access token sigue valiendo hasta que expira.
+    """
+    sesiones.revocar(db, peticion.refresh_token, todas=peticion.todas)
+    db.commit()
+    return Response(status_code=204)
+
+def _respuesta_token(perfil: dict, refresh_token: str):
+    access_token_expires = timedelta(minutes=get_settings().access_token_expire_minutes)
     access_token = security.create_access_token(
-        data={"sub": user.numero_documento}, expires_delta=access_token_expires
+        data={"sub": perfil["numero_documento"]}, expires_delta=access_token_expires
     )
     return {
         "access_token": access_token, 
         "token_type": "bearer",
-        "nombre": user.nombre,
-        "apellido": user.apellido,
-        "numero_documento": user.numero_documento,
-        "tipo_documento": user.tipo_documento
+        "refresh_token": refresh_token,
+        **perfil
     }
\ No newline at end of file
@@ -0,0 +1,90 @@
+# app/routers/dashboard.py
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date, timedelta
+from functools import lru_cache
+
+from .. import crud, schemas, security, trabajos, metricas
+from ..cache import CacheTTL
+from ..config import get_settings
+from ..database import get_db
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["Dashboard"]
+)
+
+# El resumen cambia poco entre peticiones; una caché corta evita repetir los agregados.
+# Se vacía al confirmar cualquier escritura que deje un movimiento (ver app/eventos.py). Se crea en la primera petición para no leer la configuración al importar el router
+@lru_cache
+def cache_resumen():
+    cache = CacheTTL(ttl_segundos=get_settings().dashboard_cache_ttl)
+    metricas.registrar_cache("dashboard_resumen", cache)
+    return cache
+
+@router.get("/resumen", response_model=schemas.ResumenDashboard)
+def read_resumen_dashboard(
+    mine: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene los contadores de la granja y los últimos tratamientos en una sola llamada.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
+    """
+    user_id = current_user.id if mine else None
+    return cache_resumen().obtener_o_calcular(("resumen", user_id), lambda: crud.get_resumen_dashboard(db, user_id=user_id))
+
+@router.get("/calendario", response_model=List[schemas.EventoCalendario])
+def read_calendario(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    skip: int = 0,
+    limit: int = 100,
+    mine: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene los tratamientos y partos de una ventana de fechas (por defecto, los próximos 7 días).
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
+    """
+    desde = desde or date.today()
+    hasta = hasta or desde + timedelta(days=7)
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'")
+    return crud.get_calendario_eventos(db, desde=desde, hasta=hasta, skip=skip, limit=limit, user_id=current_user.id if mine else None)
+
+@router.get("/pronosticos", response_model=List[schemas.Pronostico])
+def read_pronosticos(
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+    tipo: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene los partos, destetes y traslados previstos en una ventana de fechas (por defecto, los próximos 30 días).
+    Los pronósticos se calculan por lotes; este endpoint solo los lee.
+    """
+    desde = desde or date.today()
+    hasta = hasta or desde + timedelta(days=30)
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'")
+    return crud.get_pronosticos(db, desde=desde, hasta=hasta, tipo=tipo, skip=skip, limit=limit)
+
+@router.post("/pronosticos/recalcular", response_model=schemas.Trabajo, status_code=202)
+def recalcular_pronosticos(
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Encola el recálculo de los pronósticos de toda la granja; el progreso se consulta en `GET /trabajos/{id}`.
+    """
+    trabajo = trabajos.encolar(db, "pronosticos", user_id=current_user.id)
+    db.commit()
+    return trabajo
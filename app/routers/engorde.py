@@ -1,11 +1,11 @@
 # app/routers/engorde.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
-from .. import crud, schemas, security
+from .. import crud, models, schemas, security
 from ..database import get_db
 
 def serialize_lote_engorde(lote):
@@ -22,6 +22,7 @@ def serialize_lote_engorde(lote):
             "peso_inicial_promedio": lote.peso_inicial_promedio,
             "peso_actual_promedio": lote.peso_actual_promedio,
             "camada_origen_id": lote.camada_origen_id,
+            "version": lote.version,
             "camada_origen": {
                 "id": lote.camada_origen.id,
                 "fecha_nacimiento": lote.camada_origen.fecha_nacimiento.isoformat() if lote.camada_origen.fecha_nacimiento else None,
@@ -91,24 +92,22 @@ def create_lote_de_engorde(
         raise HTTPException(status_code=404, detail=f"No se encontró la camada de origen con ID {lote.camada_origen_id}")
 
     # Pasamos el ID del usuario actual a la función del CRUD
-    new_lote = crud.create_lote_engorde(db=db, lote=lote, user_id=current_user.id)
+    new_lote = crud.create_lote_engorde(db=db, lote=lote, user_id=current_user.id, camada_origen=db_camada)
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Creó nuevo lote de engorde",
-            modulo="Engorde",
-            descripcion=f"Lote {new_lote.lote_id_str} con {new_lote.numero_cerdos} cerdos de camada {db_camada.id}",
-            tipo_movimiento="crear",
-            entidad_tipo="lote_engorde",
-            entidad_id=new_lote.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Creó nuevo lote de engorde",
+        modulo="Engorde",
+        descripcion=f"Lote {new_lote.lote_id_str} con {new_lote.numero_cerdos} cerdos de camada {db_camada.id}",
+        tipo_movimiento="crear",
+        entidad_tipo="lote_engorde",
+        entidad_id=new_lote.id
+    )
     
+    db.commit()
     return serialize_lote_engorde(new_lote)
 
 
@@ -116,13 +115,15 @@ def create_lote_de_engorde(
 def read_lotes_de_engorde(
     skip: int = 0, 
     limit: int = 100, 
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene una lista de todos los lotes de engorde.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
     """
-    lotes = crud.get_lotes_engorde(db, skip=skip, limit=limit)
+    lotes = crud.get_lotes_engorde(db, skip=skip, limit=limit, user_id=current_user.id if mine else None)
     # Filtrar lotes que tengan camada de origen válida
     lotes_validos = []
     for lote in lotes:
@@ -142,13 +143,15 @@ def read_lotes_de_engorde(
 @router.get("/{lote_id}")
 def read_lote_de_engorde(
     lote_id: int, 
+    response: Response,
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene la información de un lote de engorde específico por su ID numérico.
     """
-    db_lote = crud.get_lote_engorde(db, lote_id=lote_id)
+    db_lote = crud.get_lote_engorde(db, lote_id=lote_id, user_id=current_user.id if mine else None)
     if db_lote is None:
         raise HTTPException(status_code=404, detail="Lote de engorde no encontrado")
     
@@ -159,6 +162,7 @@ def read_lote_de_engorde(
     if not db_lote.camada_origen.madre or not db_lote.camada_origen.padre:
         raise HTTPException(status_code=422, detail="La camada de origen tiene relaciones inválidas")
     
+    response.headers["ETag"] = f'"{db_lote.version}"'
     return serialize_lote_engorde(db_lote)
 
 
@@ -166,32 +170,43 @@ def read_lote_de_engorde(
 def update_lote_de_engorde(
     lote_id: int, 
     lote: schemas.LoteEngordeUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Actualiza la información de un lote de engorde específico.
     """
-    db_lote = crud.update_lote_engorde(db, lote_id=lote_id, lote_update=lote)
+    if lote.camada_origen_id is not None and not crud.existe(db, models.CamadaLechones, lote.camada_origen_id):
+        raise HTTPException(status_code=404, detail=f"No se encontró la camada de origen con ID {lote.camada_origen_id}")
+    
+    try:
+        db_lote = crud.update_lote_engorde(db, lote_id=lote_id, lote_update=lote, version=crud.version_de_if_match(if_match))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except crud.ConflictoDeVersion as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except crud.PrecondicionRequerida as e:
+        raise HTTPException(status_code=428, detail=str(e))
     if db_lote is None:
         raise HTTPException(status_code=404, detail="Lote de engorde no encontrado para actualizar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Actualizó lote de engorde",
-            modulo="Engorde",
-            descripcion=f"Lote {db_lote.lote_id_str} con {db_lote.numero_cerdos} cerdos",
-            tipo_movimiento="actualizar",
-            entidad_tipo="lote_engorde",
-            entidad_id=db_lote.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Actualizó lote de engorde",
+        modulo="Engorde",
+        descripcion=f"Lote {db_lote.lote_id_str} con {db_lote.numero_cerdos} cerdos",
+        tipo_movimiento="actualizar",
+        entidad_tipo="lote_engorde",
+        entidad_id=db_lote.id
+    )
     
+    db.commit()
+    response.headers["ETag"] = f'"{db_lote.version}"'
     return serialize_lote_engorde(db_lote)
 
 
@@ -214,19 +229,35 @@ def delete_lote_de_engorde(
         raise HTTPException(status_code=404, detail="Lote de engorde no encontrado para eliminar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Eliminó lote de engorde",
-            modulo="Engorde",
-            descripcion=f"Lote eliminado: {lote_info.lote_id_str} con {lote_info.numero_cerdos} cerdos",
-            tipo_movimiento="eliminar",
-            entidad_tipo="lote_engorde",
-            entidad_id=lote_id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Eliminó lote de engorde",
+        modulo="Engorde",
+        descripcion=f"Lote eliminado: {lote_info.lote_id_str} con {lote_info.numero_cerdos} cerdos",
+        tipo_movimiento="eliminar",
+        entidad_tipo="lote_engorde",
+        entidad_id=lote_id
+    )
     
-    return serialize_lote_engorde(db_lote)
\ No newline at end of file
+    db.commit()
+    return serialize_lote_engorde(db_lote)
+
+
+@router.post("/eliminar-varios", response_model=schemas.ResultadoEliminacionVarios)
+def eliminar_varios_lotes(
+    peticion: schemas.EliminacionVarios,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Elimina varios lotes de engorde a la vez, por lista de `ids` o por `filtro`, en una sola transacción.
+    También se eliminan sus tratamientos.
+    """
+    try:
+        resultado = crud.eliminar_varios(db, "lotes", peticion, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return resultado
@@ -1,9 +1,9 @@
 # app/routers/lechones.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, date
 
 from .. import crud, models, schemas, security
 from ..database import get_db
@@ -21,6 +21,7 @@ def serialize_camada(camada):
             "peso_promedio_kg": camada.peso_promedio_kg,
             "madre_id": camada.madre_id,
             "padre_id": camada.padre_id,
+            "version": camada.version,
             "madre": {
                 "id": camada.madre.id,
                 "codigo_id": camada.madre.codigo_id,
@@ -77,37 +78,37 @@ def create_camada_de_lechones(
         raise HTTPException(status_code=404, detail=f"No se encontró el semental padre con ID {camada.padre_id}")
 
     # Crear la camada
-    new_camada = crud.create_camada(db=db, camada=camada, user_id=current_user.id)
+    new_camada = crud.create_camada(db=db, camada=camada, user_id=current_user.id, madre=db_madre, padre=db_padre)
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Registró nueva camada de lechones",
-            modulo="Lechones",
-            descripcion=f"Camada de {new_camada.numero_lechones} lechones, madre: {db_madre.codigo_id}, padre: {db_padre.nombre}",
-            tipo_movimiento="crear",
-            entidad_tipo="camada_lechones",
-            entidad_id=new_camada.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Registró nueva camada de lechones",
+        modulo="Lechones",
+        descripcion=f"Camada de {new_camada.numero_lechones} lechones, madre: {db_madre.codigo_id}, padre: {db_padre.nombre}",
+        tipo_movimiento="crear",
+        entidad_tipo="camada_lechones",
+        entidad_id=new_camada.id
+    )
     
+    db.commit()
     return serialize_camada(new_camada)
 
 @router.get("/")
 def read_camadas_de_lechones(
     skip: int = 0, 
     limit: int = 100, 
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene una lista de todas las camadas de lechones registradas.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
     """
-    camadas = crud.get_camadas(db, skip=skip, limit=limit)
+    camadas = crud.get_camadas(db, skip=skip, limit=limit, user_id=current_user.id if mine else None)
     # Filtrar camadas que tengan madre y padre válidos
     camadas_validas = []
     for camada in camadas:
@@ -121,16 +122,37 @@ def read_camadas_de_lechones(
             continue
     return camadas_validas
 
+@router.get("/rango")
+def read_camadas_por_rango(
+    desde: date,
+    hasta: date,
+    skip: int = 0,
+    limit: int = 100,
+    mine: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene las camadas nacidas entre dos fechas.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
+    """
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'")
+    camadas = crud.get_camadas_por_rango(db, desde=desde, hasta=hasta, skip=skip, limit=limit, user_id=current_user.id if mine else None)
+    return [serialized for serialized in (serialize_camada(camada) for camada in camadas) if serialized]
+
 @router.get("/{camada_id}")
 def read_camada_de_lechones(
     camada_id: int, 
+    response: Response,
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene la información de una camada específica por su ID.
     """
-    db_camada = crud.get_camada(db, camada_id=camada_id)
+    db_camada = crud.get_camada(db, camada_id=camada_id, user_id=current_user.id if mine else None)
     if db_camada is None:
         raise HTTPException(status_code=404, detail="Camada no encontrada")
     
@@ -138,38 +160,53 @@ def read_camada_de_lechones(
     if not db_camada.madre or not db_camada.padre or not db_camada.propietario:
         raise HTTPException(status_code=422, detail="La camada tiene relaciones inválidas")
     
+    response.headers["ETag"] = f'"{db_camada.version}"'
     return serialize_camada(db_camada)
 
 @router.put("/{camada_id}")
 def update_camada_de_lechones(
     camada_id: int, 
     camada: schemas.CamadaUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Actualiza la información de una camada específica.
     """
-    db_camada = crud.update_camada(db, camada_id=camada_id, camada_update=camada)
+    faltantes = crud.referencias_faltantes(db, madre_id=(models.CerdaReproductora, camada.madre_id), padre_id=(models.Semental, camada.padre_id))
+    if "madre_id" in faltantes:
+        raise HTTPException(status_code=404, detail=f"No se encontró la cerda madre con ID {camada.madre_id}")
+    if "padre_id" in faltantes:
+        raise HTTPException(status_code=404, detail=f"No se encontró el semental padre con ID {camada.padre_id}")
+    
+    try:
+        db_camada = crud.update_camada(db, camada_id=camada_id, camada_update=camada, version=crud.version_de_if_match(if_match))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except crud.ConflictoDeVersion as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except crud.PrecondicionRequerida as e:
+        raise HTTPException(status_code=428, detail=str(e))
     if db_camada is None:
         raise HTTPException(status_code=404, detail="Camada no encontrada para actualizar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Actualizó camada de lechones",
-            modulo="Lechones",
-            descripcion=f"Camada ID {camada_id}: {db_camada.numero_lechones} lechones",
-            tipo_movimiento="actualizar",
-            entidad_tipo="camada_lechones",
-            entidad_id=db_camada.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Actualizó camada de lechones",
+        modulo="Lechones",
+        descripcion=f"Camada ID {camada_id}: {db_camada.numero_lechones} lechones",
+        tipo_movimiento="actualizar",
+        entidad_tipo="camada_lechones",
+        entidad_id=db_camada.id
+    )
     
+    db.commit()
+    response.headers["ETag"] = f'"{db_camada.version}"'
     return serialize_camada(db_camada)
 
 @router.delete("/{camada_id}")
@@ -191,19 +228,35 @@ def delete_camada_de_lechones(
         raise HTTPException(status_code=404, detail="Camada no encontrada para eliminar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Eliminó camada de lechones",
-            modulo="Lechones",
-            descripcion=f"Camada eliminada con {camada_info.numero_lechones} lechones",
-            tipo_movimiento="eliminar",
-            entidad_tipo="camada_lechones",
-            entidad_id=camada_id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Eliminó camada de lechones",
+        modulo="Lechones",
+        descripcion=f"Camada eliminada con {camada_info.numero_lechones} lechones",
+        tipo_movimiento="eliminar",
+        entidad_tipo="camada_lechones",
+        entidad_id=camada_id
+    )
     
-    return serialize_camada(db_camada)
\ No newline at end of file
+    db.commit()
+    return serialize_camada(db_camada)
+
+
+@router.post("/eliminar-varios", response_model=schemas.ResultadoEliminacionVarios)
+def eliminar_varios_camadas(
+    peticion: schemas.EliminacionVarios,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Elimina varias camadas de lechones a la vez, por lista de `ids` o por `filtro`, en una sola transacción.
+    También se eliminan los lotes de engorde que salieron de ellas.
+    """
+    try:
+        resultado = crud.eliminar_varios(db, "camadas", peticion, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return resultado
@@ -1,12 +1,21 @@
 # app/routers/movimientos.py
 
+import asyncio
+import json
+
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
 
 from .. import crud, models, schemas
-from ..database import get_db
+from ..config import get_settings
+from ..database import get_db, SessionLectura
+from ..diccionario import diccionario
+from ..eventos import difusor, movimiento_a_dict
 from ..security import get_current_user
 
 router = APIRouter(prefix="/movimientos", tags=["movimientos"])
@@ -33,6 +42,7 @@ def create_movimiento(
         user_id=current_user.id,
         usuario_nombre=f"{current_user.nombre} {current_user.apellido}"
     )
+    db.commit()
     
     return {
         "id": new_movimiento.id,
@@ -59,10 +69,11 @@ def get_movimientos(
     usuario_id: Optional[int] = None,
     page: int = 1,
     size: int = 10,
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    """Obtener movimientos con filtros y paginación"""
+    """Obtener movimientos con filtros y paginación (`mine=true` para ver solo los propios)"""
     
     # Validaciones
     if size > 100:
@@ -76,7 +87,7 @@ def get_movimientos(
         tipo_movimiento=tipo_movimiento,
         fecha_inicio=fecha_inicio,
         fecha_fin=fecha_fin,
-        usuario_id=usuario_id,
+        usuario_id=current_user.id if mine else usuario_id,
         page=page,
         size=size
     )
@@ -122,14 +133,116 @@ def get_estadisticas_movimientos(
     
     return crud.get_estadisticas_movimientos(db=db, dias=dias)
 
+def _evento_sse(movimiento: dict):
+    return f"id: {movimiento['id']}\nevent: movimiento\ndata: {json.dumps(movimiento, ensure_ascii=False)}\n\n"
+
+# El stream abre sus propias sesiones y solo un momento: no retiene una conexión del pool mientras dura
+
+def _id_usuario_autenticado(token: str):
+    db = SessionLectura()
+    try:
+        return get_current_user(token=token, db=db).id
+    finally:
+        db.close()
+
+def _movimientos_perdidos(ultimo_id: str, suscripcion, limite: int = 100):
+    """
+    Movimientos posteriores a Last-Event-ID que cumplen los filtros de la suscripción. Devuelve (movimientos, recargar_desde):
+    si se perdieron más de `limite` no se reenvía ninguno y recargar_desde es el último ID, para que el cliente recargue
+    """
+    if not ultimo_id.isdigit():
+        return [], None
+    db = SessionLectura()
+    try:
+        query = db.query(models.Movimiento).filter(models.Movimiento.id > int(ultimo_id))
+        # Los filtros van en la consulta, antes del LIMIT: si no, los del módulo pedido más allá del límite se perderían
+        if suscripcion.usuario_id:
+            query = query.filter(models.Movimiento.usuario_id == suscripcion.usuario_id)
+        if suscripcion.modulo:
+            query = query.filter(models.Movimiento.modulo_id == diccionario.id_de(db, "modulo", suscripcion.modulo, crear=False))
+        movimientos = query.order_by(models.Movimiento.id).limit(limite + 1).all()
+        if len(movimientos) > limite:
+            return [], db.query(func.max(models.Movimiento.id)).scalar()
+        return [movimiento_a_dict(mov) for mov in movimientos], None
+    finally:
+        db.close()
+
+@router.get("/stream")
+async def stream_movimientos(
+    request: Request,
+    token: Optional[str] = None,
+    modulo: Optional[str] = None,
+    usuario_id: Optional[int] = None,
+    mine: bool = False
+):
+    """
+    Movimientos nuevos en tiempo real (Server-Sent Events), en lugar de consultar GET /movimientos/ periódicamente.
+    EventSource no envía cabeceras, así que el token se acepta también como `?token=`.
+    Al reconectar, el navegador manda Last-Event-ID y se reenvían los movimientos que se perdieron; si son
+    demasiados se envía un evento `recargar` y el cliente debe volver a pedir la lista.
+    """
+    if not token:
+        autorizacion = request.headers.get("authorization", "")
+        token = autorizacion[7:] if autorizacion.lower().startswith("bearer ") else None
+    if not token:
+        raise HTTPException(status_code=401, detail="No autenticado", headers={"WWW-Authenticate": "Bearer"})
+
+    id_usuario = await run_in_threadpool(_id_usuario_autenticado, token)
+    if mine:
+        usuario_id = id_usuario
+    # Primero se suscribe y luego se buscan los perdidos, para no dejar un hueco entre ambos
+    suscripcion = difusor.suscribir(modulo=modulo, usuario_id=usuario_id)
+    try:
+        perdidos, recargar_desde = await run_in_threadpool(
+            _movimientos_perdidos, request.headers.get("last-event-id", ""), suscripcion
+        )
+    except Exception:
+        difusor.cancelar(suscripcion)
+        raise
+
+    async def eventos():
+        latido = get_settings().sse_latido_segundos
+        try:
+            yield "retry: 3000\n\n"
+            ultimo = 0
+            if recargar_desde is not None:
+                # Demasiados perdidos para reenviarlos: el cliente recarga la lista con GET /movimientos/.
+                # El id del evento hace que la próxima reconexión siga desde aquí
+                ultimo = recargar_desde
+                yield f"id: {recargar_desde}\nevent: recargar\ndata: {{}}\n\n"
+            for movimiento in perdidos:
+                ultimo = movimiento["id"]
+                yield _evento_sse(movimiento)
+            while not suscripcion.desbordada:
+                try:
+                    movimiento = await asyncio.wait_for(suscripcion.cola.get(), timeout=latido)
+                except asyncio.TimeoutError:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": latido\n\n"
+                    continue
+                if movimiento is None:
+                    break
+                if movimiento["id"] > ultimo:
+                    yield _evento_sse(movimiento)
+        finally:
+            # Starlette cancela el generador cuando el cliente se desconecta
+            difusor.cancelar(suscripcion)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{movimiento_id}", response_model=dict)
 def get_movimiento(
     movimiento_id: int,
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """Obtener un movimiento específico"""
-    movimiento = crud.get_movimiento(db=db, movimiento_id=movimiento_id)
+    movimiento = crud.get_movimiento(db=db, movimiento_id=movimiento_id, usuario_id=current_user.id if mine else None)
     if not movimiento:
         raise HTTPException(status_code=404, detail="Movimiento no encontrado")
     
@@ -0,0 +1,91 @@
+# app/routers/reportes.py
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List
+from datetime import date, timedelta
+import os
+
+from .. import crud, schemas, security, reportes
+from ..database import get_db
+
+router = APIRouter(
+    prefix="/reportes",
+    tags=["Reportes"]
+)
+
+FORMATOS = {"html": "text/html", "pdf": "application/pdf"}
+
+@router.post("/", response_model=schemas.Reporte, status_code=202)
+def create_reporte(
+    reporte: schemas.ReporteCreate,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Solicita un reporte de inventario, indicadores reproductivos e historial sanitario.
+    El archivo lo genera el proceso worker (`python worker.py`); consulte `GET /reportes/{id}` hasta que esté `completado`.
+    Si no se indica periodo se usa el mes anterior.
+    """
+    if reporte.formato not in FORMATOS:
+        raise HTTPException(status_code=400, detail="Formato no soportado (use 'html' o 'pdf')")
+    if reporte.formato == "pdf" and not reportes.pdf_disponible():
+        raise HTTPException(status_code=400, detail="La generación de PDF no está disponible en este servidor (instale weasyprint)")
+
+    fin_mes_anterior = date.today().replace(day=1) - timedelta(days=1)
+    fecha_fin = reporte.fecha_fin or fin_mes_anterior
+    fecha_inicio = reporte.fecha_inicio or fecha_fin.replace(day=1)
+    if fecha_inicio > fecha_fin:
+        raise HTTPException(status_code=400, detail="La fecha de inicio no puede ser posterior a la fecha de fin")
+
+    db_reporte = crud.create_reporte(db, formato=reporte.formato, fecha_inicio=fecha_inicio, fecha_fin=fecha_fin, user_id=current_user.id)
+    reportes.encolar_reporte(db, db_reporte.id, user_id=current_user.id)
+    db.commit()
+    return db_reporte
+
+@router.get("/", response_model=List[schemas.Reporte])
+def read_reportes(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene los reportes solicitados por el usuario autenticado.
+    """
+    return crud.get_reportes(db, user_id=current_user.id, skip=skip, limit=limit)
+
+@router.get("/{reporte_id}", response_model=schemas.Reporte)
+def read_reporte(
+    reporte_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene el estado de un reporte.
+    """
+    db_reporte = crud.get_reporte(db, reporte_id=reporte_id, user_id=current_user.id)
+    if db_reporte is None:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado")
+    return db_reporte
+
+@router.get("/{reporte_id}/archivo")
+def download_reporte(
+    reporte_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Descarga el archivo de un reporte completado.
+    """
+    db_reporte = crud.get_reporte(db, reporte_id=reporte_id, user_id=current_user.id)
+    if db_reporte is None:
+        raise HTTPException(status_code=404, detail="Reporte no encontrado")
+    if db_reporte.estado != "completado" or not db_reporte.ruta_archivo or not os.path.exists(db_reporte.ruta_archivo):
+        raise HTTPException(status_code=409, detail=f"El reporte aún no está disponible (estado: {db_reporte.estado})")
+    return FileResponse(
+        db_reporte.ruta_archivo,
+        media_type=FORMATOS[db_reporte.formato],
+        filename=os.path.basename(db_reporte.ruta_archivo)
+    )
@@ -1,8 +1,8 @@
 # app/routers/reproductoras.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .. import crud, models, schemas, security
 from ..database import get_db
@@ -29,81 +29,91 @@ def create_cerda_reproductora(
     new_cerda = crud.create_cerda(db=db, cerda=cerda, user_id=current_user.id)
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Registró nueva cerda reproductora",
-            modulo="Reproductoras",
-            descripcion=f"Agregó cerda {new_cerda.codigo_id}, raza {new_cerda.raza}, estado {new_cerda.estado_reproductivo}",
-            tipo_movimiento="crear",
-            entidad_tipo="cerda_reproductora",
-            entidad_id=new_cerda.id
-        )
-    except Exception as e:
-        # No fallar la operación principal si falla el logging
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Registró nueva cerda reproductora",
+        modulo="Reproductoras",
+        descripcion=f"Agregó cerda {new_cerda.codigo_id}, raza {new_cerda.raza}, estado {new_cerda.estado_reproductivo}",
+        tipo_movimiento="crear",
+        entidad_tipo="cerda_reproductora",
+        entidad_id=new_cerda.id
+    )
     
+    db.commit()
     return new_cerda
 
 @router.get("/", response_model=List[schemas.Cerda])
 def read_cerdas_reproductoras(
     skip: int = 0, 
     limit: int = 100, 
+    mine: bool = False,
     db: Session = Depends(get_db), 
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene una lista de todas las cerdas reproductoras.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
     """
-    cerdas = crud.get_cerdas(db, skip=skip, limit=limit)
+    cerdas = crud.get_cerdas(db, skip=skip, limit=limit, user_id=current_user.id if mine else None)
     return cerdas
 
 @router.get("/{cerda_id}", response_model=schemas.Cerda)
 def read_cerda(
     cerda_id: int, 
+    response: Response,
+    mine: bool = False,
     db: Session = Depends(get_db), 
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene la información de una cerda reproductora específica por su ID.
     """
-    db_cerda = crud.get_cerda(db, cerda_id=cerda_id)
+    db_cerda = crud.get_cerda(db, cerda_id=cerda_id, user_id=current_user.id if mine else None)
     if db_cerda is None:
         raise HTTPException(status_code=404, detail="Cerda no encontrada")
+    response.headers["ETag"] = f'"{db_cerda.version}"'
     return db_cerda
 
 @router.put("/{cerda_id}", response_model=schemas.Cerda)
 def update_cerda_reproductora(
     cerda_id: int, 
     cerda: schemas.CerdaUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db), 
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Actualiza la información de una cerda específica.
     """
-    db_cerda = crud.update_cerda(db, cerda_id=cerda_id, cerda_update=cerda)
+    try:
+        db_cerda = crud.update_cerda(db, cerda_id=cerda_id, cerda_update=cerda, version=crud.version_de_if_match(if_match))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except crud.ConflictoDeVersion as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except crud.PrecondicionRequerida as e:
+        raise HTTPException(status_code=428, detail=str(e))
     if db_cerda is None:
         raise HTTPException(status_code=404, detail="Cerda no encontrada para actualizar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Actualizó cerda reproductora",
-            modulo="Reproductoras",
-            descripcion=f"Cerda {db_cerda.codigo_id}: estado {db_cerda.estado_reproductivo}",
-            tipo_movimiento="actualizar",
-            entidad_tipo="cerda_reproductora",
-            entidad_id=db_cerda.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Actualizó cerda reproductora",
+        modulo="Reproductoras",
+        descripcion=f"Cerda {db_cerda.codigo_id}: estado {db_cerda.estado_reproductivo}",
+        tipo_movimiento="actualizar",
+        entidad_tipo="cerda_reproductora",
+        entidad_id=db_cerda.id
+    )
     
+    db.commit()
+    response.headers["ETag"] = f'"{db_cerda.version}"'
     return db_cerda
 
 @router.delete("/{cerda_id}", response_model=schemas.Cerda)
@@ -125,19 +135,35 @@ def delete_cerda_reproductora(
         raise HTTPException(status_code=404, detail="Cerda no encontrada para eliminar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Eliminó cerda reproductora",
-            modulo="Reproductoras",
-            descripcion=f"Cerda eliminada: {cerda_info.codigo_id}, raza {cerda_info.raza}",
-            tipo_movimiento="eliminar",
-            entidad_tipo="cerda_reproductora",
-            entidad_id=cerda_id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Eliminó cerda reproductora",
+        modulo="Reproductoras",
+        descripcion=f"Cerda eliminada: {cerda_info.codigo_id}, raza {cerda_info.raza}",
+        tipo_movimiento="eliminar",
+        entidad_tipo="cerda_reproductora",
+        entidad_id=cerda_id
+    )
     
-    return db_cerda
\ No newline at end of file
+    db.commit()
+    return db_cerda
+
+
+@router.post("/eliminar-varios", response_model=schemas.ResultadoEliminacionVarios)
+def eliminar_varios_reproductoras(
+    peticion: schemas.EliminacionVarios,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Elimina varias cerdas reproductoras a la vez, por lista de `ids` o por `filtro`, en una sola transacción.
+    También se eliminan las camadas de las que son madre y sus tratamientos.
+    """
+    try:
+        resultado = crud.eliminar_varios(db, "reproductoras", peticion, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return resultado
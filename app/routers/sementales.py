@@ -1,8 +1,8 @@
 # app/routers/sementales.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from .. import crud, models, schemas, security
 from ..database import get_db
@@ -29,55 +29,59 @@ def create_semental(
     new_semental = crud.create_semental(db=db, semental=semental, user_id=current_user.id)
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Registró nuevo semental",
-            modulo="Sementales",
-            descripcion=f"Agregó semental {new_semental.nombre}, raza {new_semental.raza}",
-            tipo_movimiento="crear",
-            entidad_tipo="semental",
-            entidad_id=new_semental.id
-        )
-    except Exception as e:
-        # No fallar la operación principal si falla el logging
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Registró nuevo semental",
+        modulo="Sementales",
+        descripcion=f"Agregó semental {new_semental.nombre}, raza {new_semental.raza}",
+        tipo_movimiento="crear",
+        entidad_tipo="semental",
+        entidad_id=new_semental.id
+    )
     
+    db.commit()
     return new_semental
 
 @router.get("/", response_model=List[schemas.Semental])
 def read_sementales(
     skip: int = 0, 
     limit: int = 100, 
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene una lista de todos los sementales.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
     """
-    sementales = crud.get_sementales(db, skip=skip, limit=limit)
+    sementales = crud.get_sementales(db, skip=skip, limit=limit, user_id=current_user.id if mine else None)
     return sementales
 
 @router.get("/{semental_id}", response_model=schemas.Semental)
 def read_semental(
     semental_id: int, 
+    response: Response,
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene la información de un semental específico por su ID.
     """
-    db_semental = crud.get_semental(db, semental_id=semental_id)
+    db_semental = crud.get_semental(db, semental_id=semental_id, user_id=current_user.id if mine else None)
     if db_semental is None:
         raise HTTPException(status_code=404, detail="Semental no encontrado")
+    response.headers["ETag"] = f'"{db_semental.version}"'
     return db_semental
 
 @router.put("/{semental_id}", response_model=schemas.Semental)
 def update_semental(
     semental_id: int, 
     semental: schemas.SementalUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
@@ -88,39 +92,47 @@ def update_semental(
     original_semental = crud.get_semental(db, semental_id=semental_id)
     if not original_semental:
         raise HTTPException(status_code=404, detail="Semental no encontrado para actualizar")
+    # El UPDATE ... RETURNING refresca este mismo objeto de la sesión: se guardan antes los valores previos
+    anterior = {"nombre": original_semental.nombre, "raza": original_semental.raza, "tasa_fertilidad": original_semental.tasa_fertilidad}
     
-    db_semental = crud.update_semental(db, semental_id=semental_id, semental_update=semental)
+    try:
+        db_semental = crud.update_semental(db, semental_id=semental_id, semental_update=semental, version=crud.version_de_if_match(if_match))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except crud.ConflictoDeVersion as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except crud.PrecondicionRequerida as e:
+        raise HTTPException(status_code=428, detail=str(e))
     if db_semental is None:
         raise HTTPException(status_code=404, detail="Semental no encontrado para actualizar")
     
     # Registrar movimiento automáticamente
-    try:
-        cambios = []
-        if semental.nombre and semental.nombre != original_semental.nombre:
-            cambios.append(f"nombre: {original_semental.nombre} → {semental.nombre}")
-        if semental.raza and semental.raza != original_semental.raza:
-            cambios.append(f"raza: {original_semental.raza} → {semental.raza}")
-        if semental.tasa_fertilidad is not None and semental.tasa_fertilidad != original_semental.tasa_fertilidad:
-            cambios.append(f"fertilidad: {original_semental.tasa_fertilidad} → {semental.tasa_fertilidad}")
-        
-        descripcion = f"Actualizó semental {db_semental.nombre}"
-        if cambios:
-            descripcion += f": {', '.join(cambios)}"
-        
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Actualizó información de semental",
-            modulo="Sementales",
-            descripcion=descripcion,
-            tipo_movimiento="editar",
-            entidad_tipo="semental",
-            entidad_id=db_semental.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    cambios = []
+    if semental.nombre and semental.nombre != anterior["nombre"]:
+        cambios.append(f"nombre: {anterior['nombre']} → {semental.nombre}")
+    if semental.raza and semental.raza != anterior["raza"]:
+        cambios.append(f"raza: {anterior['raza']} → {semental.raza}")
+    if semental.tasa_fertilidad is not None and semental.tasa_fertilidad != anterior["tasa_fertilidad"]:
+        cambios.append(f"fertilidad: {anterior['tasa_fertilidad']} → {semental.tasa_fertilidad}")
+    
+    descripcion = f"Actualizó semental {db_semental.nombre}"
+    if cambios:
+        descripcion += f": {', '.join(cambios)}"
     
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Actualizó información de semental",
+        modulo="Sementales",
+        descripcion=descripcion,
+        tipo_movimiento="editar",
+        entidad_tipo="semental",
+        entidad_id=db_semental.id
+    )
+    
+    db.commit()
+    response.headers["ETag"] = f'"{db_semental.version}"'
     return db_semental
 
 @router.delete("/{semental_id}", response_model=schemas.Semental)
@@ -137,19 +149,35 @@ def delete_semental(
         raise HTTPException(status_code=404, detail="Semental no encontrado para eliminar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Eliminó semental",
-            modulo="Sementales",
-            descripcion=f"Eliminó semental {db_semental.nombre}, raza {db_semental.raza}",
-            tipo_movimiento="eliminar",
-            entidad_tipo="semental",
-            entidad_id=db_semental.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Eliminó semental",
+        modulo="Sementales",
+        descripcion=f"Eliminó semental {db_semental.nombre}, raza {db_semental.raza}",
+        tipo_movimiento="eliminar",
+        entidad_tipo="semental",
+        entidad_id=db_semental.id
+    )
     
-    return db_semental
\ No newline at end of file
+    db.commit()
+    return db_semental
+
+
+@router.post("/eliminar-varios", response_model=schemas.ResultadoEliminacionVarios)
+def eliminar_varios_sementales(
+    peticion: schemas.EliminacionVarios,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Elimina varios sementales a la vez, por lista de `ids` o por `filtro`, en una sola transacción.
+    También se eliminan las camadas de las que son padre y sus tratamientos.
+    """
+    try:
+        resultado = crud.eliminar_varios(db, "sementales", peticion, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return resultado
@@ -0,0 +1,35 @@
+# app/routers/sync.py
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from .. import schemas, security, sincronizacion
+from ..database import get_db
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["Sincronización"]
+)
+
+@router.get("/", response_model=schemas.Sincronizacion)
+def read_cambios(
+    since: Optional[str] = None,
+    limit: int = 500,
+    mine: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Sincronización incremental para clientes sin conexión estable.
+    Sin `since` devuelve todo; con el `token` de la respuesta anterior, solo lo que cambió desde entonces
+    (reproductoras, sementales, camadas, lotes, tratamientos) y los IDs eliminados.
+    Si `completo` es false, repetir con el nuevo token hasta completarlo.
+    Con `mine=true` solo se sincronizan los registros del usuario autenticado.
+    """
+    if limit < 1 or limit > 2000:
+        raise HTTPException(status_code=400, detail="El límite debe estar entre 1 y 2000")
+    try:
+        return sincronizacion.obtener_cambios(db, since, user_id=current_user.id if mine else None, limite=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,109 @@
+# app/routers/trabajos.py
+
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List
+import os
+import shutil
+import uuid
+
+from .. import crud, schemas, security, trabajos
+from ..config import get_settings
+from ..database import get_db
+
+router = APIRouter(
+    prefix="/trabajos",
+    tags=["Trabajos en segundo plano"]
+)
+
+@router.post("/", response_model=schemas.Trabajo, status_code=202)
+def create_trabajo(
+    trabajo: schemas.TrabajoCreate,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Encola un trabajo para el proceso worker (`python worker.py`).
+    Tipos disponibles: consulte `GET /trabajos/tipos`.
+    """
+    if trabajo.tipo not in trabajos.tipos_publicos():
+        raise HTTPException(status_code=400, detail=f"Tipo de trabajo no válido: {trabajo.tipo}")
+    db_trabajo = trabajos.encolar(db, trabajo.tipo, trabajo.parametros, user_id=current_user.id)
+    db.commit()
+    return db_trabajo
+
+@router.post("/importar", response_model=schemas.Trabajo, status_code=202)
+def importar_csv(
+    entidad: str,
+    archivo: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Sube un CSV de `reproductoras` o `sementales` y encola su importación; el resultado (insertados,
+    repetidos y filas con errores) se consulta en `GET /trabajos/{id}`.
+    """
+    if entidad not in trabajos.IMPORTABLES:
+        raise HTTPException(status_code=400, detail=f"Solo se pueden importar: {', '.join(trabajos.IMPORTABLES)}")
+    importaciones_dir = get_settings().importaciones_dir
+    os.makedirs(importaciones_dir, exist_ok=True)
+    ruta = os.path.join(importaciones_dir, f"{entidad}_{uuid.uuid4().hex}.csv")
+    with open(ruta, "wb") as destino:
+        shutil.copyfileobj(archivo.file, destino)
+    db_trabajo = trabajos.encolar(db, "importar", {"entidad": entidad, "archivo": ruta, "user_id": current_user.id},
+                                  user_id=current_user.id)
+    db.commit()
+    return db_trabajo
+
+@router.get("/tipos")
+def read_tipos_trabajo(
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene los tipos de trabajo que se pueden encolar desde la API.
+    """
+    return {"tipos": trabajos.tipos_publicos()}
+
+@router.get("/", response_model=List[schemas.Trabajo])
+def read_trabajos(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene los trabajos encolados por el usuario autenticado, del más reciente al más antiguo.
+    """
+    return crud.get_trabajos(db, user_id=current_user.id, skip=skip, limit=limit)
+
+@router.get("/{trabajo_id}", response_model=schemas.Trabajo)
+def read_trabajo(
+    trabajo_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene el estado, los intentos y el resultado de un trabajo.
+    """
+    db_trabajo = crud.get_trabajo(db, trabajo_id=trabajo_id, user_id=current_user.id)
+    if db_trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return db_trabajo
+
+@router.get("/{trabajo_id}/archivo")
+def download_trabajo(
+    trabajo_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Descarga el archivo generado por un trabajo de exportación completado.
+    """
+    db_trabajo = crud.get_trabajo(db, trabajo_id=trabajo_id, user_id=current_user.id)
+    if db_trabajo is None:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    archivo = (db_trabajo.resultado or {}).get("archivo")
+    if db_trabajo.estado != "completado" or not archivo or not os.path.exists(archivo):
+        raise HTTPException(status_code=409, detail=f"El trabajo no tiene un archivo disponible (estado: {db_trabajo.estado})")
+    return FileResponse(archivo, filename=os.path.basename(archivo))
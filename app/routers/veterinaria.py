@@ -1,12 +1,28 @@
 # app/routers/veterinaria.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date
 
-from .. import crud, schemas, security
+from .. import crud, models, schemas, security
 from ..database import get_db
 
+# Referencias de un tratamiento: modelo y mensaje si no existe
+REFERENCIAS = {
+    "reproductora_id": (models.CerdaReproductora, "Reproductora no encontrada"),
+    "semental_id": (models.Semental, "Semental no encontrado"),
+    "lote_engorde_id": (models.LoteEngorde, "Lote de engorde no encontrado"),
+}
+
+def _validar_referencias(db: Session, tratamiento):
+    """Comprueba con una sola consulta EXISTS que existan los registros a los que apunta el tratamiento"""
+    faltantes = crud.referencias_faltantes(db, **{
+        campo: (modelo, getattr(tratamiento, campo)) for campo, (modelo, _) in REFERENCIAS.items()
+    })
+    if faltantes:
+        raise HTTPException(status_code=404, detail=REFERENCIAS[faltantes[0]][1])
+
 router = APIRouter(
     prefix="/veterinaria",
     tags=["Veterinaria (Tratamientos)"]
@@ -35,41 +51,34 @@ def create_tratamiento_veterinario(
             detail="Se debe proporcionar exactamente un ID (reproductora, semental o lote de engorde)."
         )
 
-    if tratamiento.reproductora_id and not crud.get_cerda(db, cerda_id=tratamiento.reproductora_id):
-        raise HTTPException(status_code=404, detail="Reproductora no encontrada")
-    if tratamiento.semental_id and not crud.get_semental(db, semental_id=tratamiento.semental_id):
-        raise HTTPException(status_code=404, detail="Semental no encontrado")
-    if tratamiento.lote_engorde_id and not crud.get_lote_engorde(db, lote_id=tratamiento.lote_engorde_id):
-        raise HTTPException(status_code=404, detail="Lote de engorde no encontrado")
+    _validar_referencias(db, tratamiento)
 
     # Pasamos el ID del usuario actual a la función del CRUD
     new_tratamiento = crud.create_tratamiento(db=db, tratamiento=tratamiento, user_id=current_user.id)
     
     # Registrar movimiento automáticamente
-    try:
-        # Determinar el tipo de entidad tratada
-        entidad_desc = ""
-        if tratamiento.reproductora_id:
-            entidad_desc = f"reproductora ID {tratamiento.reproductora_id}"
-        elif tratamiento.semental_id:
-            entidad_desc = f"semental ID {tratamiento.semental_id}"
-        elif tratamiento.lote_engorde_id:
-            entidad_desc = f"lote de engorde ID {tratamiento.lote_engorde_id}"
-        
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Registró tratamiento veterinario",
-            modulo="Veterinaria",
-            descripcion=f"Tratamiento: {new_tratamiento.tipo_intervencion} en {entidad_desc}",
-            tipo_movimiento="crear",
-            entidad_tipo="tratamiento_veterinario",
-            entidad_id=new_tratamiento.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    # Determinar el tipo de entidad tratada
+    entidad_desc = ""
+    if tratamiento.reproductora_id:
+        entidad_desc = f"reproductora ID {tratamiento.reproductora_id}"
+    elif tratamiento.semental_id:
+        entidad_desc = f"semental ID {tratamiento.semental_id}"
+    elif tratamiento.lote_engorde_id:
+        entidad_desc = f"lote de engorde ID {tratamiento.lote_engorde_id}"
     
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Registró tratamiento veterinario",
+        modulo="Veterinaria",
+        descripcion=f"Tratamiento: {new_tratamiento.tipo_intervencion} en {entidad_desc}",
+        tipo_movimiento="crear",
+        entidad_tipo="tratamiento_veterinario",
+        entidad_id=new_tratamiento.id
+    )
+    
+    db.commit()
     return new_tratamiento
 
 
@@ -77,28 +86,52 @@ def create_tratamiento_veterinario(
 def read_tratamientos_veterinarios(
     skip: int = 0, 
     limit: int = 100, 
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene una lista de todas las intervenciones veterinarias.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
     """
-    tratamientos = crud.get_tratamientos(db, skip=skip, limit=limit)
+    tratamientos = crud.get_tratamientos(db, skip=skip, limit=limit, user_id=current_user.id if mine else None)
     return tratamientos
 
 
+@router.get("/rango", response_model=List[schemas.Tratamiento])
+def read_tratamientos_por_rango(
+    desde: date,
+    hasta: date,
+    skip: int = 0,
+    limit: int = 100,
+    mine: bool = False,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Obtiene las intervenciones veterinarias programadas o realizadas entre dos fechas.
+    Con `mine=true` solo se devuelven los registros del usuario autenticado.
+    """
+    if desde > hasta:
+        raise HTTPException(status_code=400, detail="La fecha 'desde' no puede ser posterior a 'hasta'")
+    return crud.get_tratamientos_por_rango(db, desde=desde, hasta=hasta, skip=skip, limit=limit, user_id=current_user.id if mine else None)
+
+
 @router.get("/{tratamiento_id}", response_model=schemas.Tratamiento)
 def read_tratamiento_veterinario(
     tratamiento_id: int, 
+    response: Response,
+    mine: bool = False,
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Obtiene la información de una intervención específica por su ID.
     """
-    db_tratamiento = crud.get_tratamiento(db, tratamiento_id=tratamiento_id)
+    db_tratamiento = crud.get_tratamiento(db, tratamiento_id=tratamiento_id, user_id=current_user.id if mine else None)
     if db_tratamiento is None:
         raise HTTPException(status_code=404, detail="Tratamiento no encontrado")
+    response.headers["ETag"] = f'"{db_tratamiento.version}"'
     return db_tratamiento
 
 
@@ -106,32 +139,41 @@ def read_tratamiento_veterinario(
 def update_tratamiento_veterinario(
     tratamiento_id: int, 
     tratamiento: schemas.TratamientoUpdate, 
+    response: Response,
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db),
     current_user: schemas.User = Depends(security.get_current_user)
 ):
     """
     Actualiza la información de una intervención veterinaria.
     """
-    db_tratamiento = crud.update_tratamiento(db, tratamiento_id=tratamiento_id, tratamiento_update=tratamiento)
+    _validar_referencias(db, tratamiento)
+    try:
+        db_tratamiento = crud.update_tratamiento(db, tratamiento_id=tratamiento_id, tratamiento_update=tratamiento, version=crud.version_de_if_match(if_match))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except crud.ConflictoDeVersion as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except crud.PrecondicionRequerida as e:
+        raise HTTPException(status_code=428, detail=str(e))
     if db_tratamiento is None:
         raise HTTPException(status_code=404, detail="Tratamiento no encontrado para actualizar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Actualizó tratamiento veterinario",
-            modulo="Veterinaria",
-            descripcion=f"Tratamiento ID {tratamiento_id}: {db_tratamiento.tipo_intervencion}",
-            tipo_movimiento="actualizar",
-            entidad_tipo="tratamiento_veterinario",
-            entidad_id=db_tratamiento.id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Actualizó tratamiento veterinario",
+        modulo="Veterinaria",
+        descripcion=f"Tratamiento ID {tratamiento_id}: {db_tratamiento.tipo_intervencion}",
+        tipo_movimiento="actualizar",
+        entidad_tipo="tratamiento_veterinario",
+        entidad_id=db_tratamiento.id
+    )
     
+    db.commit()
+    response.headers["ETag"] = f'"{db_tratamiento.version}"'
     return db_tratamiento
 
 
@@ -154,19 +196,34 @@ def delete_tratamiento_veterinario(
         raise HTTPException(status_code=404, detail="Tratamiento no encontrado para eliminar")
     
     # Registrar movimiento automáticamente
-    try:
-        crud.registrar_movimiento_automatico(
-            db=db,
-            usuario_id=current_user.id,
-            usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
-            accion="Eliminó tratamiento veterinario",
-            modulo="Veterinaria",
-            descripcion=f"Tratamiento eliminado: {tratamiento_info.tipo_intervencion}",
-            tipo_movimiento="eliminar",
-            entidad_tipo="tratamiento_veterinario",
-            entidad_id=tratamiento_id
-        )
-    except Exception as e:
-        print(f"Error registrando movimiento: {e}")
+    crud.registrar_movimiento_automatico(
+        db=db,
+        usuario_id=current_user.id,
+        usuario_nombre=f"{current_user.nombre} {current_user.apellido}",
+        accion="Eliminó tratamiento veterinario",
+        modulo="Veterinaria",
+        descripcion=f"Tratamiento eliminado: {tratamiento_info.tipo_intervencion}",
+        tipo_movimiento="eliminar",
+        entidad_tipo="tratamiento_veterinario",
+        entidad_id=tratamiento_id
+    )
     
-    return db_tratamiento
\ No newline at end of file
+    db.commit()
+    return db_tratamiento
+
+
+@router.post("/eliminar-varios", response_model=schemas.ResultadoEliminacionVarios)
+def eliminar_varios_tratamientos(
+    peticion: schemas.EliminacionVarios,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(security.get_current_user)
+):
+    """
+    Elimina varios tratamientos veterinarios a la vez, por lista de `ids` o por `filtro`, en una sola transacción.
+    """
+    try:
+        resultado = crud.eliminar_varios(db, "tratamientos", peticion, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return resultado
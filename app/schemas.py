@@ -1,7 +1,7 @@
 # app/schemas.py
 from pydantic import BaseModel
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 # --- ESQUEMAS PARA USUARIOS Y AUTENTICACIÓN ---
 
@@ -27,12 +27,18 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str
     nombre: str
     apellido: str
     numero_documento: str
     tipo_documento: str
 class TokenData(BaseModel):
     numero_documento: Optional[str] = None
+class RefrescarToken(BaseModel):
+    refresh_token: str
+class CerrarSesion(BaseModel):
+    refresh_token: str
+    todas: bool = False  # revocar también las demás sesiones del usuario
 
 
 # --- Esquemas para Cerdas Reproductoras ---
@@ -47,8 +53,11 @@ class CerdaUpdate(BaseModel):
     fecha_nacimiento: Optional[date] = None
     raza: Optional[str] = None
     estado_reproductivo: Optional[str] = None
+    version: Optional[int] = None  # la versión que leyó el cliente; si ya cambió, 409
 class Cerda(CerdaBase):
     id: int
+    actualizado_en: Optional[datetime] = None
+    version: int = 1
     propietario: UserPublic
     class Config: from_attributes = True
 
@@ -63,8 +72,11 @@ class SementalUpdate(BaseModel):
     nombre: Optional[str] = None
     raza: Optional[str] = None
     tasa_fertilidad: Optional[float] = None
+    version: Optional[int] = None
 class Semental(SementalBase):
     id: int
+    actualizado_en: Optional[datetime] = None
+    version: int = 1
     propietario: UserPublic
     class Config: from_attributes = True
 
@@ -83,8 +95,11 @@ class CamadaUpdate(BaseModel):
     peso_promedio_kg: Optional[float] = None
     madre_id: Optional[int] = None
     padre_id: Optional[int] = None
+    version: Optional[int] = None
 class Camada(CamadaBase):
     id: int
+    actualizado_en: Optional[datetime] = None
+    version: int = 1
     madre: Cerda
     padre: Semental
     propietario: UserPublic
@@ -110,9 +125,12 @@ class LoteEngordeUpdate(BaseModel):
     peso_inicial_promedio: Optional[float] = None
     peso_actual_promedio: Optional[float] = None
     camada_origen_id: Optional[int] = None
+    version: Optional[int] = None
 
 class LoteEngorde(LoteEngordeBase):
     id: int
+    actualizado_en: Optional[datetime] = None
+    version: int = 1
     camada_origen: Camada
     propietario: UserPublic
     class Config: from_attributes = True
@@ -140,8 +158,11 @@ class TratamientoUpdate(BaseModel):
     reproductora_id: Optional[int] = None
     semental_id: Optional[int] = None
     lote_engorde_id: Optional[int] = None
+    version: Optional[int] = None
 class Tratamiento(TratamientoBase):
     id: int
+    actualizado_en: Optional[datetime] = None
+    version: int = 1
     reproductora: Optional[Cerda] = None
     semental: Optional[Semental] = None
     lote_engorde: Optional[LoteEngorde] = None
@@ -183,4 +204,121 @@ class MovimientoFilters(BaseModel):
     fecha_fin: Optional[date] = None
     usuario_id: Optional[int] = None
     page: Optional[int] = 1
-    size: Optional[int] = 10
\ No newline at end of file
+    size: Optional[int] = 10
+
+# --- ESQUEMAS PARA EL DASHBOARD ---
+
+class ConteoEstado(BaseModel):
+    estado: str
+    cantidad: int
+
+class TratamientoReciente(BaseModel):
+    id: int
+    tipo_intervencion: str
+    medicamento_producto: Optional[str] = None
+    fecha: date
+    reproductora_id: Optional[int] = None
+    semental_id: Optional[int] = None
+    lote_engorde_id: Optional[int] = None
+
+class ResumenDashboard(BaseModel):
+    reproductoras_por_estado: List[ConteoEstado]
+    total_reproductoras: int
+    total_sementales: int
+    lotes_activos: int
+    cerdos_en_engorde: int
+    camadas_mes: int
+    lechones_mes: int
+    tratamientos_recientes: List[TratamientoReciente]
+    generado_en: datetime
+
+class EventoCalendario(BaseModel):
+    tipo: str  # tratamiento, parto
+    entidad_id: int
+    fecha: date
+    descripcion: Optional[str] = None
+
+class Pronostico(BaseModel):
+    id: int
+    tipo: str  # parto, destete, traslado_engorde
+    entidad_tipo: str
+    entidad_id: int
+    fecha_base: date
+    fecha_estimada: date
+    calculado_en: datetime
+    class Config: from_attributes = True
+
+
+# --- ESQUEMAS PARA REPORTES ---
+
+class ReporteCreate(BaseModel):
+    formato: str = "html"  # html, pdf
+    fecha_inicio: Optional[date] = None
+    fecha_fin: Optional[date] = None
+
+class Reporte(BaseModel):
+    id: int
+    formato: str
+    fecha_inicio: date
+    fecha_fin: date
+    estado: str  # pendiente, procesando, completado, error
+    error: Optional[str] = None
+    creado_en: datetime
+    completado_en: Optional[datetime] = None
+    class Config: from_attributes = True
+
+
+# --- ESQUEMAS PARA LA COLA DE TRABAJOS ---
+
+class TrabajoCreate(BaseModel):
+    tipo: str
+    parametros: Optional[Dict[str, Any]] = None
+
+class Trabajo(BaseModel):
+    id: int
+    tipo: str
+    parametros: Optional[Dict[str, Any]] = None
+    estado: str  # pendiente, procesando, completado, error
+    intentos: int
+    max_intentos: int
+    resultado: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    programado_para: datetime
+    creado_en: datetime
+    iniciado_en: Optional[datetime] = None
+    finalizado_en: Optional[datetime] = None
+    class Config: from_attributes = True
+
+
+# --- ESQUEMAS PARA LA SINCRONIZACIÓN INCREMENTAL ---
+
+class Eliminado(BaseModel):
+    entidad: str
+    id: int
+    eliminado_en: datetime
+
+class Sincronizacion(BaseModel):
+    cambios: Dict[str, List[Dict[str, Any]]]  # filas completas por entidad (reproductoras, sementales, ...)
+    eliminados: List[Eliminado]
+    token: str
+    completo: bool
+
+
+# --- ESQUEMAS PARA LA ELIMINACIÓN EN LOTE ---
+
+class FiltroEliminacion(BaseModel):
+    desde: Optional[date] = None  # sobre la fecha principal de la entidad (nacimiento, inicio o fecha del tratamiento)
+    hasta: Optional[date] = None
+    raza: Optional[str] = None  # reproductoras y sementales
+    estado_reproductivo: Optional[str] = None  # reproductoras
+    tipo_intervencion: Optional[str] = None  # tratamientos
+    mine: bool = False  # solo los registros del usuario autenticado
+
+class EliminacionVarios(BaseModel):
+    ids: Optional[List[int]] = None
+    filtro: Optional[FiltroEliminacion] = None
+
+class ResultadoEliminacionVarios(BaseModel):
+    eliminados: Dict[str, int]  # registros eliminados por entidad, incluidos los dependientes
+    total: int
+    no_encontrados: List[int] = []  # IDs pedidos que no existían
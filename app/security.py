@@ -8,8 +8,8 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from . import schemas, models 
-from .database import SessionLocal
-from .config import settings
+from .database import get_db  # misma sesión que los routers (FastAPI la comparte en la petición)
+from .config import get_settings
 
 # Configuración más compatible para bcrypt
 pwd_context = CryptContext(
@@ -63,15 +63,26 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now(timezone.utc) + timedelta(minutes=15)
     
     to_encode.update({"exp": expire})
+    settings = get_settings()
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def identificar_cliente(scope):
+    """Usuario del token JWT si es válido ("usuario:<documento>"); si no, la IP del cliente ("ip:<ip>")"""
+    autorizacion = ""
+    for clave, valor in scope["headers"]:
+        if clave == b"authorization":
+            autorizacion = valor.decode("latin-1")
+    if autorizacion.lower().startswith("bearer "):
+        settings = get_settings()
+        try:
+            payload = jwt.decode(autorizacion[7:], settings.secret_key, algorithms=[settings.algorithm])
+            if payload.get("sub"):
+                return f"usuario:{payload['sub']}"
+        except JWTError:
+            pass
+    cliente = scope.get("client")
+    return f"ip:{cliente[0] if cliente else 'desconocida'}"
 
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     from . import crud
@@ -81,6 +92,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         detail="No se pudieron validar las credenciales",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    settings = get_settings()
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         numero_documento: str = payload.get("sub")
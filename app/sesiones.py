@@ -0,0 +1,146 @@
+# app/sesiones.py
+
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from .config import get_settings
+from .models import TokenRefresco, User
+
+# Tokens recientes que recuerda cada worker
+MAX_TOKENS_EN_MEMORIA = 10_000
+
+
+def _hash(token: str):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def perfil_de(usuario: User):
+    """Datos del usuario que acompañan al access token en la respuesta"""
+    return {
+        "numero_documento": usuario.numero_documento,
+        "nombre": usuario.nombre,
+        "apellido": usuario.apellido,
+        "tipo_documento": usuario.tipo_documento,
+    }
+
+
+class TokensActivos:
+    """
+    Conjunto en memoria de los refresh tokens emitidos o rotados por este worker: hash -> (user_id, perfil, expiración).
+    Evita cargar el usuario al refrescar y rechaza sin consultar los que ya expiraron. No decide si un token
+    sigue vigente: eso lo resuelve siempre el UPDATE atómico sobre la tabla, que ven todos los workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens = OrderedDict()
+
+    def recordar(self, token_hash: str, user_id: int, perfil: dict, expira_en: datetime):
+        with self._lock:
+            self._tokens[token_hash] = (user_id, perfil, expira_en)
+            while len(self._tokens) > MAX_TOKENS_EN_MEMORIA:
+                self._tokens.popitem(last=False)
+
+    def obtener(self, token_hash: str):
+        return self._tokens.get(token_hash)
+
+    def olvidar(self, token_hash: str):
+        with self._lock:
+            self._tokens.pop(token_hash, None)
+
+    def olvidar_usuario(self, user_id: int):
+        with self._lock:
+            for token_hash in [clave for clave, (usuario, _, _) in self._tokens.items() if usuario == user_id]:
+                del self._tokens[token_hash]
+
+
+tokens_activos = TokensActivos()
+
+
+def emitir(db: Session, usuario: User):
+    """Crea un refresh token para el usuario y devuelve su valor (solo se guarda el hash). El llamador confirma"""
+    ahora = datetime.utcnow()
+    token = secrets.token_urlsafe(32)
+    expira_en = ahora + timedelta(days=get_settings().refresh_token_expire_days)
+    # Limpieza de paso: los tokens expirados del usuario ya no sirven ni para detectar reutilización
+    db.execute(delete(TokenRefresco).where(TokenRefresco.user_id == usuario.id, TokenRefresco.expira_en < ahora))
+    db.add(TokenRefresco(token_hash=_hash(token), user_id=usuario.id, creado_en=ahora, expira_en=expira_en))
+    db.flush()
+    tokens_activos.recordar(_hash(token), usuario.id, perfil_de(usuario), expira_en)
+    return token
+
+
+def _revocar_usuario(db: Session, user_id: int, ahora: datetime):
+    db.execute(
+        update(TokenRefresco)
+        .where(TokenRefresco.user_id == user_id, TokenRefresco.revocado_en.is_(None))
+        .values(revocado_en=ahora)
+    )
+    tokens_activos.olvidar_usuario(user_id)
+
+
+def rotar(db: Session, token: str):
+    """
+    Canjea un refresh token por uno nuevo. Devuelve (perfil, nuevo token). Lanza ValueError si no es válido.
+    El token usado queda revocado; si se presenta uno ya revocado (posible robo) se revocan todas las
+    sesiones del usuario. El llamador confirma también cuando hay error, para guardar esa revocación.
+    """
+    ahora = datetime.utcnow()
+    token_hash = _hash(token)
+    en_memoria = tokens_activos.obtener(token_hash)
+    if en_memoria and en_memoria[2] <= ahora:
+        tokens_activos.olvidar(token_hash)
+        raise ValueError("El refresh token expiró")
+
+    # Consumir el token es un único UPDATE: dos peticiones con el mismo token no pueden rotarlo las dos
+    user_id = db.execute(
+        update(TokenRefresco)
+        .where(TokenRefresco.token_hash == token_hash, TokenRefresco.revocado_en.is_(None), TokenRefresco.expira_en > ahora)
+        .values(revocado_en=ahora)
+        .returning(TokenRefresco.user_id)
+    ).scalar()
+    tokens_activos.olvidar(token_hash)
+    if user_id is None:
+        anterior = db.execute(
+            select(TokenRefresco.user_id, TokenRefresco.revocado_en).where(TokenRefresco.token_hash == token_hash)
+        ).first()
+        if anterior is not None and anterior.revocado_en is not None:
+            _revocar_usuario(db, anterior.user_id, ahora)
+        raise ValueError("Refresh token no válido")
+
+    if en_memoria:
+        perfil = en_memoria[1]
+    else:
+        usuario = db.get(User, user_id)
+        if usuario is None:
+            raise ValueError("Refresh token no válido")
+        perfil = perfil_de(usuario)
+
+    nuevo = secrets.token_urlsafe(32)
+    expira_en = ahora + timedelta(days=get_settings().refresh_token_expire_days)
+    db.add(TokenRefresco(token_hash=_hash(nuevo), user_id=user_id, creado_en=ahora, expira_en=expira_en))
+    db.flush()
+    tokens_activos.recordar(_hash(nuevo), user_id, perfil, expira_en)
+    return perfil, nuevo
+
+
+def revocar(db: Session, token: str, todas: bool = False):
+    """Cierra la sesión del refresh token (o todas las del usuario). Devuelve False si el token no existe"""
+    ahora = datetime.utcnow()
+    token_hash = _hash(token)
+    tokens_activos.olvidar(token_hash)
+    user_id = db.execute(
+        update(TokenRefresco)
+        .where(TokenRefresco.token_hash == token_hash)
+        .values(revocado_en=ahora)
+        .returning(TokenRefresco.user_id)
+    ).scalar()
+    if user_id is not None and todas:
+        _revocar_usuario(db, user_id, ahora)
+    return user_id is not None
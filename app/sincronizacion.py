@@ -0,0 +1,118 @@
+# app/sincronizacion.py
+
+import base64
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, event, insert, or_, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import get_settings
+
+# Entidades del hato que se sincronizan, con el nombre que usa la API
+ENTIDADES = {
+    "reproductoras": models.CerdaReproductora,
+    "sementales": models.Semental,
+    "camadas": models.CamadaLechones,
+    "lotes": models.LoteEngorde,
+    "tratamientos": models.TratamientoVeterinario,
+}
+_ELIMINACIONES = "eliminaciones"
+
+
+# --- MARCAS DE BORRADO ---
+
+def _registrar_eliminacion(nombre):
+    def despues_de_borrar(mapper, connection, objeto):
+        connection.execute(insert(models.Eliminacion).values(
+            entidad=nombre, entidad_id=objeto.id, user_id=objeto.user_id, eliminado_en=datetime.utcnow()
+        ))
+    return despues_de_borrar
+
+
+for _nombre, _modelo in ENTIDADES.items():
+    event.listen(_modelo, "after_delete", _registrar_eliminacion(_nombre))
+
+
+# --- TOKEN DE SINCRONIZACIÓN ---
+
+def _micros(fecha: datetime):
+    return int((fecha - datetime(1970, 1, 1)).total_seconds() * 1_000_000)
+
+
+def _desde_micros(valor: int):
+    return datetime(1970, 1, 1) + timedelta(microseconds=valor)
+
+
+def codificar_token(desde: datetime, cursores: dict = None):
+    """Token opaco: instante de la última sincronización completa y, si la respuesta se paginó, dónde seguir"""
+    datos = {"d": _micros(desde) if desde else None, "c": cursores or {}}
+    return base64.urlsafe_b64encode(json.dumps(datos, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decodificar_token(token: str):
+    """Devuelve (desde, cursores). Lanza ValueError si el token no es válido"""
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        desde = _desde_micros(datos["d"]) if datos["d"] is not None else None
+        cursores = {nombre: (_desde_micros(marca), int(ultimo_id)) for nombre, (marca, ultimo_id) in datos["c"].items()}
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Token de sincronización no válido") from e
+    return desde, cursores
+
+
+# --- CAMBIOS ---
+
+def _pagina(db: Session, tabla, columna_fecha, inicio, cursor, user_id, limite):
+    """Filas cambiadas después de `inicio`, en orden (fecha, id) a partir del cursor"""
+    consulta = select(tabla)
+    if inicio:
+        consulta = consulta.where(columna_fecha > inicio)
+    if cursor:
+        marca, ultimo_id = cursor
+        consulta = consulta.where(or_(columna_fecha > marca, and_(columna_fecha == marca, tabla.c.id > ultimo_id)))
+    if user_id is not None:
+        consulta = consulta.where(tabla.c.user_id == user_id)
+    filas = db.execute(consulta.order_by(columna_fecha, tabla.c.id).limit(limite + 1)).mappings().all()
+    return [dict(fila) for fila in filas[:limite]], len(filas) > limite
+
+
+def obtener_cambios(db: Session, token: str = None, user_id: int = None, limite: int = 500):
+    """
+    Cambios de las entidades del hato y eliminaciones desde el token (todo si no hay token).
+    Cada consulta vuelve `SYNC_MARGEN_SEGUNDOS` atrás para no perder escrituras que se confirmaron
+    tarde, así que un registro puede llegar repetido: el cliente debe aplicar los cambios como upsert
+    por id y después las eliminaciones. Si `completo` es False hay más páginas con el token devuelto.
+    """
+    ahora = datetime.utcnow()
+    desde, cursores = decodificar_token(token) if token else (None, {})
+    inicio = desde - timedelta(seconds=get_settings().sync_margen_segundos) if desde else None
+
+    cambios = {}
+    siguientes = {}
+    completo = True
+    fuentes = [(nombre, modelo.__table__, modelo.__table__.c.actualizado_en) for nombre, modelo in ENTIDADES.items()]
+    tabla_eliminaciones = models.Eliminacion.__table__
+    fuentes.append((_ELIMINACIONES, tabla_eliminaciones, tabla_eliminaciones.c.eliminado_en))
+    for nombre, tabla, columna_fecha in fuentes:
+        filas, hay_mas = _pagina(db, tabla, columna_fecha, inicio, cursores.get(nombre), user_id, limite)
+        completo = completo and not hay_mas
+        cambios[nombre] = filas
+        if filas:
+            siguientes[nombre] = [_micros(filas[-1][columna_fecha.name]), filas[-1]["id"]]
+        elif nombre in cursores:
+            marca, ultimo_id = cursores[nombre]
+            siguientes[nombre] = [_micros(marca), ultimo_id]
+
+    eliminados = [
+        {"entidad": fila["entidad"], "id": fila["entidad_id"], "eliminado_en": fila["eliminado_en"]}
+        for fila in cambios.pop(_ELIMINACIONES)
+    ]
+    return {
+        "cambios": cambios,
+        "eliminados": eliminados,
+        # Al terminar, la próxima sincronización parte de ahora; si no, se sigue desde los cursores
+        "token": codificar_token(ahora) if completo else codificar_token(desde, siguientes),
+        "completo": completo,
+    }
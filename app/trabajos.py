@@ -0,0 +1,287 @@
+# app/trabajos.py
+
+import csv
+import logging
+import os
+import socket
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, select, update
+from pydantic import ValidationError
+
+from . import models, schemas
+from .config import get_settings
+from .database import SessionLocal
+
+logger = logging.getLogger("porcigest")
+
+# Registro de manejadores: tipo de trabajo -> (función, se puede solicitar desde la API)
+_MANEJADORES = {}
+
+
+def manejador(tipo: str, publico: bool = True):
+    """Registra la función que ejecuta un tipo de trabajo. Recibe (db, parametros) y devuelve un dict"""
+    def decorador(funcion):
+        _MANEJADORES[tipo] = (funcion, publico)
+        return funcion
+    return decorador
+
+
+def tipos_publicos():
+    return sorted(tipo for tipo, (_, publico) in _MANEJADORES.items() if publico)
+
+
+def encolar(db: Session, tipo: str, parametros: dict = None, user_id: int = None, max_intentos: int = None):
+    """Guarda un trabajo pendiente en la cola y lo devuelve; lo ejecutará el proceso worker. El llamador confirma"""
+    if tipo not in _MANEJADORES:
+        raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+    db_trabajo = models.Trabajo(
+        tipo=tipo,
+        parametros=parametros or {},
+        estado="pendiente",
+        max_intentos=max_intentos or get_settings().trabajos_max_intentos,
+        programado_para=datetime.utcnow(),
+        user_id=user_id
+    )
+    db.add(db_trabajo)
+    db.flush()
+    return db_trabajo
+
+
+def _recuperar_abandonados(db: Session):
+    """Devuelve a la cola los trabajos de workers que murieron a mitad de ejecución"""
+    limite = datetime.utcnow() - timedelta(minutes=get_settings().trabajos_timeout_minutos)
+    db.execute(
+        update(models.Trabajo)
+        .where(models.Trabajo.estado == "procesando", models.Trabajo.iniciado_en < limite)
+        .values(estado="pendiente", worker=None)
+    )
+    db.commit()
+
+
+def reclamar_siguiente(db: Session, worker_id: str):
+    """
+    Toma el siguiente trabajo pendiente de forma segura entre varios workers.
+    En PostgreSQL usa FOR UPDATE SKIP LOCKED; en SQLite un UPDATE condicionado al estado.
+    """
+    ahora = datetime.utcnow()
+    query = db.query(models.Trabajo).filter(
+        models.Trabajo.estado == "pendiente",
+        models.Trabajo.programado_para <= ahora
+    ).order_by(models.Trabajo.programado_para, models.Trabajo.id)
+
+    if db.get_bind().dialect.name == "postgresql":
+        trabajo = query.with_for_update(skip_locked=True).first()
+        if trabajo is None:
+            db.rollback()
+            return None
+        trabajo.estado = "procesando"
+        trabajo.worker = worker_id
+        trabajo.iniciado_en = ahora
+        db.commit()
+        return trabajo
+
+    for trabajo_id, in query.with_entities(models.Trabajo.id).limit(5).all():
+        reclamado = db.execute(
+            update(models.Trabajo)
+            .where(models.Trabajo.id == trabajo_id, models.Trabajo.estado == "pendiente")
+            .values(estado="procesando", worker=worker_id, iniciado_en=ahora)
+        )
+        db.commit()
+        if reclamado.rowcount == 1:
+            return db.get(models.Trabajo, trabajo_id)
+    return None
+
+
+def ejecutar(db: Session, trabajo: models.Trabajo):
+    """Ejecuta un trabajo ya reclamado y registra el resultado o programa un reintento"""
+    funcion, _ = _MANEJADORES[trabajo.tipo]
+    # El intento se confirma antes de ejecutar: el rollback de un fallo (o la caída del worker) no lo deshace
+    trabajo.intentos += 1
+    db.commit()
+    try:
+        resultado = funcion(db, dict(trabajo.parametros or {}))
+        trabajo.resultado = resultado
+        trabajo.estado = "completado"
+        trabajo.error = None
+    except Exception as e:
+        db.rollback()
+        logger.exception("Error ejecutando trabajo %s (%s)", trabajo.id, trabajo.tipo)
+        trabajo.error = str(e)
+        if trabajo.intentos < trabajo.max_intentos:
+            # Reintento con espera exponencial: 2, 4, 8... segundos
+            trabajo.estado = "pendiente"
+            trabajo.programado_para = datetime.utcnow() + timedelta(seconds=2 ** trabajo.intentos)
+        else:
+            trabajo.estado = "error"
+    trabajo.finalizado_en = datetime.utcnow()
+    trabajo.worker = None
+    db.commit()
+    return trabajo
+
+
+def procesar_pendientes(worker_id: str = None, max_trabajos: int = None):
+    """Ejecuta trabajos hasta vaciar la cola (o hasta `max_trabajos`). Devuelve cuántos procesó"""
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    procesados = 0
+    db = SessionLocal()
+    try:
+        _recuperar_abandonados(db)
+        while max_trabajos is None or procesados < max_trabajos:
+            trabajo = reclamar_siguiente(db, worker_id)
+            if trabajo is None:
+                break
+            ejecutar(db, trabajo)
+            procesados += 1
+    finally:
+        db.close()
+    return procesados
+
+
+def bucle_worker(intervalo: float = 1.0):
+    """Bucle principal del proceso worker: procesa la cola y espera cuando está vacía"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"👷 Worker {worker_id} esperando trabajos ({', '.join(sorted(_MANEJADORES))})")
+    from .archivo_movimientos import mantener_particiones
+    revision_particiones = None
+    while True:
+        # Las particiones del mes siguiente no deben depender de que se ejecute el archivado
+        if revision_particiones != date.today():
+            mantener_particiones()
+            revision_particiones = date.today()
+        if procesar_pendientes(worker_id) == 0:
+            time.sleep(intervalo)
+
+
+# --- MANEJADORES DE TRABAJOS ---
+
+@manejador("inicializar_db")
+def _inicializar_db(db: Session, parametros: dict):
+    from .init_db import init_database
+    init_database()
+    return {"message": "Base de datos inicializada correctamente"}
+
+
+@manejador("pronosticos")
+def _pronosticos(db: Session, parametros: dict):
+    from .pronosticos import generar_pronosticos
+    resultado = generar_pronosticos(db)
+    resultado["calculado_en"] = resultado["calculado_en"].isoformat()
+    return resultado
+
+
+@manejador("reporte", publico=False)
+def _reporte(db: Session, parametros: dict):
+    from .reportes import generar_reporte
+    generado = generar_reporte(parametros["reporte_id"])
+    if generado is None:
+        raise ValueError(f"Reporte no encontrado: {parametros['reporte_id']}")
+    estado, error = generado
+    # generar_reporte captura sus propios errores; el trabajo debe quedar también en error
+    if estado == "error":
+        raise RuntimeError(error)
+    return {"reporte_id": parametros["reporte_id"]}
+
+
+@manejador("exportar_movimientos")
+def _exportar_movimientos(db: Session, parametros: dict):
+    """Exporta el registro de movimientos a CSV, opcionalmente entre dos fechas (YYYY-MM-DD)"""
+    query = db.query(models.Movimiento)
+    if parametros.get("fecha_inicio"):
+        query = query.filter(models.Movimiento.fecha_movimiento >= datetime.fromisoformat(parametros["fecha_inicio"]))
+    if parametros.get("fecha_fin"):
+        query = query.filter(models.Movimiento.fecha_movimiento < datetime.fromisoformat(parametros["fecha_fin"]) + timedelta(days=1))
+
+    exportaciones_dir = get_settings().exportaciones_dir
+    os.makedirs(exportaciones_dir, exist_ok=True)
+    ruta = os.path.join(exportaciones_dir, f"movimientos_{datetime.utcnow():%Y%m%d_%H%M%S}.csv")
+    columnas = ["id", "fecha_movimiento", "usuario_id", "usuario_nombre", "modulo", "tipo_movimiento",
+                "accion", "descripcion", "entidad_tipo", "entidad_id", "ip_address", "user_agent"]
+    filas = 0
+    with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(columnas)
+        for movimiento in query.order_by(models.Movimiento.id).yield_per(1000):
+            escritor.writerow([getattr(movimiento, columna) for columna in columnas])
+            filas += 1
+    return {"archivo": ruta, "filas": filas}
+
+
+# Entidades que se pueden importar desde CSV: (modelo, esquema, columna única, módulo, entidad_tipo)
+IMPORTABLES = {
+    "reproductoras": (models.CerdaReproductora, schemas.CerdaCreate, "codigo_id", "Reproductoras", "cerda_reproductora"),
+    "sementales": (models.Semental, schemas.SementalCreate, "nombre", "Sementales", "semental"),
+}
+MAX_ERRORES_IMPORTACION = 50
+
+
+@manejador("importar", publico=False)
+def _importar(db: Session, parametros: dict):
+    """
+    Importa reproductoras o sementales desde un CSV subido con POST /trabajos/importar (cabecera con los campos
+    del esquema de creación). Las filas inválidas o repetidas se omiten y se informan; el resto se inserta en
+    lotes y queda un único movimiento. Si algo falla no se guarda nada y el trabajo se reintenta desde cero.
+    """
+    from . import crud
+    modelo, esquema, unica, modulo, entidad_tipo = IMPORTABLES[parametros["entidad"]]
+    usuario = db.get(models.User, parametros["user_id"])
+    columna_unica = getattr(modelo, unica)
+    vistos = set()
+    pendientes, errores = [], []
+    insertados = repetidos = invalidas = 0
+
+    def guardar():
+        nonlocal insertados
+        # Los que ya existen en la BD se omiten con una consulta por lote
+        existentes = set(db.scalars(select(columna_unica).where(columna_unica.in_([fila[unica] for fila in pendientes]))))
+        nuevas = [fila for fila in pendientes if fila[unica] not in existentes]
+        if nuevas:
+            db.execute(insert(modelo), nuevas)
+        insertados += len(nuevas)
+        pendientes.clear()
+        return len(existentes)
+
+    with open(parametros["archivo"], newline="", encoding="utf-8-sig") as archivo:
+        for numero, fila in enumerate(csv.DictReader(archivo), start=2):
+            try:
+                datos = esquema(**{campo: valor for campo, valor in fila.items() if valor not in (None, "")}).dict()
+            except ValidationError as e:
+                invalidas += 1
+                if len(errores) < MAX_ERRORES_IMPORTACION:
+                    errores.append({"fila": numero, "error": "; ".join(error["msg"] for error in e.errors())})
+                continue
+            if datos[unica] in vistos:
+                repetidos += 1
+                continue
+            vistos.add(datos[unica])
+            pendientes.append({**datos, "user_id": usuario.id})
+            if len(pendientes) == 1000:
+                repetidos += guardar()
+    if pendientes:
+        repetidos += guardar()
+
+    if insertados:
+        crud.registrar_movimiento_automatico(
+            db=db,
+            usuario_id=usuario.id,
+            usuario_nombre=f"{usuario.nombre} {usuario.apellido}",
+            accion=f"Importó {parametros['entidad']}",
+            modulo=modulo,
+            descripcion=f"{insertados} registros importados desde CSV ({repetidos} repetidos omitidos)",
+            tipo_movimiento="crear",
+            entidad_tipo=entidad_tipo
+        )
+    return {"entidad": parametros["entidad"], "insertados": insertados, "repetidos": repetidos,
+            "con_errores": invalidas, "errores": errores}
+
+
+@manejador("archivar_movimientos")
+def _archivar_movimientos(db: Session, parametros: dict):
+    """Aplica la política de retención del registro de movimientos (ver app/archivo_movimientos.py)"""
+    from .archivo_movimientos import archivar_movimientos, asegurar_particiones
+    particiones = asegurar_particiones(db)
+    resultado = archivar_movimientos(db)
+    resultado["particiones_creadas"] = particiones
+    return resultado
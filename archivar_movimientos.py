@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+
+"""
+Script para aplicar la política de retención del registro de movimientos: los meses
+anteriores a MOVIMIENTOS_RETENCION_MESES se mueven a archivos comprimidos en ARCHIVO_DIR.
+En PostgreSQL crea además las particiones mensuales que falten (también lo hacen la API y el worker al arrancar).
+Pensado para ejecutarse periódicamente (por ejemplo, una vez al mes desde cron).
+"""
+
+import sys
+import os
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.archivo_movimientos import archivar_movimientos, asegurar_particiones
+
+def main():
+    print("🗄️  Archivando movimientos antiguos...")
+
+    db = SessionLocal()
+
+    try:
+        particiones = asegurar_particiones(db)
+        if particiones:
+            print(f"🧩 Particiones creadas: {', '.join(particiones)}")
+        resultado = archivar_movimientos(db)
+        if resultado["meses"]:
+            print(f"✅ {resultado['filas']} movimientos archivados ({', '.join(resultado['meses'])})")
+        else:
+            print("ℹ️  No hay movimientos anteriores al periodo de retención")
+        print(f"📅 Archivado hasta: {resultado['archivado_hasta']}")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error archivando movimientos: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
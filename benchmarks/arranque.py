@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Mide el arranque en frío de un worker: lanza procesos nuevos que importan la aplicación,
+la construyen con create_app() y ejecutan el lifespan, igual que uvicorn/gunicorn al iniciar.
+
+Uso (desde el directorio raíz del proyecto):
+    python benchmarks/arranque.py --repeticiones 10 --objetivo-ms 2000
+
+Termina con código 1 si la mediana supera el objetivo, para poder usarlo en CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Código que ejecuta cada proceso hijo; imprime los tiempos parciales en JSON
+HIJO = """
+import time
+t0 = time.perf_counter()
+import asyncio, json
+import app.main
+t1 = time.perf_counter()
+aplicacion = app.main.create_app()
+t2 = time.perf_counter()
+
+async def arrancar():
+    async with aplicacion.router.lifespan_context(aplicacion):
+        pass
+
+asyncio.run(arrancar())
+t3 = time.perf_counter()
+print(json.dumps({"importar": t1 - t0, "crear": t2 - t1, "lifespan": t3 - t2, "total": t3 - t0}))
+"""
+
+
+def medir_una_vez(directorio):
+    entorno = dict(os.environ)
+    entorno.setdefault("SECRET_KEY", "arranque")
+    entorno.setdefault("ALGORITHM", "HS256")
+    entorno.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+    entorno["PYTHONPATH"] = os.pathsep.join(filter(None, [RAIZ, entorno.get("PYTHONPATH")]))
+    inicio = time.perf_counter()
+    salida = subprocess.run(
+        [sys.executable, "-c", HIJO], cwd=directorio, env=entorno, capture_output=True, text=True, check=True
+    ).stdout
+    tiempos = json.loads(salida.strip().splitlines()[-1])
+    tiempos["proceso"] = time.perf_counter() - inicio  # incluye el arranque del intérprete
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frío de la aplicación")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Procesos a lanzar")
+    parser.add_argument("--objetivo-ms", type=float, default=2000, help="Mediana máxima aceptable del proceso completo")
+    args = parser.parse_args()
+
+    # Cada proceso arranca en un directorio temporal para no crear la BD de desarrollo
+    directorio = tempfile.mkdtemp(prefix="porcigest_arranque_")
+    medidas = []
+    for i in range(args.repeticiones):
+        medidas.append(medir_una_vez(directorio))
+        print(f"   #{i + 1}: {medidas[-1]['proceso'] * 1000:.0f} ms")
+
+    print(f"\n{'Fase':<10}{'mediana ms':>12}{'máx ms':>10}")
+    for fase in ("importar", "crear", "lifespan", "total", "proceso"):
+        valores = [m[fase] * 1000 for m in medidas]
+        print(f"{fase:<10}{statistics.median(valores):>12.0f}{max(valores):>10.0f}")
+
+    mediana = statistics.median(m["proceso"] * 1000 for m in medidas)
+    if mediana > args.objetivo_ms:
+        print(f"\n❌ El arranque ({mediana:.0f} ms) supera el objetivo de {args.objetivo_ms:.0f} ms")
+        sys.exit(1)
+    print(f"\n✅ Arranque dentro del objetivo ({mediana:.0f} ms ≤ {args.objetivo_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
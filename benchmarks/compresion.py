@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Mide cuánto ahorra la compresión de respuestas en los listados más pesados
+(/engorde/ y /lechones/) y cuánta CPU cuesta, para varios tamaños de lista y niveles.
+
+Uso (desde el directorio raíz del proyecto):
+    python benchmarks/compresion.py --tamanos 10 100 1000
+    python benchmarks/compresion.py --salida compresion.json
+
+Usa la aplicación en proceso sobre una base SQLite temporal. Brotli se mide solo si está instalado.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+NIVELES = {"gzip": (1, 6, 9), "br": (1, 4, 11)}
+
+
+def preparar(maximo):
+    """BD temporal con `maximo` camadas y lotes de un mismo usuario; devuelve (cliente, cabeceras)"""
+    os.environ.setdefault("SECRET_KEY", uuid.uuid4().hex)
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.chdir(tempfile.mkdtemp(prefix="porcigest_compresion_"))
+
+    from fastapi.testclient import TestClient
+    from app import models
+    from app.database import engine
+    from app.main import app
+    models.Base.metadata.create_all(bind=engine)
+
+    cliente = TestClient(app)
+    cliente.post("/signup", json={"nombre": "Prueba", "apellido": "Compresión", "tipo_documento": "CC",
+                                  "numero_documento": "compresion", "password": "compresion"}).raise_for_status()
+    token = cliente.post("/token", data={"username": "compresion", "password": "compresion"}).json()["access_token"]
+    cabeceras = {"Authorization": f"Bearer {token}"}
+
+    with engine.begin() as conn:
+        user_id = conn.execute(models.User.__table__.select().with_only_columns(models.User.id)).scalar()
+        conn.execute(models.CerdaReproductora.__table__.insert(), [
+            {"id": 1, "codigo_id": "CMP-1", "fecha_nacimiento": date(2022, 1, 1), "raza": "Landrace",
+             "estado_reproductivo": "Lactante", "user_id": user_id}])
+        conn.execute(models.Semental.__table__.insert(), [
+            {"id": 1, "nombre": "CMP-1", "raza": "Duroc", "tasa_fertilidad": 0.9, "user_id": user_id}])
+        hoy = date.today()
+        conn.execute(models.CamadaLechones.__table__.insert(), [
+            {"id": i + 1, "fecha_nacimiento": hoy - timedelta(days=i % 365), "numero_lechones": 8 + i % 7,
+             "peso_promedio_kg": 1.4, "madre_id": 1, "padre_id": 1, "user_id": user_id}
+            for i in range(maximo)])
+        conn.execute(models.LoteEngorde.__table__.insert(), [
+            {"id": i + 1, "lote_id_str": f"CMP-LOTE-{i:06d}", "fecha_inicio": hoy - timedelta(days=i % 365),
+             "numero_cerdos": 8 + i % 7, "peso_inicial_promedio": 21.5, "peso_actual_promedio": 64.0,
+             "camada_origen_id": i + 1, "user_id": user_id}
+            for i in range(maximo)])
+    return cliente, cabeceras
+
+
+def medir_cpu(cuerpo, codificacion, nivel, repeticiones):
+    from app.compresion import comprimir
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        comprimido = comprimir(cuerpo, codificacion, nivel)
+    return len(comprimido), (time.process_time() - inicio) / repeticiones * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes transferidos y coste de CPU de la compresión de listados")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[10, 100, 1000], help="Elementos por listado")
+    parser.add_argument("--repeticiones", type=int, default=20, help="Repeticiones para medir la CPU")
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+    salida = os.path.abspath(args.salida) if args.salida else None
+
+    cliente, cabeceras = preparar(max(args.tamanos))
+    from app.compresion import brotli_disponible
+    codificaciones = ["gzip", "br"] if brotli_disponible() else ["gzip"]
+    if not brotli_disponible():
+        print("ℹ️  brotli no está instalado: solo se mide gzip")
+
+    resultados = []
+    print(f"\n{'Endpoint':<11}{'Elem.':>7}{'Cod.':>6}{'Nivel':>6}{'Bytes':>11}{'Comprim.':>10}{'Ratio':>8}{'CPU ms':>9}")
+    for endpoint in ("/engorde/", "/lechones/"):
+        for tamano in args.tamanos:
+            respuesta = cliente.get(endpoint, params={"limit": tamano}, headers={**cabeceras, "Accept-Encoding": "identity"})
+            cuerpo = respuesta.content
+            # Lo que realmente sale por la red con la configuración actual del middleware
+            en_red = cliente.get(endpoint, params={"limit": tamano}, headers={**cabeceras, "Accept-Encoding": "gzip"})
+            bytes_red = int(en_red.headers["content-length"])
+            print(f"{endpoint:<11}{tamano:>7}  en red con la configuración actual: {bytes_red:,} bytes "
+                  f"({en_red.headers.get('content-encoding', 'sin comprimir')})")
+            for codificacion in codificaciones:
+                for nivel in NIVELES[codificacion]:
+                    comprimido, cpu_ms = medir_cpu(cuerpo, codificacion, nivel, args.repeticiones)
+                    fila = {"endpoint": endpoint, "elementos": tamano, "codificacion": codificacion, "nivel": nivel,
+                            "bytes_original": len(cuerpo), "bytes_comprimido": comprimido,
+                            "bytes_en_red_gzip": bytes_red, "ratio": round(len(cuerpo) / comprimido, 1),
+                            "cpu_ms": round(cpu_ms, 3)}
+                    resultados.append(fila)
+                    print(f"{endpoint:<11}{tamano:>7}{codificacion:>6}{nivel:>6}{len(cuerpo):>11,}"
+                          f"{comprimido:>10,}{fila['ratio']:>7}x{fila['cpu_ms']:>9}")
+
+    if salida:
+        with open(salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2)
+        print(f"\n💾 Resultados guardados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
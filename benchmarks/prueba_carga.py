@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+
+"""
+Prueba de carga HTTP de extremo a extremo para la API de PorciGest.
+
+Simula usuarios concurrentes que inician sesión, consultan los listados y el dashboard,
+registran camadas y tratamientos y revisan la auditoría. Al final muestra el throughput
+y las latencias p50/p95/p99 por endpoint y guarda un reporte JSON para comparar versiones.
+
+Uso (desde el directorio raíz del proyecto, requiere httpx):
+    python benchmarks/prueba_carga.py                          # servidor en proceso con una BD temporal
+    python benchmarks/prueba_carga.py --url http://localhost:8000 --usuario 12345678 --password admin123
+    python benchmarks/prueba_carga.py --salida actual.json --comparar base.json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+# Escenarios: (nombre, peso relativo). Los pesos reflejan el uso habitual del frontend
+ESCENARIOS = [
+    ("login", 1),
+    ("listar_reproductoras", 3),
+    ("listar_sementales", 2),
+    ("listar_camadas", 2),
+    ("resumen_dashboard", 3),
+    ("crear_camada", 1),
+    ("crear_tratamiento", 1),
+    ("listar_movimientos", 2),
+    ("estadisticas_movimientos", 1),
+]
+
+
+def crear_cliente(url):
+    """Cliente HTTP contra un servidor real o contra la aplicación en proceso (TestClient)"""
+    if url:
+        import httpx
+        return httpx.Client(base_url=url, timeout=30)
+    from fastapi.testclient import TestClient
+    from app.main import app
+    return TestClient(app)
+
+
+def preparar_servidor_local():
+    """Arranca la aplicación en proceso sobre una base SQLite temporal, sin tocar la de desarrollo"""
+    directorio = tempfile.mkdtemp(prefix="porcigest_carga_")
+    os.environ.setdefault("SECRET_KEY", uuid.uuid4().hex)
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    # Todos los usuarios virtuales comparten usuario: sin desactivar los límites la prueba mediría los 429
+    os.environ.setdefault("LIMITES_ACTIVOS", "false")
+    os.chdir(directorio)
+
+    from app import models
+    from app.database import engine
+    models.Base.metadata.create_all(bind=engine)
+    return directorio
+
+
+def preparar_datos(cliente, usuario, password):
+    """Crea (si hace falta) el usuario de la prueba y los animales base sobre los que se registra"""
+    if usuario is None:
+        usuario, password = f"carga-{uuid.uuid4().hex[:10]}", "carga123"
+        respuesta = cliente.post("/signup", json={
+            "nombre": "Prueba", "apellido": "Carga", "tipo_documento": "CC",
+            "numero_documento": usuario, "password": password
+        })
+        respuesta.raise_for_status()
+
+    respuesta = cliente.post("/token", data={"username": usuario, "password": password})
+    respuesta.raise_for_status()
+    cabeceras = {"Authorization": f"Bearer {respuesta.json()['access_token']}"}
+
+    sufijo = uuid.uuid4().hex[:6]
+    cerda = cliente.post("/reproductoras/", headers=cabeceras, json={
+        "codigo_id": f"CARGA-{sufijo}", "fecha_nacimiento": "2022-01-01",
+        "raza": "Landrace", "estado_reproductivo": "Gestante"
+    })
+    cerda.raise_for_status()
+    semental = cliente.post("/sementales/", headers=cabeceras, json={"nombre": f"CARGA-{sufijo}", "raza": "Duroc"})
+    semental.raise_for_status()
+
+    return {
+        "usuario": usuario,
+        "password": password,
+        "cabeceras": cabeceras,
+        "cerda_id": cerda.json()["id"],
+        "semental_id": semental.json()["id"],
+    }
+
+
+def ejecutar_escenario(cliente, nombre, datos, rng):
+    """Lanza la petición de un escenario y devuelve la respuesta"""
+    cabeceras = datos["cabeceras"]
+    hoy = date.today()
+    if nombre == "login":
+        return cliente.post("/token", data={"username": datos["usuario"], "password": datos["password"]})
+    if nombre == "listar_reproductoras":
+        return cliente.get("/reproductoras/", params={"limit": 50}, headers=cabeceras)
+    if nombre == "listar_sementales":
+        return cliente.get("/sementales/", params={"limit": 50}, headers=cabeceras)
+    if nombre == "listar_camadas":
+        return cliente.get("/lechones/", params={"limit": 50}, headers=cabeceras)
+    if nombre == "resumen_dashboard":
+        return cliente.get("/dashboard/resumen", headers=cabeceras)
+    if nombre == "crear_camada":
+        return cliente.post("/lechones/", headers=cabeceras, json={
+            "fecha_nacimiento": str(hoy - timedelta(days=rng.randint(0, 60))),
+            "numero_lechones": rng.randint(6, 14),
+            "peso_promedio_kg": round(rng.uniform(1.1, 1.8), 2),
+            "madre_id": datos["cerda_id"],
+            "padre_id": datos["semental_id"]
+        })
+    if nombre == "crear_tratamiento":
+        return cliente.post("/veterinaria/", headers=cabeceras, json={
+            "tipo_intervencion": rng.choice(["Vacunación", "Desparasitación", "Inseminación"]),
+            "fecha": str(hoy - timedelta(days=rng.randint(0, 30))),
+            "reproductora_id": datos["cerda_id"]
+        })
+    if nombre == "listar_movimientos":
+        return cliente.get("/movimientos/", params={"limit": 50, "page": rng.randint(1, 3)}, headers=cabeceras)
+    if nombre == "estadisticas_movimientos":
+        return cliente.get("/movimientos/estadisticas", params={"dias": 30}, headers=cabeceras)
+    raise ValueError(f"Escenario desconocido: {nombre}")
+
+
+def usuario_virtual(indice, args, datos, fin, resultados, lock):
+    """Hilo que ejecuta escenarios al azar (según su peso) hasta que se acaba el tiempo"""
+    rng = random.Random(args.semilla + indice)
+    nombres = [nombre for nombre, _ in ESCENARIOS]
+    pesos = [peso for _, peso in ESCENARIOS]
+    cliente = crear_cliente(args.url)
+    muestras = []
+    try:
+        while time.perf_counter() < fin:
+            nombre = rng.choices(nombres, weights=pesos)[0]
+            inicio = time.perf_counter()
+            try:
+                correcto = ejecutar_escenario(cliente, nombre, datos, rng).status_code < 400
+            except Exception:
+                correcto = False
+            muestras.append((nombre, time.perf_counter() - inicio, correcto))
+    finally:
+        cliente.close()
+    with lock:
+        resultados.extend(muestras)
+
+
+def percentil(valores_ordenados, p):
+    """Percentil por rango más cercano sobre una lista ya ordenada"""
+    if not valores_ordenados:
+        return 0.0
+    posicion = max(0, min(len(valores_ordenados) - 1, int(round(p / 100 * len(valores_ordenados) + 0.5)) - 1))
+    return valores_ordenados[posicion]
+
+
+def resumir(muestras, duracion):
+    """Agrupa las muestras por escenario y calcula throughput y latencias en milisegundos"""
+    por_endpoint = {}
+    for nombre, segundos, correcto in muestras:
+        entrada = por_endpoint.setdefault(nombre, {"latencias": [], "errores": 0})
+        entrada["latencias"].append(segundos)
+        if not correcto:
+            entrada["errores"] += 1
+
+    endpoints = {}
+    for nombre in sorted(por_endpoint):
+        latencias = sorted(por_endpoint[nombre]["latencias"])
+        endpoints[nombre] = {
+            "peticiones": len(latencias),
+            "errores": por_endpoint[nombre]["errores"],
+            "rps": round(len(latencias) / duracion, 2),
+            "p50_ms": round(percentil(latencias, 50) * 1000, 2),
+            "p95_ms": round(percentil(latencias, 95) * 1000, 2),
+            "p99_ms": round(percentil(latencias, 99) * 1000, 2),
+            "max_ms": round(latencias[-1] * 1000, 2),
+        }
+    return endpoints
+
+
+def imprimir_tabla(reporte):
+    print(f"\n📊 {reporte['total_peticiones']} peticiones en {reporte['duracion_s']} s "
+          f"({reporte['rps']} req/s, {reporte['total_errores']} errores)\n")
+    print(f"{'Endpoint':<26}{'Peticiones':>11}{'Errores':>9}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for nombre, datos in reporte["endpoints"].items():
+        print(f"{nombre:<26}{datos['peticiones']:>11}{datos['errores']:>9}{datos['rps']:>9}"
+              f"{datos['p50_ms']:>10}{datos['p95_ms']:>10}{datos['p99_ms']:>10}")
+
+
+def comparar(reporte, ruta_base, tolerancia):
+    """Compara contra un reporte anterior. Devuelve True si algún p95 empeora más que la tolerancia (%)"""
+    with open(ruta_base, encoding="utf-8") as archivo:
+        base = json.load(archivo)
+
+    print(f"\n🔍 Comparación con {ruta_base} ({base.get('fecha', '?')})\n")
+    print(f"{'Endpoint':<26}{'p95 base':>10}{'p95 actual':>12}{'Δ p95':>9}{'req/s base':>12}{'req/s actual':>14}")
+    regresion = False
+    for nombre, actual in reporte["endpoints"].items():
+        anterior = base.get("endpoints", {}).get(nombre)
+        if anterior is None:
+            print(f"{nombre:<26}{'-':>10}{actual['p95_ms']:>12}{'nuevo':>9}{'-':>12}{actual['rps']:>14}")
+            continue
+        cambio = (actual["p95_ms"] - anterior["p95_ms"]) / anterior["p95_ms"] * 100 if anterior["p95_ms"] else 0.0
+        marca = ""
+        if cambio > tolerancia:
+            regresion = True
+            marca = " ⚠️"
+        print(f"{nombre:<26}{anterior['p95_ms']:>10}{actual['p95_ms']:>12}{cambio:>+8.1f}%"
+              f"{anterior['rps']:>12}{actual['rps']:>14}{marca}")
+    return regresion
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga HTTP de la API de PorciGest")
+    parser.add_argument("--url", help="URL de un servidor en marcha (por defecto, la aplicación en proceso)")
+    parser.add_argument("--usuario", help="Número de documento de un usuario existente (por defecto se registra uno)")
+    parser.add_argument("--password", help="Contraseña del usuario indicado con --usuario")
+    parser.add_argument("--concurrencia", type=int, default=8, help="Usuarios virtuales simultáneos")
+    parser.add_argument("--duracion", type=float, default=30, help="Segundos de medición")
+    parser.add_argument("--calentamiento", type=float, default=3, help="Segundos de calentamiento sin medir")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla para que las ejecuciones sean repetibles")
+    parser.add_argument("--salida", default="reporte_carga.json", help="Archivo JSON con los resultados")
+    parser.add_argument("--comparar", help="Reporte JSON anterior contra el que comparar")
+    parser.add_argument("--tolerancia", type=float, default=10, help="Empeoramiento de p95 permitido (%%) al comparar")
+    args = parser.parse_args()
+
+    if args.usuario and not args.password:
+        parser.error("--usuario requiere --password")
+    salida = os.path.abspath(args.salida)
+    base = os.path.abspath(args.comparar) if args.comparar else None
+
+    if not args.url:
+        directorio = preparar_servidor_local()
+        print(f"🧪 Aplicación en proceso con base de datos temporal en {directorio}")
+
+    cliente = crear_cliente(args.url)
+    try:
+        datos = preparar_datos(cliente, args.usuario, args.password)
+    finally:
+        cliente.close()
+
+    lock = threading.Lock()
+    if args.calentamiento > 0:
+        print(f"🔥 Calentando {args.calentamiento} s...")
+        fin = time.perf_counter() + args.calentamiento
+        hilos = [threading.Thread(target=usuario_virtual, args=(i, args, datos, fin, [], lock))
+                 for i in range(args.concurrencia)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+    print(f"🚀 {args.concurrencia} usuarios virtuales durante {args.duracion} s...")
+    muestras = []
+    inicio = time.perf_counter()
+    fin = inicio + args.duracion
+    hilos = [threading.Thread(target=usuario_virtual, args=(i, args, datos, fin, muestras, lock))
+             for i in range(args.concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    reporte = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "objetivo": args.url or "en_proceso",
+        "concurrencia": args.concurrencia,
+        "duracion_s": round(duracion, 2),
+        "semilla": args.semilla,
+        "total_peticiones": len(muestras),
+        "total_errores": sum(1 for _, _, correcto in muestras if not correcto),
+        "rps": round(len(muestras) / duracion, 2),
+        "endpoints": resumir(muestras, duracion),
+    }
+    imprimir_tabla(reporte)
+
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+    print(f"\n💾 Reporte guardado en {salida}")
+
+    if base and comparar(reporte, base, args.tolerancia):
+        print(f"\n❌ Hay endpoints cuyo p95 empeoró más de un {args.tolerancia}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+
+"""
+Compara cómo se validan las claves foráneas al crear/editar: cargando los registros con sus
+joinedloads (crud.get_*), con EXISTS por referencia (crud.existe), con una sola consulta para
+todas las referencias (crud.referencias_faltantes) y, para cargas en lote, con crud.ids_existentes.
+También mide el camino completo de POST /veterinaria/.
+
+Uso (desde el directorio raíz del proyecto):
+    python benchmarks/validacion_referencias.py --repeticiones 500 --lote 500
+    python benchmarks/validacion_referencias.py --salida validacion.json
+
+Usa la aplicación en proceso sobre una base SQLite temporal.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+
+def preparar(registros):
+    """BD temporal con `registros` cerdas, sementales, camadas y lotes de un mismo usuario; devuelve (cliente, cabeceras)"""
+    os.environ.setdefault("SECRET_KEY", uuid.uuid4().hex)
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("LIMITES_ACTIVOS", "false")  # se mide la validación, no el limitador
+    os.chdir(tempfile.mkdtemp(prefix="porcigest_validacion_"))
+
+    from fastapi.testclient import TestClient
+    from app import models
+    from app.database import engine
+    from app.main import app
+    models.Base.metadata.create_all(bind=engine)
+
+    cliente = TestClient(app)
+    cliente.post("/signup", json={"nombre": "Prueba", "apellido": "Validación", "tipo_documento": "CC",
+                                  "numero_documento": "validacion", "password": "validacion"}).raise_for_status()
+    token = cliente.post("/token", data={"username": "validacion", "password": "validacion"}).json()["access_token"]
+    cabeceras = {"Authorization": f"Bearer {token}"}
+
+    hoy = date.today()
+    with engine.begin() as conn:
+        user_id = conn.execute(models.User.__table__.select().with_only_columns(models.User.id)).scalar()
+        conn.execute(models.CerdaReproductora.__table__.insert(), [
+            {"id": i + 1, "codigo_id": f"VAL-{i:06d}", "fecha_nacimiento": date(2022, 1, 1), "raza": "Landrace",
+             "estado_reproductivo": "Gestante", "user_id": user_id} for i in range(registros)])
+        conn.execute(models.Semental.__table__.insert(), [
+            {"id": i + 1, "nombre": f"VAL-{i:06d}", "raza": "Duroc", "tasa_fertilidad": 0.9, "user_id": user_id}
+            for i in range(registros)])
+        conn.execute(models.CamadaLechones.__table__.insert(), [
+            {"id": i + 1, "fecha_nacimiento": hoy - timedelta(days=i % 365), "numero_lechones": 10,
+             "madre_id": i + 1, "padre_id": i + 1, "user_id": user_id} for i in range(registros)])
+        conn.execute(models.LoteEngorde.__table__.insert(), [
+            {"id": i + 1, "lote_id_str": f"VAL-LOTE-{i:06d}", "fecha_inicio": hoy, "numero_cerdos": 9,
+             "camada_origen_id": i + 1, "user_id": user_id} for i in range(registros)])
+    return cliente, cabeceras
+
+
+def medir(funcion, repeticiones):
+    """Mediana y p95 en microsegundos; cada repetición empieza con la sesión vacía"""
+    from app.database import SessionLocal
+    db = SessionLocal()
+    tiempos = []
+    try:
+        for i in range(repeticiones):
+            db.expunge_all()
+            inicio = time.perf_counter()
+            funcion(db, i)
+            tiempos.append((time.perf_counter() - inicio) * 1_000_000)
+    finally:
+        db.close()
+    tiempos.sort()
+    return statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coste de validar claves foráneas cargando registros frente a EXISTS")
+    parser.add_argument("--registros", type=int, default=5000, help="Registros por tabla en la BD temporal")
+    parser.add_argument("--repeticiones", type=int, default=500, help="Repeticiones por estrategia")
+    parser.add_argument("--lote", type=int, default=500, help="IDs por carga en lote")
+    parser.add_argument("--salida", help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+    salida = os.path.abspath(args.salida) if args.salida else None
+
+    cliente, cabeceras = preparar(args.registros)
+    from app import crud, models
+    n = args.registros
+
+    def referencias(i):
+        return i % n + 1, (i * 7) % n + 1, (i * 13) % n + 1
+
+    def cargando(db, i):
+        cerda, semental, lote = referencias(i)
+        assert crud.get_cerda(db, cerda) and crud.get_semental(db, semental) and crud.get_lote_engorde(db, lote)
+
+    def exists_por_referencia(db, i):
+        cerda, semental, lote = referencias(i)
+        assert crud.existe(db, models.CerdaReproductora, cerda) and crud.existe(db, models.Semental, semental) \
+            and crud.existe(db, models.LoteEngorde, lote)
+
+    def exists_una_consulta(db, i):
+        cerda, semental, lote = referencias(i)
+        assert not crud.referencias_faltantes(db, reproductora_id=(models.CerdaReproductora, cerda),
+                                              semental_id=(models.Semental, semental),
+                                              lote_engorde_id=(models.LoteEngorde, lote))
+
+    def ids_del_lote(i):
+        return [(i * args.lote + j) % n + 1 for j in range(args.lote)]
+
+    def lote_cargando(db, i):
+        assert all(crud.get_lote_engorde(db, lote_id) for lote_id in ids_del_lote(i))
+
+    def lote_ids_existentes(db, i):
+        assert len(crud.ids_existentes(db, models.LoteEngorde, ids_del_lote(i))) == args.lote
+
+    repeticiones_lote = max(args.repeticiones // 50, 5)
+    casos = [
+        ("3 referencias: crud.get_* con joinedloads", cargando, args.repeticiones),
+        ("3 referencias: crud.existe (un EXISTS cada una)", exists_por_referencia, args.repeticiones),
+        ("3 referencias: crud.referencias_faltantes (una consulta)", exists_una_consulta, args.repeticiones),
+        (f"{args.lote} IDs: crud.get_lote_engorde uno a uno", lote_cargando, repeticiones_lote),
+        (f"{args.lote} IDs: crud.ids_existentes", lote_ids_existentes, repeticiones_lote),
+    ]
+
+    resultados = []
+    print(f"\n{'Estrategia':<60}{'Mediana µs':>12}{'p95 µs':>12}")
+    for nombre, funcion, repeticiones in casos:
+        mediana, p95 = medir(funcion, repeticiones)
+        resultados.append({"estrategia": nombre, "repeticiones": repeticiones,
+                           "mediana_us": round(mediana, 1), "p95_us": round(p95, 1)})
+        print(f"{nombre:<60}{mediana:>12,.1f}{p95:>12,.1f}")
+
+    # Camino completo: validación + INSERT + movimiento + respuesta
+    tiempos = []
+    for i in range(min(args.repeticiones, 200)):
+        inicio = time.perf_counter()
+        respuesta = cliente.post("/veterinaria/", headers=cabeceras, json={
+            "tipo_intervencion": "Vacuna", "fecha": date.today().isoformat(), "lote_engorde_id": referencias(i)[2]})
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        respuesta.raise_for_status()
+    tiempos.sort()
+    crear = {"estrategia": "POST /veterinaria/ (completo)", "repeticiones": len(tiempos),
+             "mediana_ms": round(statistics.median(tiempos), 3), "p95_ms": round(tiempos[int(len(tiempos) * 0.95) - 1], 3)}
+    resultados.append(crear)
+    print(f"\n{crear['estrategia']}: mediana {crear['mediana_ms']} ms, p95 {crear['p95_ms']} ms")
+
+    if salida:
+        with open(salida, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2)
+        print(f"\n💾 Resultados guardados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
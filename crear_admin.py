@@ -34,6 +34,7 @@ def main():
         )
         
         new_user = crud.create_user(db=db, user=user_data)
+        db.commit()
         print(f"✅ Usuario administrador creado: {new_user.nombre} {new_user.apellido}")
         print(f"📝 Documento: {new_user.numero_documento}")
         print(f"🔐 Contraseña: admin123")
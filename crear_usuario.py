@@ -45,6 +45,7 @@ def crear_usuario():
         )
         
         new_user = crud.create_user(db=db, user=user_data)
+        db.commit()
         print(f"✅ Usuario creado exitosamente:")
         print(f"   Nombre: {new_user.nombre} {new_user.apellido}")
         print(f"   Documento: {new_user.numero_documento}")
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+
+"""
+Generador de una granja sintética de tamaño configurable para pruebas de rendimiento.
+Crea usuarios, reproductoras, sementales, camadas enlazadas a sus padres, lotes de engorde,
+tratamientos y el registro de movimientos con inserciones masivas por lotes.
+Con la misma semilla y la misma fecha final se obtienen siempre los mismos datos.
+
+Ejecutar desde el directorio raíz del proyecto:
+    python generar_datos_sinteticos.py --escala 1                 # ~100.000 movimientos
+    python generar_datos_sinteticos.py --escala 100 --semilla 7   # ~10 millones de movimientos
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+from datetime import date, datetime, timedelta
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, select, text
+
+from app.database import engine
+from app import models
+from app.diccionario import diccionario
+from app.security import get_password_hash
+
+# Cantidades por unidad de escala
+POR_ESCALA = {
+    "usuarios": 5,
+    "reproductoras": 200,
+    "sementales": 20,
+    "tratamientos": 3000,
+    "movimientos": 100_000,
+}
+CAMADAS_POR_CERDA = 5
+PROPORCION_LOTES = 0.8  # camadas que pasan a un lote de engorde
+
+RAZAS = ["Landrace", "Yorkshire", "Duroc", "Pietrain", "Hampshire", "Large White"]
+ESTADOS = ["Vacía", "Gestante", "Lactante", "Servida", "Descarte"]
+NOMBRES = ["Ana", "Carlos", "Lucía", "Jorge", "María", "Pedro", "Sofía", "Andrés", "Laura", "Diego"]
+APELLIDOS = ["Gómez", "Rodríguez", "Martínez", "López", "García", "Pérez", "Sánchez", "Ramírez"]
+INTERVENCIONES = [
+    ("Vacunación", "Vacuna Circovirus", "2 ml"),
+    ("Vacunación", "Vacuna Mycoplasma", "2 ml"),
+    ("Desparasitación", "Ivermectina", "1 ml/33 kg"),
+    ("Inseminación", None, None),
+    ("Tratamiento", "Amoxicilina", "15 mg/kg"),
+    ("Revisión", None, None),
+]
+VETERINARIOS = ["Dra. Herrera", "Dr. Castillo", "Dra. Méndez", "Dr. Rojas"]
+# (módulo, entidad_tipo, tabla de la que toma el ID)
+MODULOS = [
+    ("Reproductoras", "cerda_reproductora", "reproductoras"),
+    ("Sementales", "semental", "sementales"),
+    ("Lechones", "camada_lechones", "camadas"),
+    ("Engorde", "lote_engorde", "lotes"),
+    ("Veterinaria", "tratamiento_veterinario", "tratamientos"),
+]
+TIPOS_MOVIMIENTO = [("crear", "Registró", 0.45), ("editar", "Actualizó", 0.45), ("eliminar", "Eliminó", 0.10)]
+AGENTES = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0) Safari/17.0",
+    "Mozilla/5.0 (Linux; Android 14) Chrome/120.0 Mobile",
+]
+
+
+class Progreso:
+    """Muestra en una sola línea el avance de la carga de una tabla"""
+
+    def __init__(self, nombre, total):
+        self.nombre = nombre
+        self.total = total
+        self.hechas = 0
+        self.inicio = time.perf_counter()
+
+    def avanzar(self, filas):
+        self.hechas += filas
+        transcurrido = max(time.perf_counter() - self.inicio, 1e-6)
+        porcentaje = self.hechas / self.total * 100 if self.total else 100
+        print(f"\r   {self.nombre:<14} {self.hechas:>12,}/{self.total:,} ({porcentaje:5.1f}%) "
+              f"{self.hechas / transcurrido:>10,.0f} filas/s", end="", flush=True)
+
+    def terminar(self):
+        print(f"  ✅ {time.perf_counter() - self.inicio:.1f} s")
+
+
+def siguiente_id(conn, modelo):
+    return (conn.execute(select(func.max(modelo.id))).scalar() or 0) + 1
+
+
+def insertar(conn, modelo, filas, tam_lote, progreso):
+    """Inserta las filas (un generador de dicts) en bloques con executemany y un commit por bloque"""
+    tabla = modelo.__table__
+    bloque = []
+    for fila in filas:
+        bloque.append(fila)
+        if len(bloque) >= tam_lote:
+            conn.execute(tabla.insert(), bloque)
+            conn.commit()
+            progreso.avanzar(len(bloque))
+            bloque = []
+    if bloque:
+        conn.execute(tabla.insert(), bloque)
+        conn.commit()
+        progreso.avanzar(len(bloque))
+    progreso.terminar()
+
+
+def dia_aleatorio(rng, inicio, dias):
+    return inicio + timedelta(days=rng.randrange(dias))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una granja sintética para pruebas de rendimiento")
+    parser.add_argument("--escala", type=float, default=1.0, help="Factor de tamaño (1 ≈ 100.000 movimientos)")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla del generador aleatorio")
+    parser.add_argument("--movimientos", type=int, help="Número exacto de movimientos (ignora la escala)")
+    parser.add_argument("--dias", type=int, default=730, help="Días de historia que cubren los datos")
+    parser.add_argument("--fecha-fin", type=date.fromisoformat, default=date.today(), help="Último día de la historia (YYYY-MM-DD)")
+    parser.add_argument("--lote", type=int, default=20_000, help="Filas por bloque de inserción")
+    parser.add_argument("--password", default="sintetico123", help="Contraseña de todos los usuarios generados")
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    cantidad = {nombre: max(1, int(valor * args.escala)) for nombre, valor in POR_ESCALA.items()}
+    if args.movimientos is not None:
+        cantidad["movimientos"] = args.movimientos
+    inicio_historia = args.fecha_fin - timedelta(days=args.dias)
+    prefijo = f"SIN{args.semilla}"
+
+    print(f"🚀 Generando granja sintética (escala {args.escala}, semilla {args.semilla})")
+    for nombre, valor in cantidad.items():
+        print(f"   {nombre:<14} {valor:>12,}")
+
+    models.Base.metadata.create_all(bind=engine)
+    inicio_total = time.perf_counter()
+
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            # Solo para esta conexión: menos fsync y más caché durante la carga masiva
+            conn.execute(text("PRAGMA synchronous = OFF"))
+            conn.execute(text("PRAGMA temp_store = MEMORY"))
+            conn.execute(text("PRAGMA cache_size = -200000"))
+
+        existente = conn.execute(
+            select(models.CerdaReproductora.id).where(models.CerdaReproductora.codigo_id.like(f"{prefijo}-%")).limit(1)
+        ).first()
+        if existente:
+            print(f"❌ Ya existen datos generados con la semilla {args.semilla}. Usa otra semilla o una base de datos nueva.")
+            return
+
+        # --- Usuarios (la contraseña se hashea una sola vez) ---
+        hashed = get_password_hash(args.password)
+        primer_usuario = siguiente_id(conn, models.User)
+        nombres = [(rng.choice(NOMBRES), rng.choice(APELLIDOS)) for _ in range(cantidad["usuarios"])]
+        usuarios = [(primer_usuario + i, f"{nombre} {apellido}") for i, (nombre, apellido) in enumerate(nombres)]
+        insertar(conn, models.User, (
+            {"id": primer_usuario + i, "nombre": nombre, "apellido": apellido, "tipo_documento": "CC",
+             "numero_documento": f"{prefijo}-{i:06d}", "hashed_password": hashed, "is_active": True}
+            for i, (nombre, apellido) in enumerate(nombres)
+        ), args.lote, Progreso("usuarios", cantidad["usuarios"]))
+
+        # --- Reproductoras y sementales ---
+        primera_cerda = siguiente_id(conn, models.CerdaReproductora)
+        duenos_cerdas = [rng.choice(usuarios)[0] for _ in range(cantidad["reproductoras"])]
+        insertar(conn, models.CerdaReproductora, (
+            {"id": primera_cerda + i, "codigo_id": f"{prefijo}-REP-{i:07d}",
+             "fecha_nacimiento": dia_aleatorio(rng, inicio_historia - timedelta(days=900), 700),
+             "raza": rng.choice(RAZAS), "estado_reproductivo": rng.choice(ESTADOS), "user_id": duenos_cerdas[i]}
+            for i in range(cantidad["reproductoras"])
+        ), args.lote, Progreso("reproductoras", cantidad["reproductoras"]))
+
+        primer_semental = siguiente_id(conn, models.Semental)
+        duenos_sementales = [rng.choice(usuarios)[0] for _ in range(cantidad["sementales"])]
+        insertar(conn, models.Semental, (
+            {"id": primer_semental + i, "nombre": f"{prefijo}-SEM-{i:05d}", "raza": rng.choice(RAZAS),
+             "tasa_fertilidad": round(rng.uniform(0.7, 0.98), 3), "user_id": duenos_sementales[i]}
+            for i in range(cantidad["sementales"])
+        ), args.lote, Progreso("sementales", cantidad["sementales"]))
+
+        # --- Camadas: cada una con una madre y un padre generados ---
+        total_camadas = cantidad["reproductoras"] * CAMADAS_POR_CERDA
+        primera_camada = siguiente_id(conn, models.CamadaLechones)
+        camadas = []  # (fecha_nacimiento, numero_lechones, peso, dueño) para derivar los lotes
+        def generar_camadas():
+            for i in range(total_camadas):
+                madre = i % cantidad["reproductoras"]
+                fecha = dia_aleatorio(rng, inicio_historia, args.dias)
+                lechones = rng.randint(6, 16)
+                peso = round(rng.uniform(1.0, 1.9), 2)
+                camadas.append((fecha, lechones, duenos_cerdas[madre]))
+                yield {"id": primera_camada + i, "fecha_nacimiento": fecha, "numero_lechones": lechones,
+                       "peso_promedio_kg": peso, "madre_id": primera_cerda + madre,
+                       "padre_id": primer_semental + rng.randrange(cantidad["sementales"]),
+                       "user_id": duenos_cerdas[madre]}
+        insertar(conn, models.CamadaLechones, generar_camadas(), args.lote, Progreso("camadas", total_camadas))
+
+        # --- Lotes de engorde a partir de parte de las camadas (63 días tras el nacimiento) ---
+        indices_lotes = sorted(rng.sample(range(total_camadas), int(total_camadas * PROPORCION_LOTES)))
+        primer_lote = siguiente_id(conn, models.LoteEngorde)
+        def generar_lotes():
+            for n, i in enumerate(indices_lotes):
+                fecha, lechones, dueno = camadas[i]
+                peso_inicial = round(rng.uniform(18, 25), 1)
+                yield {"id": primer_lote + n, "lote_id_str": f"{prefijo}-LOTE-{n:07d}",
+                       "fecha_inicio": fecha + timedelta(days=63), "numero_cerdos": max(1, lechones - rng.randint(0, 2)),
+                       "peso_inicial_promedio": peso_inicial,
+                       "peso_actual_promedio": round(peso_inicial + rng.uniform(0, 90), 1),
+                       "camada_origen_id": primera_camada + i, "user_id": dueno}
+        insertar(conn, models.LoteEngorde, generar_lotes(), args.lote, Progreso("lotes", len(indices_lotes)))
+
+        # --- Tratamientos sobre reproductoras, sementales o lotes ---
+        primer_tratamiento = siguiente_id(conn, models.TratamientoVeterinario)
+        def generar_tratamientos():
+            for i in range(cantidad["tratamientos"]):
+                tipo, producto, dosis = rng.choice(INTERVENCIONES)
+                fila = {"id": primer_tratamiento + i, "tipo_intervencion": tipo, "medicamento_producto": producto,
+                        "dosis": dosis, "fecha": dia_aleatorio(rng, inicio_historia, args.dias + 1),
+                        "veterinario": rng.choice(VETERINARIOS), "observaciones": None,
+                        "reproductora_id": None, "semental_id": None, "lote_engorde_id": None}
+                destino = "reproductora" if tipo == "Inseminación" else rng.choice(["reproductora", "semental", "lote"])
+                if destino == "reproductora" or (destino == "lote" and not indices_lotes):
+                    cerda = rng.randrange(cantidad["reproductoras"])
+                    fila["reproductora_id"], fila["user_id"] = primera_cerda + cerda, duenos_cerdas[cerda]
+                elif destino == "semental":
+                    semental = rng.randrange(cantidad["sementales"])
+                    fila["semental_id"], fila["user_id"] = primer_semental + semental, duenos_sementales[semental]
+                else:
+                    lote = rng.randrange(len(indices_lotes))
+                    fila["lote_engorde_id"], fila["user_id"] = primer_lote + lote, camadas[indices_lotes[lote]][2]
+                yield fila
+        insertar(conn, models.TratamientoVeterinario, generar_tratamientos(), args.lote,
+                 Progreso("tratamientos", cantidad["tratamientos"]))
+
+        # --- Movimientos: en orden cronológico, como crece la auditoría real ---
+        rangos = {
+            "reproductoras": (primera_cerda, cantidad["reproductoras"]),
+            "sementales": (primer_semental, cantidad["sementales"]),
+            "camadas": (primera_camada, total_camadas),
+            "lotes": (primer_lote, max(1, len(indices_lotes))),
+            "tratamientos": (primer_tratamiento, cantidad["tratamientos"]),
+        }
+        total_movimientos = cantidad["movimientos"]
+        inicio_mov = datetime.combine(inicio_historia, datetime.min.time())
+        segundos = args.dias * 86400
+        pesos_tipos = [peso for _, _, peso in TIPOS_MOVIMIENTO]
+        ips = [f"192.168.{rng.randint(0, 9)}.{rng.randint(2, 254)}" for _ in range(len(usuarios))]
+        # Los textos repetidos se guardan como IDs del diccionario de auditoría
+        def codigo(campo, valor):
+            return diccionario.id_de(conn, campo, valor)
+        nombres_ids = [codigo("usuario_nombre", nombre) for _, nombre in usuarios]
+        agentes_ids = [codigo("user_agent", agente) for agente in AGENTES]
+        modulos_ids = {modulo: (codigo("modulo", modulo), codigo("entidad_tipo", entidad_tipo)) for modulo, entidad_tipo, _ in MODULOS}
+        tipos_ids = {tipo: codigo("tipo_movimiento", tipo) for tipo, _, _ in TIPOS_MOVIMIENTO}
+        def generar_movimientos():
+            for i in range(total_movimientos):
+                modulo, entidad_tipo, tabla = rng.choice(MODULOS)
+                tipo, verbo, _ = rng.choices(TIPOS_MOVIMIENTO, weights=pesos_tipos)[0]
+                primero, cuantos = rangos[tabla]
+                entidad_id = primero + rng.randrange(cuantos)
+                indice_usuario = rng.randrange(len(usuarios))
+                modulo_id, entidad_tipo_id = modulos_ids[modulo]
+                yield {
+                    "usuario_id": usuarios[indice_usuario][0], "usuario_nombre_id": nombres_ids[indice_usuario],
+                    "accion": f"{verbo} {entidad_tipo.replace('_', ' ')}", "modulo_id": modulo_id,
+                    "descripcion": f"{verbo} {entidad_tipo} #{entidad_id}",
+                    "entidad_tipo_id": entidad_tipo_id, "entidad_id": entidad_id, "tipo_movimiento_id": tipos_ids[tipo],
+                    "fecha_movimiento": inicio_mov + timedelta(seconds=i * segundos // total_movimientos + rng.randrange(60)),
+                    "ip_address": ips[indice_usuario], "user_agent_id": agentes_ids[indice_usuario % len(AGENTES)],
+                }
+        insertar(conn, models.Movimiento, generar_movimientos(), args.lote, Progreso("movimientos", total_movimientos))
+
+        if engine.dialect.name == "postgresql":
+            # Los IDs se asignaron explícitamente: se ajustan las secuencias
+            for modelo in (models.User, models.CerdaReproductora, models.Semental, models.CamadaLechones,
+                           models.LoteEngorde, models.TratamientoVeterinario):
+                tabla = modelo.__tablename__
+                conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), (SELECT MAX(id) FROM {tabla}))"))
+        print("📈 Actualizando estadísticas del planificador...")
+        conn.execute(text("ANALYZE"))
+        conn.commit()
+
+    print(f"🎉 Granja sintética generada en {time.perf_counter() - inicio_total:.1f} s")
+    print(f"🔐 Usuarios {prefijo}-000000 ... con contraseña '{args.password}'")
+
+if __name__ == "__main__":
+    main()
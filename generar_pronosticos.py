@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+
+"""
+Script para recalcular los pronósticos de partos, destetes y traslados de toda la granja.
+Pensado para ejecutarse periódicamente (por ejemplo, una vez al día desde cron).
+"""
+
+import sys
+import os
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.pronosticos import generar_pronosticos
+
+def main():
+    print("📅 Calculando pronósticos de la granja...")
+
+    db = SessionLocal()
+
+    try:
+        resultado = generar_pronosticos(db)
+        print(f"✅ {resultado['pronosticos']} pronósticos generados ({resultado['partos']} partos, {resultado['camadas']} camadas)")
+        if resultado["cerdas_sin_fecha_servicio"]:
+            print(f"ℹ️  {resultado['cerdas_sin_fecha_servicio']} cerdas gestantes sin fecha de servicio registrada")
+    except Exception as e:
+        print(f"❌ Error calculando pronósticos: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -52,6 +52,8 @@ def eliminar_usuario(numero_documento):
             print(f"❌ Usuario con documento {numero_documento} no encontrado")
             return
         
+        # Sus sesiones (refresh tokens) dejan de existir con el usuario
+        db.query(models.TokenRefresco).filter(models.TokenRefresco.user_id == user.id).delete()
         db.delete(user)
         db.commit()
         print(f"✅ Usuario {user.nombre} {user.apellido} eliminado exitosamente")
@@ -0,0 +1,41 @@
+# gunicorn.conf.py
+# Perfil de producción con varios procesos: gunicorn gestiona los workers y cada uno ejecuta uvicorn.
+#   gunicorn -c gunicorn.conf.py
+# Variables de entorno: PORT, WEB_CONCURRENCY, GUNICORN_TIMEOUT, GUNICORN_PRELOAD
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "uvicorn.workers.UvicornWorker"
+wsgi_app = "app.main:create_app()"
+
+# El proceso maestro importa y construye la aplicación una sola vez antes del fork,
+# así los workers nacen con los módulos ya cargados. Las conexiones y el calentamiento
+# (pool, consultas frecuentes, resumen del dashboard) se hacen en el lifespan de cada worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Reinicia los workers de vez en cuando para acotar fugas de memoria
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+# Los mensajes de la aplicación (arranque, calentamiento, N+1) salen junto al log de gunicorn
+logconfig_dict = {
+    "loggers": {
+        "porcigest": {"level": loglevel.upper(), "handlers": ["error_console"], "propagate": False},
+    },
+}
+
+
+def post_fork(server, worker):
+    # Cada worker debe abrir sus propias conexiones: nunca reutilizar las heredadas del maestro
+    from app.database import engine
+    engine.dispose(close=False)
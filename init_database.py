@@ -117,6 +117,7 @@ def main():
         else:
             print(f"ℹ️  Ya existen {existing_sementales} sementales en la base de datos - no se crearon nuevos")
         
+        db.commit()
         print("🎉 Base de datos inicializada correctamente!")
         print("📍 Archivo de base de datos: porcigest_dev.db")
         print("👤 Usuario de prueba: Documento 12345678 / Contraseña: admin123")
@@ -15,6 +15,7 @@ export interface CerdaReproductora {
   fecha_nacimiento: string; // formato ISO string desde el backend
   raza: string;
   estado_reproductivo: string;
+  version: number;
   propietario?: {
     id: number;
     nombre: string;
@@ -9,6 +9,7 @@ export interface LoteEngorde {
   peso_inicial_promedio?: number;
   peso_actual_promedio?: number;
   ganancia_peso_total?: number;
+  version: number;
   camada_origen: {
     id: number;
     fecha_nacimiento: string;
@@ -108,7 +109,8 @@ export const useEngorde = () => {
     setError(null);
     
     try {
-      const loteActualizado = await porcinoService.engorde.updateLoteEngorde(id, loteData);
+      const version = lotes.find(lote => lote.id === id)?.version;
+      const loteActualizado = await porcinoService.engorde.updateLoteEngorde(id, loteData, version);
       
       // Actualizar el lote en la lista local
       setLotes(prev => 
@@ -125,7 +127,7 @@ export const useEngorde = () => {
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [lotes]);
 
   // Función para eliminar un lote con retry logic mejorada
   const eliminarLote = useCallback(async (id: number): Promise<boolean> => {
@@ -3,6 +3,7 @@ import porcinoService from '../services/porcinoService';
 
 export interface Camada {
   id: number;
+  version: number;
   fecha_nacimiento: string;
   numero_lechones: number;
   peso_promedio_kg?: number;
@@ -104,7 +105,8 @@ export const useLechones = () => {
     setError(null);
     
     try {
-      const camadaActualizada = await porcinoService.lechones.updateLechon(id, camadaData);
+      const version = camadas.find(camada => camada.id === id)?.version;
+      const camadaActualizada = await porcinoService.lechones.updateLechon(id, camadaData, version);
       
       // Actualizar la camada en la lista local
       setCamadas(prev => 
@@ -121,7 +123,7 @@ export const useLechones = () => {
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [camadas]);
 
   // Función para eliminar una camada con retry logic mejorada
   const eliminarCamada = useCallback(async (id: number): Promise<boolean> => {
@@ -51,7 +51,8 @@ export function useReproductoras() {
     try {
       setLoading(true);
       setError(null);
-      const reproductoraActualizada = await updateReproductora(id, data) as CerdaReproductora;
+      const version = reproductoras.find(item => item.id === id)?.version;
+      const reproductoraActualizada = await updateReproductora(id, data, version) as CerdaReproductora;
       setReproductoras(prev => 
         prev.map(item => item.id === id ? reproductoraActualizada : item)
       );
@@ -6,6 +6,7 @@ export interface Semental {
   nombre: string;
   raza: string;
   tasa_fertilidad: number;
+  version: number;
   propietario: {
     id: number;
     nombre: string;
@@ -89,7 +90,8 @@ export const useSementales = () => {
     setError(null);
     
     try {
-      const sementalActualizado = await porcinoService.sementales.updateSemental(id, sementalData);
+      const version = sementales.find(semental => semental.id === id)?.version;
+      const sementalActualizado = await porcinoService.sementales.updateSemental(id, sementalData, version);
       
       // Actualizar el semental en la lista local
       setSementales(prev => 
@@ -106,7 +108,7 @@ export const useSementales = () => {
     } finally {
       setLoading(false);
     }
-  }, []);
+  }, [sementales]);
 
   // Función para eliminar un semental con retry logic mejorada
   const eliminarSemental = useCallback(async (id: number): Promise<boolean> => {
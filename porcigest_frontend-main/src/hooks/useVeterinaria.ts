@@ -16,6 +16,7 @@ export interface TratamientoVeterinario {
   reproductora?: any;
   semental?: any;
   lote_engorde?: any;
+  version: number;
   propietario: {
     id: number;
     nombre: string;
@@ -121,7 +122,8 @@ export const useVeterinaria = () => {
     setError(null);
 
     try {
-      const tratamientoActualizado = await porcinoService.veterinaria.updateTratamiento(id, tratamientoData);
+      const version = tratamientos.find(tratamiento => tratamiento.id === id)?.version;
+      const tratamientoActualizado = await porcinoService.veterinaria.updateTratamiento(id, tratamientoData, version);
       
       if (tratamientoActualizado) {
         // Actualizar la lista de tratamientos
@@ -138,7 +140,7 @@ export const useVeterinaria = () => {
       setLoading(false);
       throw err;
     }
-  }, [obtenerTratamientos]);
+  }, [obtenerTratamientos, tratamientos]);
 
   // Función para eliminar un tratamiento
   const eliminarTratamiento = useCallback(async (id: number) => {
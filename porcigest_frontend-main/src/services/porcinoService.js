@@ -1,5 +1,8 @@
 import api from './api';
 
+// Cabecera If-Match con la versión que se editó: si otra persona la cambió antes, el backend responde 409
+const conVersion = (version) => (version != null ? { headers: { 'If-Match': `"${version}"` } } : {});
+
 /**
  * Servicio para la gestión de datos porcinos
  * Incluye funciones CRUD para todos los módulos: reproductoras, sementales, lechones, engorde y veterinaria
@@ -56,11 +59,12 @@ export const reproductorasService = {
    * Actualizar una reproductora existente
    * @param {number} id - ID de la reproductora
    * @param {Object} data - Nuevos datos de la reproductora
+   * @param {number} [version] - Versión que se editó (se envía como If-Match)
    * @returns {Promise<Object>} Reproductora actualizada
    */
-  async updateReproductora(id, data) {
+  async updateReproductora(id, data, version) {
     try {
-      const response = await api.put(`/reproductoras/${id}`, data);
+      const response = await api.put(`/reproductoras/${id}`, data, conVersion(version));
       return response.data;
     } catch (error) {
       console.error(`Error al actualizar reproductora ${id}:`, error);
@@ -118,9 +122,9 @@ export const sementalesService = {
     }
   },
 
-  async updateSemental(id, data) {
+  async updateSemental(id, data, version) {
     try {
-      const response = await api.put(`/sementales/${id}`, data);
+      const response = await api.put(`/sementales/${id}`, data, conVersion(version));
       return response.data;
     } catch (error) {
       console.error(`Error al actualizar semental ${id}:`, error);
@@ -173,9 +177,9 @@ export const lechonesService = {
     }
   },
 
-  async updateLechon(id, data) {
+  async updateLechon(id, data, version) {
     try {
-      const response = await api.put(`/lechones/${id}`, data);
+      const response = await api.put(`/lechones/${id}`, data, conVersion(version));
       return response.data;
     } catch (error) {
       console.error(`Error al actualizar lechón ${id}:`, error);
@@ -228,9 +232,9 @@ export const engordeService = {
     }
   },
 
-  async updateLoteEngorde(id, data) {
+  async updateLoteEngorde(id, data, version) {
     try {
-      const response = await api.put(`/engorde/${id}`, data);
+      const response = await api.put(`/engorde/${id}`, data, conVersion(version));
       return response.data;
     } catch (error) {
       console.error(`Error al actualizar lote de engorde ${id}:`, error);
@@ -283,9 +287,9 @@ export const veterinariaService = {
     }
   },
 
-  async updateTratamiento(id, data) {
+  async updateTratamiento(id, data, version) {
     try {
-      const response = await api.put(`/veterinaria/${id}`, data);
+      const response = await api.put(`/veterinaria/${id}`, data, conVersion(version));
       return response.data;
     } catch (error) {
       console.error(`Error al actualizar tratamiento ${id}:`, error);
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+"""
+Proceso worker de la cola de trabajos (inicialización, pronósticos, reportes, exportaciones, importaciones).
+Ejecutar desde el directorio raíz del proyecto: python worker.py
+Se pueden lanzar varios workers a la vez; cada trabajo lo toma solo uno de ellos.
+"""
+
+import argparse
+import sys
+import os
+
+# Agregar el directorio del proyecto al path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import trabajos
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker de la cola de trabajos de PorciGest")
+    parser.add_argument("--intervalo", type=float, default=1.0, help="Segundos de espera cuando la cola está vacía")
+    parser.add_argument("--una-vez", action="store_true", help="Procesar los trabajos pendientes y terminar")
+    args = parser.parse_args()
+
+    try:
+        if args.una_vez:
+            procesados = trabajos.procesar_pendientes()
+            print(f"✅ {procesados} trabajos procesados")
+        else:
+            trabajos.bucle_worker(intervalo=args.intervalo)
+    except KeyboardInterrupt:
+        print("👋 Worker detenido")
+
+if __name__ == "__main__":
+    main()